@@ -0,0 +1,17 @@
+from __future__ import annotations
+from importlib import import_module
+
+from .base import DataFrameBackend
+
+# name -> "module:Class"; imported lazily so an optional engine only needs its package when selected
+BACKENDS = {
+    'pandas': 'recon.backends.pandas_backend:PandasBackend',
+    'polars': 'recon.backends.polars_backend:PolarsBackend',
+    'duckdb': 'recon.backends.duckdb_backend:DuckDBBackend',
+}
+
+def get_backend(name: str, **options) -> DataFrameBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}; expected one of {sorted(BACKENDS)}")
+    module, cls = BACKENDS[name].split(':')
+    return getattr(import_module(module), cls)(**options)
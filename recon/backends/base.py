@@ -1,8 +1,79 @@
-# Placeholder for alternate backends (e.g., Polars). Signatures only.
+from __future__ import annotations
+from typing import Any, List, Optional
+
+# A backend runs every pipeline stage on its own frame type. run_job only hands frames from one
+# stage to the next, so an engine is free to keep them lazy until `write` (see polars_backend).
+Frame = Any
+
+
 class DataFrameBackend:
-    def read_csv(self, *args, **kwargs):
+    name = "base"
+    thread_safe = True  # may its methods be called from several threads at once (drilldown.max_workers)
+
+    def __init__(self, **options):
+        # engine-specific knobs from job.backend_options (ignored by engines that have none)
+        self.options = options
+
+    # --- input ---
+    # `columns` (post-sanitize names) is what the rest of the job uses; engines may skip reading the rest.
+    # None means every column is needed.
+    def read(self, label: str, cfg: "ReadCfg", columns: Optional[List[str]] = None) -> Frame:
         raise NotImplementedError
-    def groupby_agg(self, *args, **kwargs):
+
+    def sanitize(self, df: Frame, spec: Optional["SanitizeCfg"]) -> Frame:
         raise NotImplementedError
-    def join(self, *args, **kwargs):
+
+    def filter(self, df: Frame, predicates: Optional[List[dict]]) -> Frame:
+        raise NotImplementedError
+
+    def prepare(self, label: str, cfg: "ReadCfg", columns: Optional[List[str]] = None) -> Frame:
+        """read + sanitize + prefilter for one input side."""
+        df = self.read(label, cfg, columns)
+        df = self.sanitize(df, getattr(cfg, "sanitize", None))
+        return self.filter(df, getattr(cfg, "prefilter", None))
+
+    def read_aggregated(self, label: str, cfg: "ReadCfg", spec: Optional["AggregateSpec"],
+                        columns: Optional[List[str]] = None) -> Optional[Frame]:
+        """Optional fused prepare+aggregate. None means "not supported here, use prepare + aggregate"."""
+        return None
+
+    def persist(self, df: Frame) -> Frame:
+        """Materialize a frame that is about to be reused (e.g. by every drilldown level)."""
+        return df
+
+    # --- prepared-input cache (core/cache.py); engines without these simply aren't cached ---
+    def cache_write(self, df: Frame, path) -> Frame:
+        """Write `df` as Parquet to `path`; returns a frame to carry on with in place of `df`."""
+        raise NotImplementedError
+
+    def cache_read(self, path) -> Frame:
+        raise NotImplementedError
+
+    def columns(self, df: Frame) -> List[str]:
+        return list(df.columns)
+
+    # --- transform ---
+    def aggregate(self, df: Frame, spec: Optional["AggregateSpec"]) -> Frame:
+        raise NotImplementedError
+
+    def key_counts(self, A: Frame, B: Frame, keys: List[str]) -> "pd.DataFrame":
+        """keys + count_A/count_B per distinct join key, as a (small) pandas frame."""
+        raise NotImplementedError
+
+    def join(self, A: Frame, B: Frame, keys: List[str], how: str, key_name: Optional[str],
+             prefix_A: str = "_A", prefix_B: str = "_B", readable_key: bool = True,
+             value_cols: Optional[List[str]] = None, fuzzy: Optional[List["FuzzyJoinCfg"]] = None,
+             duplicates: Optional["DuplicateKeysCfg"] = None) -> Frame:
+        """Join A and B on `keys`; `fuzzy` passes first pair B keys the exact join would miss, and a
+        dedupe/rank/cap `duplicates` policy keeps repeated keys from cross-joining (see core.joiner)."""
+        raise NotImplementedError
+
+    def reconcile(self, df: Frame, rules: Optional["ReconcileCfg"], recon_cols_section: str = "numeric",
+                  prefix_A: str = "_A", prefix_B: str = "_B") -> Frame:
+        raise NotImplementedError
+
+    # --- output ---
+    def write(self, df: Frame, report_cfg: "ReportCfg", select_cols: Optional[List[str]] = None,
+              suffix_A: str = "_A", suffix_B: str = "_B") -> Frame:
+        """Emit matched/non_matched/differences + metrics.json; returns the materialized result."""
         raise NotImplementedError
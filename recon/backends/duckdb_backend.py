@@ -0,0 +1,496 @@
+from __future__ import annotations
+from itertools import count
+from pathlib import Path
+from typing import List, Optional
+import json
+import time
+
+import numpy as np
+
+try:
+    import duckdb
+except ImportError as e:  # optional engine
+    raise ImportError("backend 'duckdb' requires the duckdb package (pip install duckdb)") from e
+
+import logging
+log = logging.getLogger(__name__)
+
+from .base import DataFrameBackend
+from ..core.filter import check_columns, compile_filter, fold
+from ..core.io import COLUMNAR_FORMATS
+from ..core.joiner import FUZZY_FLAG, RANK, _FUZZY, _TO, fuzzy_key_map
+from ..core.text import PUNCT
+from ..core.registry import get_comparator, rule_param
+from ..core.sanitize import source_columns
+from ..core.report import (_DEF_FORMATS, _label_map, _map_select_cols, _partition_cols, clear_output, output_metrics,
+                           output_path, parquet_options)
+
+# Frames here are SQL text. Each stage wraps the previous query as a subquery, so the job is
+# one statement that DuckDB optimizes and runs on all cores; with a memory_limit and a
+# temp_directory its joins/aggregates spill to disk, and outputs go out through COPY ... TO
+# without ever building a Python-side frame.
+
+_DEF_MIN_BASE = 1e-8
+
+_SQL_TYPES = {
+    'string': 'VARCHAR',
+    'str': 'VARCHAR',
+    'object': 'VARCHAR',
+    'category': 'VARCHAR',
+    'float64': 'DOUBLE',
+    'float32': 'FLOAT',
+    'int64': 'BIGINT',
+    'Int64': 'BIGINT',
+    'int32': 'INTEGER',
+    'Int32': 'INTEGER',
+    'bool': 'BOOLEAN',
+    'boolean': 'BOOLEAN',
+}
+
+# non-numeric reconcile: same transforms as core.reconcile
+_TEXT = {
+    'exact': lambda x: x,
+    'case_insensitive': lambda x: f"lower({x})",
+    'normalized': lambda x: f"lower(trim(regexp_replace(regexp_replace({x}, '{PUNCT}', '', 'g'), '\\s+', ' ', 'g')))",
+}
+
+# pandas groupby semantics: count/first/last/nunique skip nulls
+_AGG = {
+    'sum': 'SUM({c})',
+    'count': 'COUNT({c})',
+    'min': 'MIN({c})',
+    'max': 'MAX({c})',
+    'first': 'FIRST({c}) FILTER (WHERE {c} IS NOT NULL)',
+    'last': 'LAST({c}) FILTER (WHERE {c} IS NOT NULL)',
+    'nunique': 'COUNT(DISTINCT {c})',
+}
+
+_IN_A = '__in_A'
+_IN_B = '__in_B'
+_HIT = '__fuzzy_hit'
+
+
+def _q(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _lit(v) -> str:
+    if v is None:
+        return 'NULL'
+    if isinstance(v, bool):
+        return 'TRUE' if v else 'FALSE'
+    if isinstance(v, (int, float)):
+        return repr(v)
+    if isinstance(v, (list, tuple, set)):
+        return '(' + ', '.join(_lit(x) for x in v) + ')'
+    return "'" + str(v).replace("'", "''") + "'"
+
+
+_OPS = {
+    'eq': lambda c, v: f"{c} = {_lit(v)}",
+    'ne': lambda c, v: f"{c} IS DISTINCT FROM {_lit(v)}",
+    'gt': lambda c, v: f"{c} > {_lit(v)}",
+    'ge': lambda c, v: f"{c} >= {_lit(v)}",
+    'lt': lambda c, v: f"{c} < {_lit(v)}",
+    'le': lambda c, v: f"{c} <= {_lit(v)}",
+    # an empty list would render as IN (), which DuckDB rejects: nothing is in it, everything is not
+    'in': lambda c, v: f"{c} IN {_lit(v)}" if len(v) else 'FALSE',
+    'not_in': lambda c, v: f"({c} IS NULL OR {c} NOT IN {_lit(v)})" if len(v) else 'TRUE',
+    'is_null': lambda c, v: f"{c} IS NULL",
+    'not_null': lambda c, v: f"{c} IS NOT NULL",
+    'between': lambda c, v: f"{c} BETWEEN {_lit(v[0])} AND {_lit(v[1])}",
+    'startswith': lambda c, v: '(' + ' OR '.join(f"starts_with(CAST({c} AS VARCHAR), {_lit(p)})"
+                                                 for p in (v if isinstance(v, (list, tuple)) else [v])) + ')',
+    'regex': lambda c, v: f"regexp_matches(CAST({c} AS VARCHAR), {_lit(v)})",
+}
+
+
+class DuckDBBackend(DataFrameBackend):
+    """Out-of-core SQL engine for inputs larger than RAM.
+
+    Options (job.backend_options): database (default in-memory), temp_directory (spill
+    location, default `.duckdb_tmp`), memory_limit (e.g. "8GB"), threads (default all cores).
+    """
+    name = 'duckdb'
+    thread_safe = False  # one connection; DuckDB parallelizes inside each query instead
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.con = duckdb.connect(options.get('database', ':memory:'))
+        self.con.execute(f"SET temp_directory = {_lit(str(options.get('temp_directory', '.duckdb_tmp')))}")
+        # row order is never relied on; dropping it lets COPY and joins stream with less memory
+        self.con.execute("SET preserve_insertion_order = false")
+        if options.get('memory_limit'):
+            self.con.execute(f"SET memory_limit = {_lit(str(options['memory_limit']))}")
+        if options.get('threads'):
+            self.con.execute(f"SET threads = {int(options['threads'])}")
+        self._tmp = count(1)
+
+    def _rel(self, sql: str):
+        return self.con.sql(sql)
+
+    def columns(self, df) -> List[str]:
+        return list(self._rel(df).columns)
+
+    def persist(self, df):
+        if df.startswith('SELECT * FROM "__persist_') and df.count(' ') == 3:
+            return df  # already a temp table
+        name = f"__persist_{next(self._tmp)}"
+        self.con.execute(f"CREATE TEMP TABLE {_q(name)} AS {df}")
+        return f"SELECT * FROM {_q(name)}"
+
+    def cache_write(self, df, path):
+        df = self.persist(df)
+        self.con.execute(f"COPY ({df}) TO {_lit(str(path))} (FORMAT parquet)")
+        return df
+
+    def cache_read(self, path):
+        return self.persist(f"SELECT * FROM read_parquet({_lit(str(path))})")
+
+    def _source(self, cfg) -> str:
+        fmt = getattr(cfg, 'format', None) or 'csv'
+        if fmt == 'parquet':
+            return f"read_parquet({_lit(str(cfg.path))})"
+        if fmt in COLUMNAR_FORMATS:
+            # no native IPC reader: expose it as an Arrow dataset, which DuckDB scans lazily
+            # (projection and filters are pushed into the dataset scanner)
+            import pyarrow.dataset as ds
+            name = f"__arrow_{next(self._tmp)}"
+            self.con.register(name, ds.dataset(str(cfg.path), format='ipc'))
+            return _q(name)
+        header = getattr(cfg, 'header', 0)
+        args = [_lit(str(cfg.path)), f"delim = {_lit(getattr(cfg, 'delimiter', None) or ',')}", f"header = {_lit(header is not None)}"]
+        if header:
+            args.append(f"skip = {int(header)}")
+        enc = (getattr(cfg, 'encoding', None) or 'utf-8').lower()
+        if enc.replace('-', '') != 'utf8':
+            args.append(f"encoding = {_lit(enc)}")
+        if getattr(cfg, 'compression', None):
+            args.append(f"compression = {_lit(cfg.compression)}")
+        names = self.columns(f"SELECT * FROM read_csv({', '.join(args)})")
+        types = {k: ('VARCHAR' if v.startswith('date') else _SQL_TYPES[v])
+                 for k, v in (getattr(cfg, 'dtypes', None) or {}).items()
+                 if k in names and (v.startswith('date') or v in _SQL_TYPES)}
+        if types:
+            args.append("types = {" + ', '.join(f"{_lit(k)}: {_lit(t)}" for k, t in types.items()) + "}")
+        return f"read_csv({', '.join(args)})"
+
+    def read(self, label, cfg, columns=None):
+        src = self._source(cfg)
+        names = self.columns(f"SELECT * FROM {src}")
+        wanted = source_columns(getattr(cfg, 'sanitize', None), columns)
+        if wanted is not None:
+            names = [c for c in names if c in set(wanted)]
+        columnar = (getattr(cfg, 'format', None) or 'csv') in COLUMNAR_FORMATS
+        dtypes = getattr(cfg, 'dtypes', None) or {}
+        cols = []
+        for c in names:
+            v = dtypes.get(c, '')
+            if v == 'date':
+                cols.append(f"TRY_CAST({_q(c)} AS DATE) AS {_q(c)}")
+            elif v.startswith('date'):
+                cols.append(f"TRY_CAST({_q(c)} AS TIMESTAMP) AS {_q(c)}")
+            elif columnar and v in _SQL_TYPES:
+                # csv gets its types at parse time; columnar files are cast after the scan
+                cols.append(f"TRY_CAST({_q(c)} AS {_SQL_TYPES[v]}) AS {_q(c)}")
+            else:
+                cols.append(_q(c))
+        log.info("read %s: duckdb %s path=%s columns=%d", label, src.split('(')[0], cfg.path, len(cols))
+        return f"SELECT {', '.join(cols)} FROM {src}"
+
+    def sanitize(self, df, spec):
+        if spec is None:
+            return df
+        rel = self._rel(df)
+        rename = getattr(spec, 'rename', {}) or {}
+        normalize_cfg = getattr(spec, 'normalize', {}) or {}
+        upper = set(normalize_cfg.get('upper_case', []))
+        cols = []
+        for c, t in zip(rel.columns, rel.types):
+            new = rename.get(c, c)
+            expr = _q(c)
+            if normalize_cfg.get('trim_strings') and str(t) == 'VARCHAR':
+                expr = f"TRIM({expr})"
+            if new in upper:
+                expr = f"UPPER(CAST({expr} AS VARCHAR))"
+            cols.append((new, f"{expr} AS {_q(new)}"))
+        select = getattr(spec, 'select', None)
+        if select:
+            by_name = dict(cols)
+            cols = [(c, by_name[c]) for c in select if c in by_name]
+        return f"SELECT {', '.join(e for _, e in cols)} FROM ({df})"
+
+    def filter(self, df, predicates):
+        if not predicates:
+            return df
+        node = compile_filter(predicates)
+        if node is None:
+            return df
+        check_columns(node, self.columns(df))
+        # a NULL condition drops the row like in pandas; NOT keeps what the inner predicate doesn't
+        cond = fold(node, lambda n: _OPS[n.op](_q(n.col), n.value), lambda parts: '(' + ' AND '.join(parts) + ')',
+                    lambda parts: '(' + ' OR '.join(parts) + ')', lambda c: f"NOT COALESCE({c}, FALSE)")
+        return f"SELECT * FROM ({df}) WHERE {cond}"
+
+    def aggregate(self, df, spec):
+        if not spec:
+            return df
+        group_by = getattr(spec, 'group_by', [])
+        metrics = getattr(spec, 'metrics', {})
+        log.info("aggregate(duckdb): group_by=%s, metrics=%s", group_by, list(metrics.keys()))
+        if not group_by:
+            log.warning("aggregate: no group_by provided; returning input frame unchanged")
+            return df
+        gb = ', '.join(_q(c) for c in group_by)
+        aggs = [_AGG.get(cfg.get('agg', 'sum'), _AGG['sum']).format(c=_q(col)) + f" AS {_q(col)}" for col, cfg in metrics.items()]
+        return f"SELECT {', '.join([gb] + aggs)} FROM ({df}) GROUP BY {gb}"
+
+    def _fuzzy(self, A, B, keys, passes, prefix_B):
+        # pairing runs on the (small) distinct unmatched key tuples in pandas; the rewrite is a join
+        cols = ', '.join(_q(k) for k in keys)
+        ka, kb = f"SELECT DISTINCT {cols} FROM ({A})", f"SELECT DISTINCT {cols} FROM ({B})"
+        A_res = self.con.sql(f"{ka} EXCEPT {kb}").df()
+        B_res = self.con.sql(f"{kb} EXCEPT {ka}").df()
+        mapping = fuzzy_key_map(A_res, B_res, keys, passes)
+        if mapping.empty:
+            return f"SELECT *, FALSE AS {_q(FUZZY_FLAG)} FROM ({B})"
+        name = f"__fuzzy_{next(self._tmp)}"
+        self.con.register(name, mapping.assign(**{_HIT: True}))
+        sel = [f"CASE WHEN m.{_q(_HIT)} THEN m.{_q(f'{_TO}{c}')} ELSE b.{_q(c)} END AS {_q(c)}" if c in keys else f"b.{_q(c)}"
+               for c in self.columns(B)]
+        # B's own value of a rewritten key, until the join (see core.joiner.restore_fuzzy)
+        sel += [f"CASE WHEN m.{_q(_HIT)} THEN b.{_q(on)} END AS {_q(f'{_FUZZY}{on}')}" for on in dict.fromkeys(p.on for p in passes)]
+        sel.append(f"COALESCE(m.{_q(_HIT)}, FALSE) AS {_q(FUZZY_FLAG)}")
+        on = ' AND '.join(f"b.{_q(k)} IS NOT DISTINCT FROM m.{_q(k)}" for k in keys)
+        return f"SELECT {', '.join(sel)} FROM ({B}) b LEFT JOIN {name} m ON {on}"
+
+    def key_counts(self, A, B, keys):
+        cols = ', '.join(_q(k) for k in keys)
+        on = ' AND '.join(f"a.{_q(k)} IS NOT DISTINCT FROM b.{_q(k)}" for k in keys)
+        sel = ', '.join(f"COALESCE(a.{_q(k)}, b.{_q(k)}) AS {_q(k)}" for k in keys)
+        return self.con.sql(
+            f"SELECT {sel}, COALESCE(a.n, 0) AS count_A, COALESCE(b.n, 0) AS count_B "
+            f"FROM (SELECT {cols}, COUNT(*) AS n FROM ({A}) GROUP BY ALL) a "
+            f"FULL OUTER JOIN (SELECT {cols}, COUNT(*) AS n FROM ({B}) GROUP BY ALL) b ON {on}"
+        ).df()
+
+    def _rank(self, A, B, keys, cfg):
+        cols = ', '.join(_q(k) for k in keys)
+        order = [c for c in cfg.order_by if c in self.columns(A) and c in self.columns(B)]
+        # without order_by, rows of a key are numbered in scan order
+        rank_in = lambda t: (f"ROW_NUMBER() OVER (PARTITION BY {', '.join(f'{t}{_q(k)}' for k in keys)}"
+                             f"{' ORDER BY ' + ', '.join(f'{t}{_q(c)}' for c in order) if order else ''}) - 1")
+        rank = rank_in('')
+        if cfg.policy == 'dedupe':
+            return f"SELECT * FROM ({A}) QUALIFY {rank} = 0", f"SELECT * FROM ({B}) QUALIFY {rank} = 0", False
+        if cfg.policy == 'cap':
+            # number only the keys whose A x B pairs exceed the cap; the rest keep 0 and cross-join
+            on = ' AND '.join(f"a.{_q(k)} IS NOT DISTINCT FROM b.{_q(k)}" for k in keys)
+            over = (f"SELECT a.* FROM (SELECT {cols}, COUNT(*) AS n FROM ({A}) GROUP BY ALL) a "
+                    f"JOIN (SELECT {cols}, COUNT(*) AS n FROM ({B}) GROUP BY ALL) b ON {on} "
+                    f"WHERE a.n * b.n > {int(cfg.max_pairs_per_key)}")
+            hit = ' AND '.join(f"o.{_q(k)} IS NOT DISTINCT FROM f.{_q(k)}" for k in keys)
+            capped = lambda f: (f"SELECT f.*, CASE WHEN o.n IS NOT NULL THEN {rank_in('f.')} ELSE 0 END AS {_q(RANK)} "
+                                f"FROM ({f}) f LEFT JOIN ({over}) o ON {hit}")
+            return capped(A), capped(B), True
+        return f"SELECT *, {rank} AS {_q(RANK)} FROM ({A})", f"SELECT *, {rank} AS {_q(RANK)} FROM ({B})", True
+
+    def join(self, A, B, keys, how, key_name, prefix_A='_A', prefix_B='_B', readable_key=True, value_cols=None,
+             fuzzy=None, duplicates=None):
+        if fuzzy:
+            B = self._fuzzy(A, B, keys, fuzzy, prefix_B)
+        ranked = False
+        if duplicates is not None and duplicates.policy in ('dedupe', 'rank', 'cap'):
+            A, B, ranked = self._rank(A, B, keys, duplicates)
+        match_keys = keys + [RANK] if ranked else keys
+        a_cols, b_cols = self.columns(A), self.columns(B)
+        # pandas' layouts: without key_name the keys come out coalesced in A's column order; with it
+        # (pandas merges on that one column) every shared column, keys included, comes out once per
+        # side, then key_name sits between the sides and the coalesced keys follow them
+        overlap = (set(a_cols) & set(b_cols)) - (set() if key_name else set(match_keys))
+        kind = {'inner': 'INNER', 'left': 'LEFT', 'right': 'RIGHT'}.get(how, 'FULL OUTER')
+        # NULL keys match each other, like pandas merge
+        on = ' AND '.join(f"a.{_q(k)} IS NOT DISTINCT FROM b.{_q(k)}" for k in match_keys) or 'TRUE'
+        coalesced = {k: f"COALESCE(a.{_q(k)}, b.{_q(k)})" for k in keys}
+        # columns passed through per side (the rank helper never is; keys only with key_name)
+        keep = lambda c: c != RANK and (key_name or c not in match_keys)
+        sel = []
+        for c in a_cols:
+            if c in coalesced and not key_name:
+                sel.append(f"{coalesced[c]} AS {_q(c)}")
+            elif keep(c):
+                sel.append(f"a.{_q(c)} AS {_q(f'{c}{prefix_A}' if c in overlap else c)}")
+        if key_name and readable_key:
+            # a missing key part reads 'nan', as in core.joiner
+            parts = " || '|' || ".join(f"COALESCE(CAST({coalesced[k]} AS VARCHAR), 'nan')" for k in keys)
+            sel.append(f"{parts} AS {_q(key_name)}")
+        in_a, in_b = f"a.{_q(_IN_A)} IS NOT NULL", f"b.{_q(_IN_B)} IS NOT NULL"
+        # like restore_fuzzy: <on><prefix_B> is B's own key where a fuzzy pass rewrote it; it replaces
+        # B's key column with key_name, and is added after the coverage flags otherwise
+        kept = {f"{on}{prefix_B}": f"{_FUZZY}{on}" for on in dict.fromkeys(p.on for p in fuzzy or [])}
+        kept = {c: h for c, h in kept.items() if h in b_cols}
+        hidden = set(kept.values())
+        for c in b_cols:
+            name = f'{c}{prefix_B}' if c in overlap else c
+            if not keep(c) or c in hidden:
+                continue
+            if c == FUZZY_FLAG and fuzzy:
+                sel.append(f"(COALESCE(b.{_q(c)}, FALSE) AND {in_a} AND {in_b}) AS {_q(c)}")
+            elif name in kept:
+                sel.append(f"COALESCE(b.{_q(kept.pop(name))}, b.{_q(c)}) AS {_q(name)}")
+            else:
+                sel.append(f"b.{_q(c)} AS {_q(name)}")
+        if key_name:
+            sel += [f"{coalesced[k]} AS {_q(k)}" for k in keys]
+        sel += [
+            f"({in_a} AND NOT {in_b}) AS only_in_A",
+            f"({in_b} AND NOT {in_a}) AS only_in_B",
+            f"({in_a} AND {in_b}) AS in_both",
+        ]
+        sel += [f"b.{_q(h)} AS {_q(c)}" for c, h in kept.items()]
+        df = (f"SELECT {', '.join(sel)} FROM (SELECT *, TRUE AS {_q(_IN_A)} FROM ({A})) a "
+              f"{kind} JOIN (SELECT *, TRUE AS {_q(_IN_B)} FROM ({B})) b ON {on}")
+        rel = self._rel(df)
+        numeric = {c for c, t in zip(rel.columns, rel.types) if str(t) in ('DOUBLE', 'FLOAT', 'BIGINT', 'INTEGER', 'HUGEINT', 'SMALLINT', 'TINYINT') or str(t).startswith('DECIMAL')}
+        if value_cols is None:
+            fill = numeric
+        else:
+            fill = {f"{c}{sfx}" for c in value_cols for sfx in (prefix_A, prefix_B, '')} & numeric
+        if not fill:
+            return df
+        # 0, not 0.0: integer columns stay integers
+        cols = [f"COALESCE({_q(c)}, 0) AS {_q(c)}" if c in fill else _q(c) for c in rel.columns]
+        return f"SELECT {', '.join(cols)} FROM ({df})"
+
+    def reconcile(self, df, rules, recon_cols_section='numeric', prefix_A='_A', prefix_B='_B'):
+        names = set(self.columns(df))
+        # keyed by output column: a later rule on the same column replaces an earlier one (as in core.reconcile)
+        exprs, flags = {}, {}
+        for rule in (getattr(rules, recon_cols_section, []) if rules is not None else []):
+            col = rule.column
+            a = _q(f"{col}{prefix_A}" if f"{col}{prefix_A}" in names else col)
+            b = _q(f"{col}{prefix_B}" if f"{col}{prefix_B}" in names else col)
+            exprs[f'delta_{col}'] = f"({b} - {a})"
+            exprs[f'abs_delta_{col}'] = f"ABS({b} - {a})"
+            exprs[f'pct_delta_{col}'] = f"({b} - {a}) / (CASE WHEN {a} = 0 THEN {_DEF_MIN_BASE!r} ELSE {a} END)"
+            comp = getattr(rule, 'comparator', 'relative')
+            if comp == 'relative':
+                min_base = float(rule_param(rule, 'min_base', _DEF_MIN_BASE))
+                tol = float(rule_param(rule, 'tol_pct', 0.0))
+                flag = f"ABS({a} - {b}) <= GREATEST(ABS({a}), ABS({b}), {min_base!r}) * {tol!r}"
+            elif comp == 'absolute':
+                flag = f"ABS({a} - {b}) <= {float(rule_param(rule, 'tol_abs', 0.0))!r}"
+            elif comp == 'rounded':
+                decimals = int(rule_param(rule, 'round', 2))
+                # half to even, like numpy and polars (ROUND goes half away from zero)
+                flag = f"ROUND_EVEN({a}, {decimals}) = ROUND_EVEN({b}, {decimals})"
+            elif comp == 'exact':
+                flag = f"{a} = {b}"
+            else:
+                flag = f"{self._udf(get_comparator(comp), rule)}({a}, {b})"
+            exprs[f'match_{col}'] = f"COALESCE({flag}, FALSE)"
+            flags[_q(f"match_{col}")] = None
+        # attribute rules feed the same match_flag (see core.reconcile)
+        non_numeric = (getattr(rules, 'non_numeric', None) or []) if recon_cols_section == 'numeric' and rules is not None else []
+        for rule in non_numeric:
+            col = rule.column
+            a = _q(f"{col}{prefix_A}" if f"{col}{prefix_A}" in names else col)
+            b = _q(f"{col}{prefix_B}" if f"{col}{prefix_B}" in names else col)
+            comp = getattr(rule, 'comparator', 'exact')
+            if comp == 'date_tolerance':
+                a, b = f"TRY_CAST({a} AS TIMESTAMP)", f"TRY_CAST({b} AS TIMESTAMP)"
+                days = f"((epoch_us({b}) - epoch_us({a})) / 86400000000.0)"
+                exprs[f'delta_days_{col}'] = days
+                flag = f"ABS({days}) <= {float(getattr(rule, 'tol_days', 0) or 0)!r}"
+            elif comp in _TEXT:
+                a, b = _TEXT[comp](f"CAST({a} AS VARCHAR)"), _TEXT[comp](f"CAST({b} AS VARCHAR)")
+                flag = f"{a} = {b}"
+            else:
+                raise ValueError(f"unknown non-numeric comparator {comp!r} for column {col!r}")
+            flag = f"COALESCE({flag}, FALSE)"
+            if getattr(rule, 'null_equal', True):
+                flag = f"({flag} OR ({a} IS NULL AND {b} IS NULL))"
+            exprs[f'match_{col}'] = flag
+            flags[_q(f"match_{col}")] = None
+        if exprs:
+            df = f"SELECT *, {', '.join(f'{e} AS {_q(name)}' for name, e in exprs.items())} FROM ({df})"
+        match = ' AND '.join(flags) if flags else 'TRUE'
+        return f"SELECT *, ({match}) AS match_flag FROM ({df})"
+
+    def _udf(self, comparator, rule) -> str:
+        """Expose a registered (numpy, batched) comparator to SQL as a vectorized Arrow UDF."""
+        import pyarrow as pa
+        try:
+            from duckdb.sqltypes import BOOLEAN, DOUBLE
+        except ImportError:  # duckdb < 1.4
+            from duckdb.typing import BOOLEAN, DOUBLE
+
+        def run(a, b):
+            a = a.to_numpy(zero_copy_only=False).astype(float)
+            b = b.to_numpy(zero_copy_only=False).astype(float)
+            return pa.array(np.asarray(comparator(a, b, rule), dtype=bool))
+        name = f"__cmp_{comparator.name}_{next(self._tmp)}"
+        self.con.create_function(name, run, [DOUBLE, DOUBLE], BOOLEAN, type='arrow')
+        return name
+
+    def _copy(self, sql: str, path: Path, fmt: str, compression: Optional[str] = None, parquet=None,
+              partition_by: Optional[List[str]] = None) -> None:
+        if fmt == 'csv':
+            opts = "FORMAT CSV, HEADER" + (f", COMPRESSION {compression}" if compression else "")
+        else:
+            codec = parquet.compression if parquet is not None else 'zstd'
+            opts = f"FORMAT PARQUET, COMPRESSION {'uncompressed' if codec == 'none' else codec}"
+            if parquet is not None:
+                opts += f", ROW_GROUP_SIZE {int(parquet.row_group_size)}"
+                if parquet.compression_level is not None:
+                    opts += f", COMPRESSION_LEVEL {int(parquet.compression_level)}"
+            if partition_by:
+                opts += f", PARTITION_BY ({', '.join(_q(c) for c in partition_by)})"
+        self.con.execute(f"COPY ({sql}) TO {_lit(str(path))} ({opts})")
+
+    def write(self, df, report_cfg, select_cols=None, suffix_A='_A', suffix_B='_B'):
+        start = time.perf_counter()
+        outdir = Path(report_cfg.outputs.dir)
+        formats = getattr(report_cfg.outputs, 'formats', _DEF_FORMATS) or _DEF_FORMATS
+        log.info("emit_reports(duckdb): outdir=%s formats=%s", outdir, formats)
+        # run the plan once into a temp table (spills past memory_limit), then COPY each output from it
+        result = f"__result_{next(self._tmp)}"
+        self.con.execute(f"CREATE TEMP TABLE {_q(result)} AS {df}")
+        names = self.columns(f"SELECT * FROM {_q(result)}")
+        labels = _label_map(names, report_cfg)
+        labelled = [labels.get(c, c) for c in names]
+        select = _map_select_cols(select_cols, report_cfg) if select_cols else None
+        base = [c for c in select if c in labelled] if select else labelled
+        src = {new: old for old, new in zip(names, labelled)}
+        proj = ', '.join(f"{_q(src[c])} AS {_q(c)}" for c in base)
+        has_flag = 'match_flag' in names
+        where = {
+            'matched': "WHERE match_flag" if has_flag else "WHERE FALSE",
+            'non_matched': "WHERE NOT match_flag" if has_flag else "",
+            'differences': "",
+        }
+        compression = getattr(report_cfg.outputs, 'compression', None)
+        opts = parquet_options(report_cfg.outputs)
+        outdir.mkdir(parents=True, exist_ok=True)
+        written = {}
+        for name, cond in where.items():
+            for fmt in ('csv', 'parquet'):
+                if fmt in formats:
+                    path = output_path(outdir, name, fmt, compression)
+                    t0 = time.perf_counter()
+                    clear_output(path)
+                    self._copy(f"SELECT {proj} FROM {_q(result)} {cond}", path, fmt, compression, opts,
+                               _partition_cols(opts, base, name) if fmt == 'parquet' else None)
+                    written[path.name] = time.perf_counter() - t0
+        total, matched = self.con.execute(
+            f"SELECT COUNT(*), COUNT(*) FILTER (WHERE {'match_flag' if has_flag else 'FALSE'}) FROM {_q(result)}"
+        ).fetchone()
+        log.info("emit_reports(duckdb): matched=%d non_matched=%d base_cols=%s", matched, total - matched, base)
+        metrics = {
+            'total': int(total),
+            'matched': int(matched),
+            'non_matched': int(total - matched),
+        }
+        metrics['outputs'] = output_metrics(outdir, written, metrics, time.perf_counter() - start)
+        (outdir / 'metrics.json').write_text(json.dumps(metrics, indent=2))
+        return self.con.table(result)
@@ -1 +1,105 @@
-# Using pandas directly in core for now. This module is a placeholder if you swap to backend abstraction.
+from __future__ import annotations
+from typing import List, Optional
+
+import pandas as pd
+
+import logging
+log = logging.getLogger(__name__)
+
+from .base import DataFrameBackend
+from ..core.io import ReadSpec, COLUMNAR_FORMATS
+from ..core.dtypes import plan_dtypes, widen_integers
+from ..core.sanitize import sanitize, source_columns, source_predicates
+from ..core.filter import apply_filters
+from ..core.aggregate import aggregate, StreamingAggregator
+from ..core.joiner import join, key_counts
+from ..core.reconcile import reconcile
+from ..core.report import emit_reports
+
+
+def _read_spec(label: str, cfg, columns: Optional[List[str]] = None) -> ReadSpec:
+    # cfg is a dataclass (e.g., InputCfg) with attributes like path, delimiter, encoding, dtypes, header
+    read = ReadSpec(
+        path=cfg.path,
+        delimiter=getattr(cfg, 'delimiter', None),
+        encoding=getattr(cfg, 'encoding', None),
+        dtypes=getattr(cfg, 'dtypes', None),
+        header=getattr(cfg, 'header', None),
+        chunksize=getattr(cfg, 'chunksize', None),
+        format=getattr(cfg, 'format', None) or 'csv',
+        compression=getattr(cfg, 'compression', None),
+    )
+    san = getattr(cfg, 'sanitize', None)
+    # project sanitize.select (narrowed to the columns the job uses) down to usecols
+    read.usecols = source_columns(san, columns)
+    if read.format in COLUMNAR_FORMATS:
+        # row groups / batches failing these never get decoded; the prefilter still runs afterwards
+        read.filters = source_predicates(san, getattr(cfg, 'prefilter', None), read.dtypes)
+    plan = getattr(cfg, 'dtype_plan', None)
+    if plan is not None and plan.enabled:
+        # sampled after the projection is known, so the sample reads what the real read reads
+        read.dtypes = plan_dtypes(read, plan)
+        read.downcast = plan.downcast
+    log.info("read %s: format=%s chunksize=%s usecols=%s pushdown=%s", label, read.format, read.chunksize,
+             read.usecols, read.filters)
+    return read
+
+
+def _prep_fn(cfg):
+    san = getattr(cfg, 'sanitize', None)
+    prefilter = getattr(cfg, 'prefilter', None)
+    return lambda d: apply_filters(sanitize(d, san), prefilter)
+
+
+class PandasBackend(DataFrameBackend):
+    """The in-process pandas engine; a thin adapter over recon.core."""
+    name = 'pandas'
+
+    def read(self, label, cfg, columns=None) -> pd.DataFrame:
+        return _read_spec(label, cfg, columns).read()
+
+    def sanitize(self, df, spec) -> pd.DataFrame:
+        return sanitize(df, spec)
+
+    def filter(self, df, predicates) -> pd.DataFrame:
+        return apply_filters(df, predicates)
+
+    def prepare(self, label, cfg, columns=None) -> pd.DataFrame:
+        # sanitize + prefilter run inside the reader so chunked reads only keep surviving rows
+        return _read_spec(label, cfg, columns).read(transform=_prep_fn(cfg))
+
+    def read_aggregated(self, label, cfg, spec, columns=None) -> Optional[pd.DataFrame]:
+        """Streaming read folded straight into per-group partials; the prepared frame never materializes."""
+        if not (getattr(cfg, 'chunksize', None) and getattr(spec, 'group_by', None)):
+            return None
+        agg = StreamingAggregator(spec)
+        for chunk in _read_spec(label, cfg, columns).iter_chunks(transform=_prep_fn(cfg)):
+            agg.update(chunk)
+        return agg.result()
+
+    def cache_write(self, df, path) -> pd.DataFrame:
+        df.to_parquet(path, engine='pyarrow', index=False)
+        return df
+
+    def cache_read(self, path) -> pd.DataFrame:
+        return pd.read_parquet(path, engine='pyarrow')
+
+    def aggregate(self, df, spec) -> pd.DataFrame:
+        return aggregate(df, spec)
+
+    def key_counts(self, A, B, keys) -> pd.DataFrame:
+        return key_counts(A, B, keys)
+
+    def join(self, A, B, keys, how, key_name, prefix_A='_A', prefix_B='_B', readable_key=True, value_cols=None,
+             fuzzy=None, duplicates=None) -> pd.DataFrame:
+        # the dtype plan's downcast ints stop at the join: reports carry the same int64 columns either way
+        A, B = widen_integers(A), widen_integers(B)
+        return join(A, B, keys=keys, how=how, key_name=key_name, prefix_A=prefix_A, prefix_B=prefix_B,
+                    readable_key=readable_key, value_cols=value_cols, fuzzy=fuzzy, duplicates=duplicates)
+
+    def reconcile(self, df, rules, recon_cols_section='numeric', prefix_A='_A', prefix_B='_B') -> pd.DataFrame:
+        return reconcile(df, rules, recon_cols_section=recon_cols_section, prefix_A=prefix_A, prefix_B=prefix_B)
+
+    def write(self, df, report_cfg, select_cols=None, suffix_A='_A', suffix_B='_B') -> pd.DataFrame:
+        emit_reports(df, report_cfg, select_cols=select_cols, suffix_A=suffix_A, suffix_B=suffix_B)
+        return df
@@ -0,0 +1,448 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import List, Optional
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import polars as pl
+except ImportError as e:  # optional engine
+    raise ImportError("backend 'polars' requires the polars package (pip install 'polars>=1.24')") from e
+
+import logging
+log = logging.getLogger(__name__)
+
+from .base import DataFrameBackend
+from ..core.filter import check_columns, compile_filter, fold
+from ..core.io import COLUMNAR_FORMATS
+from ..core.joiner import FUZZY_FLAG, RANK, _FUZZY, _TO, fuzzy_key_map
+from ..core.text import PUNCT
+from ..core.registry import get_comparator, rule_param
+from ..core.sanitize import source_columns
+from ..core.report import (_DEF_FORMATS, _label_map, _map_select_cols, _partition_cols, clear_output, compressed_stream,
+                           output_metrics, output_path, parquet_options, write_parquet)
+
+# Every stage below only extends a LazyFrame plan; nothing runs until `write` collects it, so
+# scan -> sanitize -> filter -> aggregate -> join -> reconcile is optimized (projection and
+# predicate pushdown, common subplan elimination) and executed multi-threaded as one query.
+
+_DEF_MIN_BASE = 1e-8
+
+_PL_DTYPES = {
+    'string': pl.Utf8,
+    'str': pl.Utf8,
+    'object': pl.Utf8,
+    'float64': pl.Float64,
+    'float32': pl.Float32,
+    'int64': pl.Int64,
+    'Int64': pl.Int64,
+    'int32': pl.Int32,
+    'Int32': pl.Int32,
+    'bool': pl.Boolean,
+    'boolean': pl.Boolean,
+    'category': pl.Categorical,
+}
+
+_OPS = {
+    'eq': lambda c, v: c.eq_missing(v),
+    'ne': lambda c, v: c.ne_missing(v),
+    'gt': lambda c, v: c > v,
+    'ge': lambda c, v: c >= v,
+    'lt': lambda c, v: c < v,
+    'le': lambda c, v: c <= v,
+    'in': lambda c, v: c.is_in(v).fill_null(False),
+    'not_in': lambda c, v: ~c.is_in(v).fill_null(False),
+    'is_null': lambda c, v: c.is_null(),
+    'not_null': lambda c, v: c.is_not_null(),
+    'between': lambda c, v: c.is_between(v[0], v[1]),
+    'startswith': lambda c, v: pl.any_horizontal([c.cast(pl.Utf8).str.starts_with(p)
+                                                  for p in (v if isinstance(v, (list, tuple)) else [v])]),
+    'regex': lambda c, v: c.cast(pl.Utf8).str.contains(v),
+}
+
+
+def _literal(value, dtype):
+    """A filter value for a column of `dtype`: strings compared with a temporal column are parsed to
+    that type first (polars won't compare a date with a string; pandas and DuckDB do the conversion)."""
+    if isinstance(value, (list, tuple)):
+        return [_literal(v, dtype) for v in value]
+    if not isinstance(value, str) or dtype is None or not dtype.is_temporal():
+        return value
+    if dtype == pl.Time:
+        return pd.Timestamp(f"1970-01-01 {value}").time()
+    ts = pd.Timestamp(value)
+    if dtype == pl.Date:
+        return ts.date()
+    tz = getattr(dtype, 'time_zone', None)
+    if tz and ts.tz is None:
+        ts = ts.tz_localize(tz)
+    return ts.to_pydatetime()
+
+
+# non-numeric reconcile: same transforms as core.reconcile
+_TEXT = {
+    'exact': lambda e: e,
+    'case_insensitive': lambda e: e.str.to_lowercase(),
+    'normalized': lambda e: e.str.replace_all(PUNCT, '').str.replace_all(r'\s+', ' ').str.strip_chars().str.to_lowercase(),
+}
+
+
+def _datetime(name: str, dtype) -> pl.Expr:
+    if dtype == pl.Datetime:
+        return pl.col(name)
+    if dtype == pl.Date:
+        return pl.col(name).cast(pl.Datetime)
+    return pl.col(name).cast(pl.String).str.to_datetime(strict=False)
+
+# pandas groupby semantics: first/last/nunique skip nulls
+_AGG = {
+    'sum': lambda c: pl.col(c).sum(),
+    'count': lambda c: pl.col(c).count(),
+    'min': lambda c: pl.col(c).min(),
+    'max': lambda c: pl.col(c).max(),
+    'first': lambda c: pl.col(c).drop_nulls().first(),
+    'last': lambda c: pl.col(c).drop_nulls().last(),
+    'nunique': lambda c: pl.col(c).drop_nulls().n_unique(),
+}
+
+_COMPRESSED = ('.gz', '.bz2', '.zip', '.xz', '.zst')
+
+_IN_A = '__in_A'
+_IN_B = '__in_B'
+_ON = '__on_'  # with key_name: the join runs on copies of the keys, so each side keeps its own
+_HIT = '__fuzzy_hit'
+
+
+def _csv_encoding(enc: Optional[str]) -> str:
+    return 'utf8' if (enc or 'utf-8').lower().replace('-', '') == 'utf8' else 'utf8-lossy'
+
+
+def _batched(comparator, rule):
+    def run(series):
+        a, b = (x.cast(pl.Float64).to_numpy() for x in series)
+        return pl.Series(np.asarray(comparator(a, b, rule), dtype=bool))
+    return run
+
+
+class PolarsBackend(DataFrameBackend):
+    """Polars LazyFrame engine: the whole job is planned lazily and collected once per output."""
+    name = 'polars'
+
+    def columns(self, df) -> List[str]:
+        return df.collect_schema().names()
+
+    def persist(self, df):
+        return df.collect().lazy()
+
+    def _read_csv(self, cfg, dtypes):
+        header = getattr(cfg, 'header', 0)
+        scan = dict(
+            separator=getattr(cfg, 'delimiter', None) or ',',
+            has_header=header is not None,
+            skip_rows=header or 0,
+            encoding=_csv_encoding(getattr(cfg, 'encoding', None)),
+        )
+        # scan_csv can't stream compressed text: decode those eagerly, the rest of the plan stays lazy
+        compressed = getattr(cfg, 'compression', None) or str(cfg.path).endswith(_COMPRESSED)
+        names = set((pl.read_csv(cfg.path, n_rows=0, **scan) if compressed else pl.scan_csv(cfg.path, **scan))
+                    .collect_schema().names())
+        overrides = {k: (pl.Utf8 if v.startswith('date') else _PL_DTYPES[v]) for k, v in dtypes.items()
+                     if k in names and (v.startswith('date') or v in _PL_DTYPES)}
+        if compressed:
+            return pl.read_csv(cfg.path, schema_overrides=overrides, **scan).lazy()
+        return pl.scan_csv(cfg.path, schema_overrides=overrides, **scan)
+
+    def cache_write(self, df, path):
+        out = df.collect() if isinstance(df, pl.LazyFrame) else df
+        out.write_parquet(path)
+        return out.lazy()
+
+    def cache_read(self, path):
+        # eager: a later eviction may remove the entry before the plan is collected
+        return pl.read_parquet(path).lazy()
+
+    def read(self, label, cfg, columns=None):
+        fmt = getattr(cfg, 'format', None) or 'csv'
+        dtypes = getattr(cfg, 'dtypes', None) or {}
+        if fmt in COLUMNAR_FORMATS:
+            lf = pl.scan_parquet(cfg.path) if fmt == 'parquet' else pl.scan_ipc(cfg.path)
+        else:
+            lf = self._read_csv(cfg, dtypes)
+        wanted = source_columns(getattr(cfg, 'sanitize', None), columns)
+        if wanted is not None:
+            # explicit projection; the optimizer finds it too, but not across persist()
+            lf = lf.select([c for c in lf.collect_schema().names() if c in set(wanted)])
+        schema = lf.collect_schema()
+        casts = []
+        for k, v in dtypes.items():
+            if k not in schema:
+                continue
+            if v.startswith('date'):
+                target = pl.Date if v == 'date' else pl.Datetime
+                if schema[k] == pl.Utf8:
+                    casts.append(pl.col(k).str.to_date(strict=False) if v == 'date' else pl.col(k).str.to_datetime(strict=False))
+                elif schema[k] != target:
+                    casts.append(pl.col(k).cast(target, strict=False))
+            elif v in _PL_DTYPES and schema[k] != _PL_DTYPES[v]:
+                # csv already parsed these; columnar files are cast after the scan
+                casts.append(pl.col(k).cast(_PL_DTYPES[v], strict=False))
+        log.info("read %s: polars %s path=%s", label, fmt, cfg.path)
+        return lf.with_columns(casts) if casts else lf
+
+    def sanitize(self, df, spec):
+        if spec is None:
+            return df
+        names = self.columns(df)
+        rename = {k: v for k, v in (getattr(spec, 'rename', {}) or {}).items() if k in names}
+        df = df.rename(rename)
+        schema = df.collect_schema()
+        names = schema.names()
+        normalize_cfg = getattr(spec, 'normalize', {}) or {}
+        if normalize_cfg.get('trim_strings'):
+            df = df.with_columns([pl.col(c).str.strip_chars() for c in names if schema[c] == pl.Utf8])
+        upper = [c for c in normalize_cfg.get('upper_case', []) if c in names]
+        if upper:
+            df = df.with_columns([pl.col(c).cast(pl.Utf8).str.to_uppercase() for c in upper])
+        select = getattr(spec, 'select', None)
+        if select:
+            df = df.select([c for c in select if c in names])
+        return df
+
+    def filter(self, df, predicates):
+        if not predicates:
+            return df
+        node = compile_filter(predicates)
+        if node is None:
+            return df
+        schema = df.collect_schema()
+        check_columns(node, schema.names())
+        # a null comparison drops the row like in pandas; NOT keeps what the inner predicate doesn't
+        expr = fold(node, lambda n: _OPS[n.op](pl.col(n.col), _literal(n.value, schema.get(n.col))),
+                    pl.all_horizontal, pl.any_horizontal,
+                    lambda e: ~e.fill_null(False))
+        return df.filter(expr)
+
+    def aggregate(self, df, spec):
+        if not spec:
+            return df
+        group_by = getattr(spec, 'group_by', [])
+        metrics = getattr(spec, 'metrics', {})
+        log.info("aggregate(polars): group_by=%s, metrics=%s", group_by, list(metrics.keys()))
+        if not group_by:
+            log.warning("aggregate: no group_by provided; returning input frame unchanged")
+            return df
+        aggs = [_AGG.get(cfg.get('agg', 'sum'), _AGG['sum'])(col) for col, cfg in metrics.items()]
+        return df.group_by(group_by).agg(aggs).sort(group_by, nulls_last=True)
+
+    def _fuzzy(self, A, B, keys, passes, prefix_B):
+        # pairing runs on the (small) distinct unmatched key tuples in pandas; the rewrite stays lazy
+        ka, kb = A.select(keys).unique(), B.select(keys).unique()
+        A_res = ka.join(kb, on=keys, how='anti', nulls_equal=True).collect().to_pandas()
+        B_res = kb.join(ka, on=keys, how='anti', nulls_equal=True).collect().to_pandas()
+        mapping = fuzzy_key_map(A_res, B_res, keys, passes)
+        if mapping.empty:
+            return B.with_columns(pl.lit(False).alias(FUZZY_FLAG))
+        m = pl.from_pandas(mapping).lazy().with_columns(pl.lit(True).alias(_HIT))
+        B = B.join(m, on=keys, how='left', nulls_equal=True)
+        hit = pl.col(_HIT).fill_null(False)
+        ons = dict.fromkeys(p.on for p in passes)
+        return B.with_columns(
+            # B's own value of a rewritten key, until the join (see core.joiner.restore_fuzzy)
+            [pl.when(hit).then(pl.col(on)).alias(f"{_FUZZY}{on}") for on in ons]
+            + [pl.when(hit).then(pl.col(f"{_TO}{k}")).otherwise(pl.col(k)).alias(k) for k in keys]
+            + [hit.alias(FUZZY_FLAG)]
+        ).drop([f"{_TO}{k}" for k in keys] + [_HIT])
+
+    def key_counts(self, A, B, keys):
+        ca = A.group_by(keys).agg(pl.len().alias('count_A'))
+        cb = B.group_by(keys).agg(pl.len().alias('count_B'))
+        both = ca.join(cb, on=keys, how='full', nulls_equal=True, coalesce=True)
+        return both.with_columns(pl.col('count_A', 'count_B').fill_null(0)).collect().to_pandas()
+
+    def _rank(self, A, B, keys, cfg):
+        order = [c for c in cfg.order_by if c in self.columns(A) and c in self.columns(B)]
+        if order:
+            A, B = A.sort(order, maintain_order=True), B.sort(order, maintain_order=True)
+        rank = pl.int_range(pl.len()).over(keys)
+        if cfg.policy == 'dedupe':
+            return A.filter(rank == 0), B.filter(rank == 0), False
+        if cfg.policy == 'cap':
+            # number only the keys whose A x B pairs exceed the cap; the rest keep 0 and cross-join
+            ca, cb = A.group_by(keys).agg(pl.len().alias('__na')), B.group_by(keys).agg(pl.len().alias('__nb'))
+            over = (ca.join(cb, on=keys, nulls_equal=True)
+                    .filter(pl.col('__na') * pl.col('__nb') > cfg.max_pairs_per_key)
+                    .select(keys).with_columns(pl.lit(True).alias(_HIT)))
+            # number before joining: the join doesn't keep row order
+            capped = lambda f: (f.with_columns(rank.alias(RANK)).join(over, on=keys, how='left', nulls_equal=True)
+                                .with_columns(pl.when(pl.col(_HIT)).then(pl.col(RANK)).otherwise(0).alias(RANK)).drop(_HIT))
+            return capped(A), capped(B), True
+        return A.with_columns(rank.alias(RANK)), B.with_columns(rank.alias(RANK)), True
+
+    def join(self, A, B, keys, how, key_name, prefix_A='_A', prefix_B='_B', readable_key=True, value_cols=None,
+             fuzzy=None, duplicates=None):
+        if fuzzy:
+            B = self._fuzzy(A, B, keys, fuzzy, prefix_B)
+        ranked = False
+        if duplicates is not None and duplicates.policy in ('dedupe', 'rank', 'cap'):
+            A, B, ranked = self._rank(A, B, keys, duplicates)
+        match_keys = keys + [RANK] if ranked else keys
+        # without key_name, join directly on the key columns (they come out coalesced/unsuffixed) and
+        # only overlapping non-key columns get the side suffixes, same as pandas merge. With key_name
+        # pandas merges on that one column, so the keys too come out once per side, then coalesced.
+        a_cols, b_cols = self.columns(A), self.columns(B)
+        if key_name:
+            on = [f"{_ON}{k}" for k in match_keys]
+            A = A.with_columns([pl.col(k).alias(o) for k, o in zip(match_keys, on)])
+            B = B.with_columns([pl.col(k).alias(o) for k, o in zip(match_keys, on)])
+            overlap = set(a_cols) & set(b_cols)
+        else:
+            on = match_keys
+            overlap = (set(a_cols) & set(b_cols)) - set(match_keys)
+        A = A.rename({c: f"{c}{prefix_A}" for c in overlap}).with_columns(pl.lit(True).alias(_IN_A))
+        B = B.rename({c: f"{c}{prefix_B}" for c in overlap}).with_columns(pl.lit(True).alias(_IN_B))
+        pl_how = {'outer': 'full'}.get(how, how or 'full')
+        df = A.join(B, on=on, how=pl_how, nulls_equal=True, coalesce=True)
+        in_a, in_b = pl.col(_IN_A).is_not_null(), pl.col(_IN_B).is_not_null()
+        df = df.with_columns(
+            (in_a & ~in_b).alias('only_in_A'),
+            (in_b & ~in_a).alias('only_in_B'),
+            (in_a & in_b).alias('in_both'),
+        ).drop([_IN_A, _IN_B] + ([RANK] if ranked and not key_name else []))
+        if fuzzy:
+            df = df.with_columns((pl.col(FUZZY_FLAG).fill_null(False) & pl.col('in_both')).alias(FUZZY_FLAG))
+        kept = [f"{_FUZZY}{on}" for on in dict.fromkeys(p.on for p in fuzzy or [])]
+        kept = [c for c in kept if c in b_cols]
+        if key_name:
+            # pandas' layout: A's columns, key_name, B's columns, the coalesced keys, the coverage flags
+            df = df.with_columns([pl.coalesce(f"{k}{prefix_A}", f"{k}{prefix_B}").alias(k) for k in keys])
+            side = lambda cols, sfx: [f"{c}{sfx}" if c in overlap else c for c in cols if c != RANK]
+            label = []
+            if readable_key:
+                # a missing key part reads 'nan', as in core.joiner
+                df = df.with_columns(pl.concat_str([pl.col(k).cast(pl.Utf8).fill_null('nan') for k in keys],
+                                                   separator='|').alias(key_name))
+                label = [key_name]
+            b_side = [c for c in side(b_cols, prefix_B) if c not in kept]
+            df = df.select(side(a_cols, prefix_A) + label + b_side + keys + ['only_in_A', 'only_in_B', 'in_both'] + kept)
+        if kept:
+            # like restore_fuzzy: <on><prefix_B> is B's own key where a fuzzy pass rewrote it
+            names = self.columns(df)
+            for c in kept:
+                b_col = f"{c[len(_FUZZY):]}{prefix_B}"
+                df = df.with_columns((pl.coalesce(c, b_col) if b_col in names else pl.col(c)).alias(b_col))
+            df = df.drop(kept)
+        schema = df.collect_schema()
+        if value_cols is None:
+            fill = [c for c, t in schema.items() if t.is_numeric()]
+        else:
+            candidates = dict.fromkeys(f"{c}{sfx}" for c in value_cols for sfx in (prefix_A, prefix_B, ''))
+            fill = [c for c in candidates if c in schema and schema[c].is_numeric()]
+        # 0, not 0.0: integer columns stay integers
+        return df.with_columns([pl.col(c).fill_null(0) for c in fill]) if fill else df
+
+    def reconcile(self, df, rules, recon_cols_section='numeric', prefix_A='_A', prefix_B='_B'):
+        names = set(self.columns(df))
+        # keyed by output column: a later rule on the same column replaces an earlier one (as in core.reconcile)
+        exprs, flags = {}, {}
+        for rule in (getattr(rules, recon_cols_section, []) if rules is not None else []):
+            col = rule.column
+            a = pl.col(f"{col}{prefix_A}" if f"{col}{prefix_A}" in names else col)
+            b = pl.col(f"{col}{prefix_B}" if f"{col}{prefix_B}" in names else col)
+            d = b - a
+            exprs[f"delta_{col}"] = d
+            exprs[f"abs_delta_{col}"] = d.abs()
+            exprs[f"pct_delta_{col}"] = d / pl.when(a == 0).then(_DEF_MIN_BASE).otherwise(a)
+            comp = getattr(rule, 'comparator', 'relative')
+            if comp == 'relative':
+                base = pl.max_horizontal(a.abs(), b.abs()).clip(lower_bound=float(rule_param(rule, 'min_base', _DEF_MIN_BASE)))
+                flag = (a - b).abs() <= base * float(rule_param(rule, 'tol_pct', 0.0))
+            elif comp == 'absolute':
+                flag = (a - b).abs() <= float(rule_param(rule, 'tol_abs', 0.0))
+            elif comp == 'rounded':
+                decimals = int(rule_param(rule, 'round', 2))
+                flag = a.round(decimals) == b.round(decimals)
+            elif comp == 'exact':
+                flag = a == b
+            else:
+                # registered/plugin comparator: run its batched numpy function on each batch
+                flag = pl.map_batches([a, b], _batched(get_comparator(comp), rule), return_dtype=pl.Boolean,
+                                      is_elementwise=True)
+            exprs[f"match_{col}"] = flag.fill_null(False)
+            flags[f"match_{col}"] = None
+        # attribute rules feed the same match_flag (see core.reconcile)
+        non_numeric = (getattr(rules, 'non_numeric', None) or []) if recon_cols_section == 'numeric' and rules is not None else []
+        schema = (df.collect_schema() if isinstance(df, pl.LazyFrame) else df.schema) if non_numeric else {}
+        for rule in non_numeric:
+            col = rule.column
+            a_name = f"{col}{prefix_A}" if f"{col}{prefix_A}" in names else col
+            b_name = f"{col}{prefix_B}" if f"{col}{prefix_B}" in names else col
+            comp = getattr(rule, 'comparator', 'exact')
+            if comp == 'date_tolerance':
+                a, b = _datetime(a_name, schema[a_name]), _datetime(b_name, schema[b_name])
+                days = (b - a).dt.total_microseconds() / 86_400_000_000
+                exprs[f"delta_days_{col}"] = days
+                flag = days.abs() <= float(getattr(rule, 'tol_days', 0) or 0)
+            elif comp in _TEXT:
+                a, b = _TEXT[comp](pl.col(a_name).cast(pl.String)), _TEXT[comp](pl.col(b_name).cast(pl.String))
+                flag = a == b
+            else:
+                raise ValueError(f"unknown non-numeric comparator {comp!r} for column {col!r}")
+            flag = flag.fill_null(False)
+            if getattr(rule, 'null_equal', True):
+                flag = flag | (a.is_null() & b.is_null())
+            exprs[f"match_{col}"] = flag
+            flags[f"match_{col}"] = None
+        if exprs:
+            df = df.with_columns([e.alias(name) for name, e in exprs.items()])
+        return df.with_columns((pl.all_horizontal(list(flags)) if flags else pl.lit(True)).alias('match_flag'))
+
+    def write(self, df, report_cfg, select_cols=None, suffix_A='_A', suffix_B='_B'):
+        start = time.perf_counter()
+        out = df.collect() if isinstance(df, pl.LazyFrame) else df
+        outdir = Path(report_cfg.outputs.dir)
+        formats = getattr(report_cfg.outputs, 'formats', _DEF_FORMATS) or _DEF_FORMATS
+        log.info("emit_reports(polars): outdir=%s formats=%s", outdir, formats)
+        out = out.rename(_label_map(out.columns, report_cfg))
+        select = _map_select_cols(select_cols, report_cfg) if select_cols else None
+        base = [c for c in select if c in out.columns] if select else out.columns
+        flag = out['match_flag'] if 'match_flag' in out.columns else pl.Series([False] * out.height)
+        matched = out.filter(flag).select(base)
+        non_matched = out.filter(~flag).select(base)
+        outdir.mkdir(parents=True, exist_ok=True)
+        compression = getattr(report_cfg.outputs, 'compression', None)
+        opts = parquet_options(report_cfg.outputs)
+        written = {}
+        for name, part in (('matched', matched), ('non_matched', non_matched), ('differences', out.select(base))):
+            if 'csv' in formats:
+                path = output_path(outdir, name, 'csv', compression)
+                t0 = time.perf_counter()
+                if compression:
+                    with compressed_stream(path, compression) as f:
+                        part.write_csv(f)
+                else:
+                    part.write_csv(path)
+                written[path.name] = time.perf_counter() - t0
+            if 'parquet' in formats:
+                path = output_path(outdir, name, 'parquet')
+                t0 = time.perf_counter()
+                partition_by = _partition_cols(opts, part.columns, name)
+                if partition_by:  # polars keeps the keys inside hive files; pyarrow leaves them to the directories
+                    write_parquet(part.to_arrow(), path, opts, partition_by)
+                else:
+                    clear_output(path)
+                    part.write_parquet(path, compression='uncompressed' if opts.compression == 'none' else opts.compression,
+                                       compression_level=opts.compression_level, statistics=opts.statistics,
+                                       row_group_size=opts.row_group_size)
+                written[path.name] = time.perf_counter() - t0
+        log.info("emit_reports(polars): matched=%d non_matched=%d base_cols=%s", matched.height, non_matched.height, base)
+        metrics = {
+            'total': out.height,
+            'matched': matched.height,
+            'non_matched': non_matched.height,
+        }
+        metrics['outputs'] = output_metrics(outdir, written, metrics, time.perf_counter() - start)
+        (outdir / 'metrics.json').write_text(json.dumps(metrics, indent=2))
+        return out
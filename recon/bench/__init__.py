@@ -0,0 +1,5 @@
+"""Synthetic inputs and stage benchmarks: python -m recon.bench --help."""
+from .synth import SynthSpec, generate, iter_pairs, write_inputs
+from .runner import bench_config, compare, run_benchmarks
+
+__all__ = ['SynthSpec', 'generate', 'iter_pairs', 'write_inputs', 'bench_config', 'compare', 'run_benchmarks']
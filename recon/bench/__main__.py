@@ -0,0 +1,76 @@
+import argparse, json, sys
+from dataclasses import fields
+from pathlib import Path
+
+from recon.bench.synth import SynthSpec, write_inputs
+from recon.bench.runner import bench_config, compare, run_benchmarks, write_results
+from recon.logging_setup import setup_logging
+
+
+def _rows(text: str) -> int:
+    return int(float(text))  # 1e6, 2.5e5 or 1000000
+
+
+def _spec_args(p: argparse.ArgumentParser):
+    for f in fields(SynthSpec):
+        if f.name == 'rows':
+            continue
+        kind = float if f.name.endswith('_rate') else int
+        p.add_argument(f"--{f.name.replace('_', '-')}", type=kind, default=f.default)
+
+
+def _spec(args, rows: int = 0) -> SynthSpec:
+    return SynthSpec(rows=rows, **{f.name: getattr(args, f.name) for f in fields(SynthSpec) if f.name != 'rows'})
+
+
+def main():
+    p = argparse.ArgumentParser(prog='python -m recon.bench', description='Synthetic inputs and stage benchmarks')
+    p.add_argument('--log-level', default='WARNING')
+    sub = p.add_subparsers(dest='cmd', required=True)
+
+    gen = sub.add_parser('gen', help='Write a synthetic A/B pair and a config that reconciles them')
+    gen.add_argument('--rows', type=_rows, default=100_000)
+    gen.add_argument('--out', default='.recon_bench')
+    gen.add_argument('--format', default='csv', choices=['csv', 'parquet'])
+    _spec_args(gen)
+
+    run = sub.add_parser('run', help='Time every stage at the given sizes and write the results as JSON')
+    run.add_argument('--rows', type=_rows, nargs='+', default=[100_000, 1_000_000])
+    run.add_argument('--backends', nargs='*', default=[], help='Also time whole runs on these backends')
+    run.add_argument('--no-core', action='store_true', help='Skip the per-function (pandas) suite')
+    run.add_argument('--repeat', type=int, default=1)
+    run.add_argument('--format', default='csv', choices=['csv', 'parquet'])
+    run.add_argument('--data-dir', default='.recon_bench', help='Where generated inputs are kept between runs')
+    run.add_argument('--out', default=None, help='Results file (default: stdout)')
+    _spec_args(run)
+
+    cmp = sub.add_parser('compare', help='Compare two results files; exit 1 on a regression')
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--tolerance', type=float, default=0.1, help='Allowed relative slowdown')
+    cmp.add_argument('--min-seconds', type=float, default=0.05, help='Ignore slowdowns smaller than this')
+
+    args = p.parse_args()
+    setup_logging(level=args.log_level, log_dir="logs", run_id='bench')
+    if args.cmd == 'gen':
+        path_A, path_B = write_inputs(_spec(args, args.rows), args.out, fmt=args.format)
+        config = path_A.parent / 'config.yaml'
+        import yaml
+        config.write_text(yaml.safe_dump(bench_config(path_A, path_B, path_A.parent / 'out', fmt=args.format), sort_keys=False))
+        print(config)
+    elif args.cmd == 'run':
+        doc = run_benchmarks(args.rows, _spec(args), backends=args.backends, repeat=args.repeat,
+                             data_dir=args.data_dir, fmt=args.format, core=not args.no_core)
+        write_results(doc, args.out)
+    else:
+        rows = compare(json.loads(Path(args.baseline).read_text()), json.loads(Path(args.current).read_text()),
+                       tolerance=args.tolerance, min_seconds=args.min_seconds)
+        for r in rows:
+            flag = 'REGRESSION' if r['regression'] else ''
+            print(f"{r['suite']:<18} {r['stage']:<28} {r['rows']:>11} {r['baseline_s']:>9.3f}s {r['current_s']:>9.3f}s "
+                  f"x{r['ratio']:<6} {flag}")
+        sys.exit(1 if any(r['regression'] for r in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+from __future__ import annotations
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from dataclasses import asdict, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.config import RootCfg
+from ..core.profiling import RunProfile
+from .synth import SynthSpec, write_inputs
+
+import logging
+log = logging.getLogger(__name__)
+
+# Benchmarks time the recon.core functions stage by stage on generated inputs (suite "core"),
+# and optionally whole run_job runs per backend, taking the stages from run_profile.json (suite
+# "pipeline:<backend>"). Each stage runs `repeat` times and keeps the fastest wall time. Results
+# are JSON, one record per (rows, suite, stage), so two runs can be compared with compare().
+
+RESULTS_VERSION = 1
+
+
+def bench_config(path_A: str | Path, path_B: str | Path, out_dir: str | Path, fmt: str = 'csv') -> dict:
+    """The recon config the benchmarks run: trade-level aggregate, join and reconcile of the generated sides."""
+    side = lambda path: {
+        'path': str(path),
+        'format': fmt,
+        'dtypes': {'trade_id': 'string', 'book': 'string', 'desk': 'string', 'ccy': 'string',
+                   'amount': 'float64', 'qty': 'int64', 'asof_date': 'date'},
+        'sanitize': {'normalize': {'trim_strings': True, 'upper_case': ['book']}},
+        'prefilter': [{'col': 'ccy', 'op': 'in', 'value': ['USD', 'EUR', 'GBP']}],
+    }
+    agg = {'group_by': ['trade_id', 'book', 'desk', 'ccy'],
+           'metrics': {'amount': {'agg': 'sum'}, 'qty': {'agg': 'sum'}}}
+    return {
+        'job': {'name': 'bench', 'cache': {'enabled': False}},
+        'inputs': {'A': side(path_A), 'B': side(path_B)},
+        'aggregate': {'A': agg, 'B': agg},
+        'join': {'keys': ['trade_id', 'book', 'desk', 'ccy'], 'key_name': 'recon_key', 'type': 'outer'},
+        'reconcile': {'numeric': [{'column': 'amount', 'comparator': 'absolute', 'tol_abs': 0.01},
+                                  {'column': 'qty', 'comparator': 'exact'}]},
+        'report': {'outputs': {'dir': str(Path(out_dir) / 'report'), 'formats': ['csv']}},
+        # one trade-level level: the drilldown path re-aggregates, joins and writes at full grain
+        'drilldown': {'enabled': True, 'strategy': 'add', 'levels': [{'add': ['asof_date']}]},
+    }
+
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'version': RESULTS_VERSION,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.node(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def _record(rows: int, suite: str, stage: str, runs: list[dict]) -> dict:
+    best = min(runs, key=lambda r: r['wall_s'])
+    return {
+        'rows': rows, 'suite': suite, 'stage': stage,
+        'wall_s': best['wall_s'], 'cpu_s': best['cpu_s'],
+        'peak_rss_delta_mb': max((r.get('peak_rss_delta_mb') or 0) for r in runs),
+        'wall_s_runs': [r['wall_s'] for r in runs],
+        'frames_out': best.get('frames_out'),
+    }
+
+
+def _core_suite(cfg: RootCfg, rows: int, repeat: int) -> list[dict]:
+    """Each recon.core stage on the pandas frames the previous one produced."""
+    from ..backends.pandas_backend import PandasBackend
+    from ..core.sanitize import sanitize
+    from ..core.filter import apply_filters
+    from ..core.aggregate import aggregate
+    from ..core.joiner import join
+    from ..core.reconcile import reconcile, recon_columns
+    from ..core.report import emit_reports
+    from ..core.drilldown import run_drilldown
+
+    A_cfg, B_cfg = cfg.inputs.A, cfg.inputs.B
+    backend = PandasBackend()
+    keys = cfg.join.keys
+    value_cols = recon_columns(cfg.reconcile)
+    steps = [
+        ('read', lambda s: (backend.read('A', A_cfg), backend.read('B', B_cfg))),  # ReadSpec.read
+        ('sanitize', lambda s: (sanitize(s['read'][0], A_cfg.sanitize), sanitize(s['read'][1], B_cfg.sanitize))),
+        ('apply_filters', lambda s: (apply_filters(s['sanitize'][0], A_cfg.prefilter),
+                                     apply_filters(s['sanitize'][1], B_cfg.prefilter))),
+        ('aggregate', lambda s: (aggregate(s['apply_filters'][0], cfg.aggregate.A),
+                                 aggregate(s['apply_filters'][1], cfg.aggregate.B))),
+        # join writes its key codes onto its inputs: give it shallow copies
+        ('join', lambda s: (join(s['aggregate'][0].copy(deep=False), s['aggregate'][1].copy(deep=False), keys=keys,
+                                 how=cfg.join.type, key_name=cfg.join.key_name, value_cols=value_cols),)),
+        ('reconcile', lambda s: (reconcile(s['join'][0], cfg.reconcile),)),
+        ('emit_reports', lambda s: (emit_reports(s['reconcile'][0], cfg.report),)),
+        ('run_drilldown', lambda s: (run_drilldown(s['apply_filters'][0], s['apply_filters'][1], cfg, cfg.drilldown.levels,
+                                                   strategy=cfg.drilldown.strategy, backend=backend),)),
+    ]
+    state, out = {}, []
+    for name, fn in steps:
+        runs = []
+        for _ in range(repeat):
+            prof = RunProfile()
+            with prof.stage(f"bench {name} ({rows} rows)") as st:
+                result = fn(state)
+                st.outputs(*[r for r in result if isinstance(r, pd.DataFrame)])
+            runs.append(prof.stages[0].to_dict())
+        state[name] = result
+        out.append(_record(rows, 'core', name, runs))
+        log.info("bench core %s rows=%d: %.3fs", name, rows, out[-1]['wall_s'])
+    return out
+
+
+def _pipeline_suite(config: dict, backend: str, rows: int, repeat: int, work_dir: Path) -> list[dict]:
+    """Whole run_job runs; per-stage numbers from their run_profile.json."""
+    import yaml
+    from ..core.pipeline import run_job
+    path = work_dir / f"bench_{backend}.yaml"
+    path.write_text(yaml.safe_dump(config, sort_keys=False))
+    per_stage: dict[str, list[dict]] = {}
+    for _ in range(repeat):
+        out_dir = work_dir / f"run_{backend}"
+        run_job(str(path), str(out_dir), backend_name=backend, use_cache=False)
+        doc = json.loads((out_dir / 'run_profile.json').read_text())
+        per_stage.setdefault('total', []).append({'wall_s': doc['wall_s'], 'cpu_s': doc['cpu_s']})
+        for s in doc['stages']:
+            per_stage.setdefault(s['stage'], []).append(s)
+    return [_record(rows, f"pipeline:{backend}", stage, runs) for stage, runs in per_stage.items()]
+
+
+def run_benchmarks(sizes: Iterable[int], spec: SynthSpec = SynthSpec(), backends: Iterable[str] = (),
+                   repeat: int = 1, data_dir: str | Path = '.recon_bench', fmt: str = 'csv',
+                   core: bool = True) -> dict:
+    """Generate inputs for each size (cached under data_dir) and time every stage; returns the results document."""
+    results = []
+    for rows in sizes:
+        size_spec = replace(spec, rows=int(rows))
+        path_A, path_B = write_inputs(size_spec, data_dir, fmt=fmt)
+        with tempfile.TemporaryDirectory(prefix='recon_bench_') as tmp:
+            work_dir = Path(tmp)
+            config = bench_config(path_A, path_B, work_dir, fmt=fmt)
+            if core:
+                results += _core_suite(RootCfg.model_validate(config), int(rows), repeat)
+            for backend in backends:
+                results += _pipeline_suite(config, backend, int(rows), repeat, work_dir)
+    return {'meta': _meta(), 'spec': {k: v for k, v in asdict(spec).items() if k != 'rows'}, 'format': fmt,
+            'results': results}
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.1, min_seconds: float = 0.05) -> list[dict]:
+    """Stages that got slower than `baseline` by more than `tolerance` (relative) and `min_seconds`."""
+    base = {(r['rows'], r['suite'], r['stage']): r for r in baseline.get('results', [])}
+    out = []
+    for r in current.get('results', []):
+        b = base.get((r['rows'], r['suite'], r['stage']))
+        if b is None:
+            continue
+        delta = r['wall_s'] - b['wall_s']
+        ratio = r['wall_s'] / b['wall_s'] if b['wall_s'] else float('inf')
+        out.append({'rows': r['rows'], 'suite': r['suite'], 'stage': r['stage'], 'baseline_s': b['wall_s'],
+                    'current_s': r['wall_s'], 'ratio': round(ratio, 3),
+                    'regression': delta > min_seconds and ratio > 1 + tolerance})
+    return out
+
+
+def write_results(doc: dict, path: Optional[str | Path]) -> None:
+    text = json.dumps(doc, indent=2)
+    if path is None:
+        sys.stdout.write(text + '\n')
+        return
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(text)
+    log.info("bench: results written to %s", path)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.utils import sha256_text
+
+import logging
+log = logging.getLogger(__name__)
+
+# Seeded synthetic A/B inputs. Rows are generated in fixed-size chunks, each from its own
+# (seed, chunk) random stream, so any row count is reproducible and written with bounded memory.
+# A and B share trade ids and dimensions; B then gets the differences a reconciliation should find:
+# mismatched amounts, keys only on one side and untidy text that sanitize has to clean up.
+
+_CHUNK = 1_000_000
+_CCYS = np.array(['USD', 'EUR', 'GBP', 'JPY', 'CHF', 'AUD', 'CAD', 'INR', 'SGD', 'HKD'])
+_LETTERS = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+_ASOF = np.datetime64('2025-01-01')
+
+
+@dataclass(frozen=True)
+class SynthSpec:
+    rows: int = 100_000
+    keys: Optional[int] = None  # distinct trade ids per side; default rows * (1 - dup_rate)
+    dup_rate: float = 0.0  # fraction of rows repeating another row's trade id (within a side)
+    mismatch_rate: float = 0.01  # fraction of B rows whose amount is off by 1-1000
+    orphan_rate: float = 0.001  # fraction of B rows carrying a trade id A doesn't have (and vice versa)
+    books: int = 50
+    desks: int = 200
+    ccys: int = 5
+    width: int = 0  # extra text columns attr_1..attr_<width>
+    str_len: int = 12  # length of the attr_* values
+    seed: int = 0
+
+    @property
+    def n_keys(self) -> int:
+        return max(1, int(self.keys or round(self.rows * (1 - self.dup_rate))))
+
+    def fingerprint(self) -> str:
+        return sha256_text(json.dumps(asdict(self), sort_keys=True))[:16]
+
+
+def _labels(prefix: str, ids: np.ndarray, width: int) -> np.ndarray:
+    if not len(ids):
+        return np.array([], dtype=f'<U{len(prefix) + width}')
+    return np.char.add(prefix, np.char.zfill(ids.astype(str), width))
+
+
+def _side_chunk(spec: SynthSpec, start: int, stop: int) -> pd.DataFrame:
+    """Rows [start, stop) of A. Everything is a function of the row number and the chunk's stream."""
+    rng = np.random.default_rng([spec.seed, start])
+    n = stop - start
+    row = np.arange(start, stop, dtype=np.int64)
+    key = row % spec.n_keys  # rows past n_keys repeat earlier trade ids
+    # dimensions hang off the trade id, so a duplicated trade keeps its book/desk/ccy
+    book = (key * 2654435761) % spec.books
+    desk = book * max(1, spec.desks // spec.books) + (key % max(1, spec.desks // spec.books))
+    ccy = (key // 7) % min(spec.ccys, len(_CCYS))
+    df = pd.DataFrame({
+        'trade_id': _labels('T', key, 10),
+        'book': _labels('BOOK', book, 3),
+        'desk': _labels('DESK', desk, 4),
+        'ccy': _CCYS[ccy],
+        'asof_date': (_ASOF + (key % 5).astype('timedelta64[D]')).astype(str),
+        'amount': np.round(rng.normal(1e5, 5e4, n), 2),
+        'qty': rng.integers(1, 1000, n),
+    })
+    for i in range(1, spec.width + 1):
+        codes = rng.integers(0, len(_LETTERS), (n, spec.str_len))
+        df[f'attr_{i}'] = _LETTERS[codes].view(f'<U{spec.str_len}').ravel()
+    return df
+
+
+def _b_chunk(spec: SynthSpec, a: pd.DataFrame, start: int) -> pd.DataFrame:
+    rng = np.random.default_rng([spec.seed, start, 1])
+    b = a.copy()
+    n = len(b)
+    off = rng.random(n) < spec.mismatch_rate
+    b.loc[off, 'amount'] = np.round(b.loc[off, 'amount'] + rng.uniform(1, 1000, int(off.sum())), 2)
+    # orphans: these B rows get trade ids past A's range (A keeps the originals, unmatched)
+    orphan = rng.random(n) < spec.orphan_rate
+    b.loc[orphan, 'trade_id'] = _labels('T', spec.n_keys + np.arange(start, start + n)[orphan], 10)
+    # untidy text: lower case and padding that trim_strings / upper_case undo
+    messy = rng.random(n) < 0.1
+    b.loc[messy, 'book'] = b.loc[messy, 'book'].str.lower() + ' '
+    return b
+
+
+def iter_pairs(spec: SynthSpec, chunk_rows: int = _CHUNK) -> Iterator[tuple[pd.DataFrame, pd.DataFrame]]:
+    """(A, B) chunks covering spec.rows rows per side."""
+    for start in range(0, spec.rows, chunk_rows):
+        a = _side_chunk(spec, start, min(start + chunk_rows, spec.rows))
+        yield a, _b_chunk(spec, a, start)
+
+
+def generate(spec: SynthSpec) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """A and B in memory (small sizes; use write_inputs for large ones)."""
+    parts = list(iter_pairs(spec))
+    if not parts:
+        empty = _side_chunk(spec, 0, 0)
+        return empty, empty.copy()
+    return (pd.concat([a for a, _ in parts], ignore_index=True),
+            pd.concat([b for _, b in parts], ignore_index=True))
+
+
+def write_inputs(spec: SynthSpec, directory: str | Path, fmt: str = 'csv', chunk_rows: int = _CHUNK) -> tuple[Path, Path]:
+    """Write A/B as <directory>/<fingerprint>/{A,B}.<fmt>; files from an identical spec are reused."""
+    out = Path(directory) / f"{spec.fingerprint()}-{fmt}"
+    paths = (out / f"A.{fmt}", out / f"B.{fmt}")
+    manifest = out / 'spec.json'
+    if manifest.exists() and all(p.exists() for p in paths):
+        return paths
+    out.mkdir(parents=True, exist_ok=True)
+    manifest.unlink(missing_ok=True)
+    writers = [None, None]
+    try:
+        for i, pair in enumerate(iter_pairs(spec, chunk_rows)):
+            for side, (df, path) in enumerate(zip(pair, paths)):
+                if fmt == 'csv':
+                    df.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+                elif fmt == 'parquet':
+                    import pyarrow as pa
+                    import pyarrow.parquet as pq
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    if writers[side] is None:
+                        writers[side] = pq.ParquetWriter(path, table.schema, compression='zstd')
+                    writers[side].write_table(table)
+                else:
+                    raise ValueError(f"bench: unsupported format {fmt!r}; expected csv or parquet")
+            log.debug("bench: wrote rows up to %d", min((i + 1) * chunk_rows, spec.rows))
+    finally:
+        for w in writers:
+            if w is not None:
+                w.close()
+    manifest.write_text(json.dumps(asdict(spec), indent=2))
+    log.info("bench: generated %d rows per side in %s", spec.rows, out)
+    return paths
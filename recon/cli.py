@@ -1,20 +1,89 @@
 import argparse, json, sys
 from pathlib import Path
 from recon.core.pipeline import run_job
+from recon.backends import BACKENDS
 from recon.logging_setup import setup_logging, install_excepthook
 import logging
 
+def batch(argv):
+    from recon.core.batch import expand_configs, format_summary, run_batch
+    p = argparse.ArgumentParser(prog='python -m recon.cli batch', description='Run many job configs on a worker pool')
+    p.add_argument('configs', nargs='+', help='YAML paths or glob patterns')
+    p.add_argument('--out', required=True, help='Root output directory (one sub-directory per job)')
+    p.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    p.add_argument('--memory-mb', type=float, default=None,
+                   help='Memory budget for concurrently running jobs (default: 80%% of available memory)')
+    p.add_argument('--backend', default=None, choices=sorted(BACKENDS), help='Engine for every job (default: job.backend)')
+    p.add_argument('--log-level', default='INFO')
+    cache = p.add_mutually_exclusive_group()
+    cache.add_argument('--no-cache', action='store_true', help='Neither read nor write the prepared-input cache')
+    cache.add_argument('--refresh-cache', action='store_true', help='Re-read inputs and overwrite their cache entries')
+    p.add_argument('--profile', nargs='?', const='cprofile', default=None, choices=['cprofile', 'pyinstrument'])
+    args = p.parse_args(argv)
+    setup_logging(level=args.log_level, log_dir="logs", run_id='batch')
+    install_excepthook('recon.cli')
+    try:
+        configs = expand_configs(args.configs)
+        if not configs:
+            p.error('no config matched')
+        summary = run_batch(configs, args.out, workers=args.workers, memory_mb=args.memory_mb,
+                            backend_name=args.backend, use_cache=not args.no_cache,
+                            refresh_cache=args.refresh_cache, profile=args.profile)
+        print(format_summary(summary))
+    except Exception:
+        logging.getLogger(__name__).exception("Batch Failed")
+        sys.exit(1)
+    finally:
+        logging.shutdown()
+    sys.exit(1 if summary['failed'] else 0)
+
+def serve(argv):
+    from recon.core.service import ReconService
+    p = argparse.ArgumentParser(prog='python -m recon.cli serve', description='Long-running service with warm workers')
+    p.add_argument('--port', type=int, default=8765, help='Local HTTP port (0: any free port)')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--no-http', action='store_true', help='Only take jobs from --queue-dir')
+    p.add_argument('--queue-dir', default=None, help='Drop directory for configs (*.yaml) and job requests (*.json)')
+    p.add_argument('--workers', type=int, default=2, help='Warm worker processes')
+    p.add_argument('--cache-mb', type=int, default=2048, help='In-memory cache of prepared inputs, split across workers')
+    p.add_argument('--out', default='service_runs', help='Root output directory (one sub-directory per job)')
+    p.add_argument('--backend', default=None, choices=sorted(BACKENDS), help='Engine for jobs that don\'t name one')
+    p.add_argument('--log-level', default='INFO')
+    args = p.parse_args(argv)
+    if args.no_http and not args.queue_dir:
+        p.error('--no-http needs --queue-dir')
+    setup_logging(level=args.log_level, log_dir="logs", run_id='service')
+    install_excepthook('recon.cli')
+    service = ReconService(workers=args.workers, cache_mb=args.cache_mb, out_root=args.out, queue_dir=args.queue_dir,
+                           host=args.host, port=None if args.no_http else args.port, backend=args.backend)
+    import signal
+    signal.signal(signal.SIGTERM, lambda *_: service._stop.set())  # serve_forever returns and stops the workers
+    try:
+        service.start().serve_forever()
+    finally:
+        logging.shutdown()
+
 def main():
+    if sys.argv[1:2] == ['batch']:
+        return batch(sys.argv[2:])
+    if sys.argv[1:2] == ['serve']:
+        return serve(sys.argv[2:])
     p = argparse.ArgumentParser(description="Config-driven reconciliation")
     p.add_argument('--config', required=True, help='YAML path')
     p.add_argument('--out', required=True, help='Output directory')
-    p.add_argument('--backend', default='pandas', choices=['pandas'])
+    p.add_argument('--backend', default=None, choices=sorted(BACKENDS), help='Engine (default: job.backend, else pandas)')
     p.add_argument('--log-level', default='INFO')
+    cache = p.add_mutually_exclusive_group()
+    cache.add_argument('--no-cache', action='store_true', help='Neither read nor write the prepared-input cache')
+    cache.add_argument('--refresh-cache', action='store_true', help='Re-read inputs and overwrite their cache entries')
+    p.add_argument('--profile', nargs='?', const='cprofile', default=None, choices=['cprofile', 'pyinstrument'],
+                   help='Also capture the run with cProfile (default) or pyinstrument into the output directory')
     args = p.parse_args()
     log_file = setup_logging(level=args.log_level, log_dir="logs")
     install_excepthook('recon.cli')
     try:
-        run_job(config_path=args.config, out_dir=args.out, backend_name=args.backend)
+        run_job(config_path=args.config, out_dir=args.out, backend_name=args.backend,
+                use_cache=not args.no_cache, refresh_cache=args.refresh_cache, profile=args.profile)
     except:
         logging.getLogger(__name__).exception("Run Failed")
         sys.exit(1)
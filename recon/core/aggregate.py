@@ -1,4 +1,5 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 from typing import Dict
 
@@ -29,12 +30,162 @@ def aggregate(df: pd.DataFrame, spec: Dict) -> pd.DataFrame:
     for col, cfg in metrics.items():
         agg = cfg.get('agg', 'sum')
         agg_dict[col] = _AGG_MAP.get(agg, 'sum')
-    g = df.groupby(group_by, dropna=False, as_index=False).agg(agg_dict)
+    # observed: categorical keys (dtype plan) only yield the groups that occur, like object keys
+    g = df.groupby(group_by, dropna=False, observed=True, as_index=False).agg(agg_dict)
     log.debug("aggregate: result shape=%s", getattr(g, 'shape', None))
     # DEBUG: uncomment to inspect a sample
     # log.debug("aggregate head:\n%s", g.head(5))
     return g
 
+# How an already-aggregated frame is re-aggregated to a coarser grouping (drilldown roll-ups).
+# first/last/nunique are not listed: they cannot be recovered from per-group results.
+_ROLLUP_MAP = {
+    'sum': 'sum',
+    'count': 'sum',
+    'min': 'min',
+    'max': 'max',
+}
+
+def rollup_spec(spec):
+    """Copy of `spec` whose metrics re-aggregate its own output; None if some metric can't roll up."""
+    metrics = getattr(spec, 'metrics', {}) or {}
+    rolled = {}
+    for col, cfg in metrics.items():
+        agg = _AGG_MAP.get(cfg.get('agg', 'sum'), 'sum')
+        if agg not in _ROLLUP_MAP:
+            return None
+        rolled[col] = {**cfg, 'agg': _ROLLUP_MAP[agg]}
+    return spec.model_copy(update={'metrics': rolled})
+
+# === Streaming (partial) aggregation ===
+# How per-chunk partials of each agg are folded together.
+_MERGE_MAP = {
+    'sum': 'sum',
+    'count': 'sum',
+    'min': 'min',
+    'max': 'max',
+    'first': 'first',
+    'last': 'last',
+}
+
+_DISTINCT_MODES = ('exact', 'hll')
+_DEF_HLL_PRECISION = 12
+_REG = '__hll_reg'
+_RANK = '__hll_rank'
+_ROWS = '__rows'
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    x = x.copy()
+    n = np.zeros(len(x), dtype=np.int64)
+    for s in (32, 16, 8, 4, 2, 1):
+        m = x >= np.uint64(1 << s)
+        n[m] += s
+        x[m] >>= np.uint64(s)
+    return n + (x > 0)
+
+
+def _hll_registers(keys: pd.DataFrame, values: pd.Series, p: int) -> pd.DataFrame:
+    """HyperLogLog registers (max rank per group/register) for one chunk."""
+    keep = values.notna().to_numpy()
+    keys, values = keys[keep], values[keep]
+    h = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+    rest_bits = 64 - p
+    rest = h & np.uint64((1 << rest_bits) - 1)
+    regs = keys.reset_index(drop=True)
+    regs[_REG] = (h >> np.uint64(rest_bits)).astype(np.int64)
+    regs[_RANK] = rest_bits - _bit_length(rest) + 1
+    return regs
+
+
+def _hll_estimate(regs: pd.DataFrame, group_by: list[str], p: int) -> pd.DataFrame:
+    m = 1 << p
+    alpha = 0.7213 / (1 + 1.079 / m)
+    tmp = regs[group_by].copy()
+    tmp['__z'] = np.exp2(-regs[_RANK].to_numpy(dtype=np.float64))
+    g = tmp.groupby(group_by, dropna=False, observed=True, as_index=False).agg(__z=('__z', 'sum'), __n=('__z', 'size'))
+    zeros = m - g['__n'].to_numpy()
+    est = alpha * m * m / (g['__z'].to_numpy() + zeros)
+    small = (est <= 2.5 * m) & (zeros > 0)
+    est[small] = m * np.log(m / zeros[small])
+    g['__est'] = np.rint(est).astype(np.int64)
+    return g[group_by + ['__est']]
+
+
+class StreamingAggregator:
+    """Fold chunks into per-group partials; memory follows the number of groups, not rows.
+
+    Combinable aggs (sum/count/min/max/first/last) keep one running partial frame.
+    `nunique` keeps a per-metric distinct tracker chosen with `distinct` in the metric cfg:
+    `exact` (default) keeps the distinct (group, value) pairs, `hll` keeps a HyperLogLog
+    sketch per group (`precision` bits, default 12).
+    """
+
+    def __init__(self, spec):
+        self.group_by = list(getattr(spec, 'group_by', []) or [])
+        metrics = getattr(spec, 'metrics', {}) or {}
+        if not self.group_by:
+            raise ValueError('StreamingAggregator requires aggregate.group_by')
+        self.order = list(metrics.keys())
+        self.partial = {}
+        self.distinct = {}
+        for col, cfg in metrics.items():
+            agg = _AGG_MAP.get(cfg.get('agg', 'sum'), 'sum')
+            if agg == 'nunique':
+                mode = cfg.get('distinct', 'exact')
+                if mode not in _DISTINCT_MODES:
+                    raise ValueError(f"aggregate: unknown distinct mode {mode!r} for {col}; expected one of {_DISTINCT_MODES}")
+                self.distinct[col] = (mode, int(cfg.get('precision', _DEF_HLL_PRECISION)))
+            else:
+                self.partial[col] = agg
+        self._state: pd.DataFrame | None = None
+        self._distinct_state: dict[str, pd.DataFrame] = {}
+        self.rows_in = 0
+
+    def _fold(self, running: pd.DataFrame | None, part: pd.DataFrame, how: dict, keys: list[str] | None = None) -> pd.DataFrame:
+        if running is None:
+            return part
+        both = pd.concat([running, part], ignore_index=True)
+        return both.groupby(keys or self.group_by, dropna=False, observed=True, as_index=False, sort=False).agg(how)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self.rows_in += len(chunk)
+        g = chunk.groupby(self.group_by, dropna=False, observed=True, as_index=False, sort=False)
+        if self.partial:
+            part = g.agg(self.partial)
+            merge = {c: _MERGE_MAP[a] for c, a in self.partial.items()}
+        else:
+            part = g.size().rename(columns={'size': _ROWS})
+            merge = {_ROWS: 'sum'}
+        self._state = self._fold(self._state, part, merge)
+        for col, (mode, p) in self.distinct.items():
+            prev = self._distinct_state.get(col)
+            if mode == 'exact':
+                part = chunk[self.group_by + [col]].drop_duplicates()
+                cur = part if prev is None else pd.concat([prev, part], ignore_index=True).drop_duplicates()
+            else:
+                keys = self.group_by + [_REG]
+                regs = _hll_registers(chunk[self.group_by], chunk[col], p)
+                part = regs.groupby(keys, dropna=False, observed=True, as_index=False, sort=False).agg({_RANK: 'max'})
+                cur = self._fold(prev, part, {_RANK: 'max'}, keys=keys)
+            self._distinct_state[col] = cur
+
+    def result(self) -> pd.DataFrame:
+        if self._state is None:
+            return pd.DataFrame(columns=self.group_by + self.order)
+        out = self._state.sort_values(self.group_by, kind='stable', na_position='last').reset_index(drop=True)
+        for col, (mode, p) in self.distinct.items():
+            cur = self._distinct_state[col]
+            if mode == 'exact':
+                nu = cur.groupby(self.group_by, dropna=False, observed=True, as_index=False).agg({col: 'nunique'})
+            else:
+                nu = _hll_estimate(cur, self.group_by, p).rename(columns={'__est': col})
+            out = out.merge(nu, on=self.group_by, how='left')
+            out[col] = out[col].fillna(0).astype('int64')
+        log.info("aggregate(streaming): rows_in=%d groups=%d", self.rows_in, len(out))
+        return out[self.group_by + self.order]
+
+
 # Optional (signature only)
 
 def pivot_table(df: pd.DataFrame, index: list[str], columns: list[str], values: str, aggfunc: str = 'sum') -> pd.DataFrame:
@@ -0,0 +1,321 @@
+from __future__ import annotations
+import glob
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .cache import open_cache
+
+import logging
+log = logging.getLogger(__name__)
+
+# Batch mode: many job configs in one invocation. Jobs run on a pool of worker processes that
+# stay up for the whole batch (pandas, pyarrow and the backends are imported once per worker, not
+# once per job). A job is started only while the estimated memory of everything running stays
+# under the budget. Inputs that several jobs would prepare identically (same file, read settings
+# and columns, i.e. the same prepared-input cache entry) are read once: the first job fills the
+# cache and the others wait for it, then load the cached frame. Jobs without a cache of their own
+# share one under <out>/.cache. One summary with per-job timings, row counts and match rates is
+# written at the end.
+
+_SUMMARY = 'batch_summary.json'
+_CACHE_DIR = '.cache'  # under --out: the cache of jobs that don't enable job.cache
+_MB = 1024 * 1024
+_MEMORY_SHARE = 0.8  # default budget: this share of the memory available when the batch starts
+# without a previous run profile, a job is assumed to need this multiple of its input files' size
+_TEXT_FACTOR = 5
+_COLUMNAR_FACTOR = 10
+_MIN_JOB_MB = 200
+
+
+@dataclass
+class BatchJob:
+    config: str
+    out_dir: str
+    name: str = ''
+    backend: Optional[str] = None
+    report_dir: str = ''
+    estimate_mb: float = _MIN_JOB_MB
+    inputs: list[str] = field(default_factory=list)  # shared-read signatures of its A/B sides
+    after: set[int] = field(default_factory=set)  # jobs that must finish first
+    reused: int = 0  # sides whose input another job prepares first
+    summary: Optional[dict] = None
+
+
+def expand_configs(patterns: Iterable[str]) -> list[str]:
+    """Config paths from files and glob patterns (quoted globs too), in order, without repeats."""
+    out = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            log.warning("batch: %s matches no config", pattern)
+        out += matches
+    return list(dict.fromkeys(out))
+
+
+def available_memory_mb() -> Optional[float]:
+    # MemAvailable (Linux); None elsewhere
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _profile_estimate(out_dir: Path) -> Optional[float]:
+    """Memory the job's previous run grew by, from its run_profile.json."""
+    try:
+        doc = json.loads((out_dir / 'run_profile.json').read_text())
+    except (OSError, ValueError):
+        return None
+    stages = [s for s in doc.get('stages', []) if s.get('rss_end_mb') is not None]
+    if not stages or doc.get('status') != 'ok':
+        return None
+    start = min(s['rss_start_mb'] for s in stages if s.get('rss_start_mb') is not None)
+    return max(s['rss_end_mb'] for s in stages) - start
+
+
+def _input_estimate(cfg) -> float:
+    total = 0.0
+    for side in (cfg.inputs.A, cfg.inputs.B):
+        try:
+            size = os.path.getsize(side.path)
+        except OSError:
+            continue
+        factor = _TEXT_FACTOR if side.format == 'csv' else _COLUMNAR_FACTOR
+        total += size * factor / _MB
+    return total
+
+
+def _plan_job(config: str, out_root: Path, backend_name: Optional[str], use_cache: bool, taken: set) -> BatchJob:
+    from .pipeline import _load_config, _required_columns
+    cfg, _ = _load_config(config)
+    name = getattr(cfg.job, 'name', None) or Path(config).stem
+    # one output directory per job; configs sharing a job name get the config's stem appended,
+    # then a counter if that is taken too (e.g. */job.yaml)
+    out_name = name if name not in taken else f"{name}-{Path(config).stem}"
+    n = 2
+    while out_name in taken:
+        out_name, n = f"{name}-{Path(config).stem}-{n}", n + 1
+    taken.add(out_name)
+    job = BatchJob(config=config, out_dir=str(out_root / out_name), name=out_name,
+                   backend=backend_name or getattr(cfg.job, 'backend', None) or 'pandas',
+                   report_dir=str(Path(cfg.report.outputs.dir).resolve()))
+    previous = _profile_estimate(Path(job.out_dir))
+    job.estimate_mb = max(_MIN_JOB_MB, previous if previous is not None else _input_estimate(cfg))
+    cache = open_cache(cfg.job, enabled=use_cache, default_dir=str(out_root / _CACHE_DIR))
+    if cache is None:
+        return job
+    dd = getattr(cfg, 'drilldown', None)
+    drill = bool(dd and getattr(dd, 'enabled', False) and getattr(dd, 'levels', None))
+    for label in ('A', 'B'):
+        side_cfg = getattr(cfg.inputs, label)
+        columns = _required_columns(cfg, label)
+        # the cache entries run_job would look up for this side (see pipeline._prep_side), with the file
+        # identified by path/size/mtime: the workers hash the contents, in parallel
+        key = cache.key(side_cfg, job.backend, columns, content=False)
+        if key is None:
+            continue
+        if not drill:
+            key += '/' + (cache.key(side_cfg, job.backend, columns, content=False,
+                                    aggregate=getattr(getattr(cfg, 'aggregate', None), label, None)) or '')
+        job.inputs.append(f"{cache.dir.resolve()}/{key}")
+    return job
+
+
+def plan_batch(configs: list[str], out_root: str | Path, backend_name: Optional[str] = None,
+               use_cache: bool = True) -> list[BatchJob]:
+    """Jobs in run order, with their memory estimates and shared-read dependencies."""
+    out_root = Path(out_root)
+    taken: set = set()
+    jobs = []
+    for c in configs:
+        try:
+            jobs.append(_plan_job(c, out_root, backend_name, use_cache, taken))
+        except Exception as e:  # a config that doesn't load fails alone, not the batch
+            log.error("batch: cannot plan %s: %s", c, e)
+            job = BatchJob(config=c, out_dir=str(out_root / Path(c).stem), name=Path(c).stem)
+            job.summary = {**_job_summary(c, job.out_dir, 'failed', f"{type(e).__name__}: {e}", 0.0), 'name': job.name}
+            jobs.append(job)
+    first: dict[str, int] = {}
+    for i, job in enumerate(jobs):
+        for sig in job.inputs:
+            if sig in first and first[sig] != i:
+                job.after.add(first[sig])
+                job.reused += 1
+            else:
+                first.setdefault(sig, i)
+    # jobs writing their reports into the same directory would overwrite each other: run them in turn
+    report_dirs: dict[str, int] = {}
+    for i, job in enumerate(jobs):
+        d = job.report_dir
+        if job.summary is not None:
+            continue
+        if d in report_dirs:
+            log.warning("batch: %s and %s both write reports to %s; running them one after the other",
+                        jobs[report_dirs[d]].name, job.name, d)
+            job.after.add(report_dirs[d])
+        report_dirs[d] = i
+    shared = sum(j.reused for j in jobs)
+    if shared:
+        log.info("batch: %d input reads are shared with an earlier job", shared)
+    return jobs
+
+
+def _job_summary(config: str, out_dir: str, status: str, error: Optional[str], wall_s: float) -> dict:
+    out = {'config': config, 'out_dir': out_dir, 'status': status, 'error': error, 'wall_s': round(wall_s, 3),
+           'worker': os.getpid()}
+    try:
+        doc = json.loads((Path(out_dir) / 'run_profile.json').read_text())
+    except (OSError, ValueError):
+        doc = {}
+    out['cpu_s'] = doc.get('cpu_s')
+    stages = doc.get('stages', [])
+    out['stages'] = {s['stage']: s['wall_s'] for s in stages if 'level' not in s}
+    for s in stages:
+        if s['stage'] in ('read+prep A', 'read+prep B') and s.get('frames_out'):
+            out[f"rows_{s['stage'][-1]}"] = s['frames_out'][0].get('rows')
+    try:
+        from .pipeline import _load_config
+        cfg, _ = _load_config(config)
+        metrics = json.loads((Path(cfg.report.outputs.dir) / 'metrics.json').read_text()) if status == 'ok' else {}
+    except Exception:  # a broken config already failed the job
+        metrics = {}
+    for k in ('total', 'matched', 'non_matched'):
+        out[k] = metrics.get(k)
+    total, matched = metrics.get('total'), metrics.get('matched')
+    out['match_rate'] = round(matched / total, 6) if total and matched is not None else None
+    return out
+
+
+def run_batch_job(config: str, out_dir: str, backend_name: Optional[str] = None, use_cache: bool = True,
+                  refresh_cache: bool = False, profile: Optional[str] = None, cache_dir: Optional[str] = None) -> dict:
+    """Run one job in a worker; returns its summary (never raises for a failed job)."""
+    from .pipeline import run_job
+    t0 = time.perf_counter()
+    status, error = 'ok', None
+    try:
+        run_job(config, out_dir, backend_name=backend_name, use_cache=use_cache, refresh_cache=refresh_cache,
+                profile=profile, cache_dir=cache_dir)
+    except Exception as e:  # run_job has logged the traceback
+        status, error = 'failed', f"{type(e).__name__}: {e}"
+    return _job_summary(config, out_dir, status, error, time.perf_counter() - t0)
+
+
+def _init_worker(level: int):
+    # spawned workers (macOS/Windows) start without the parent's logging setup
+    root = logging.getLogger()
+    if not root.handlers:
+        logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s [%(process)d] - %(message)s")
+    # imported here once, not per job
+    from . import pipeline  # noqa: F401
+
+
+def run_batch(configs: list[str], out_root: str | Path, workers: Optional[int] = None,
+              memory_mb: Optional[float] = None, backend_name: Optional[str] = None, use_cache: bool = True,
+              refresh_cache: bool = False, profile: Optional[str] = None) -> dict:
+    """Run every config on a worker pool; returns the summary (also written to <out_root>/batch_summary.json)."""
+    t0 = time.perf_counter()
+    out_root = Path(out_root)
+    out_root.mkdir(parents=True, exist_ok=True)
+    jobs = plan_batch(configs, out_root, backend_name=backend_name, use_cache=use_cache)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    if memory_mb is None:
+        avail = available_memory_mb()
+        memory_mb = avail * _MEMORY_SHARE if avail is not None else None
+    log.info("batch: %d jobs, %d workers, memory budget %s MB", len(jobs), workers,
+             f"{memory_mb:.0f}" if memory_mb is not None else 'unlimited')
+
+    pending = [i for i, j in enumerate(jobs) if j.summary is None]
+    done: set[int] = {i for i, j in enumerate(jobs) if j.summary is not None}
+    running: dict = {}  # future -> job index
+    in_flight_mb = 0.0
+    started: dict[int, float] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(logging.getLogger().level,)) as pool:
+        while pending or running:
+            # start whatever is ready and fits; an oversized job runs once the pool is idle
+            for i in list(pending):
+                if len(running) >= workers:
+                    break
+                job = jobs[i]
+                if not job.after <= done:
+                    continue
+                if memory_mb is not None and running and in_flight_mb + job.estimate_mb > memory_mb:
+                    continue
+                pending.remove(i)
+                started[i] = time.perf_counter()
+                in_flight_mb += job.estimate_mb
+                # with --refresh-cache only the first reader of a shared input re-reads it
+                fut = pool.submit(run_batch_job, job.config, job.out_dir, backend_name, use_cache,
+                                  refresh_cache and not job.reused, profile, str(out_root / _CACHE_DIR))
+                running[fut] = i
+                log.info("batch: started %s (~%.0f MB, %d running)", job.name, job.estimate_mb, len(running))
+            if not running:  # nothing fits or is ready: can't happen unless dependencies are cyclic
+                raise RuntimeError(f"batch: no runnable job among {[jobs[i].name for i in pending]}")
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                i = running.pop(fut)
+                job = jobs[i]
+                in_flight_mb -= job.estimate_mb
+                done.add(i)
+                try:
+                    job.summary = fut.result()
+                except Exception as e:  # the worker itself died (e.g. killed for memory)
+                    job.summary = _job_summary(job.config, job.out_dir, 'failed', f"{type(e).__name__}: {e}",
+                                               time.perf_counter() - started[i])
+                job.summary.update(name=job.name, estimate_mb=round(job.estimate_mb, 1), shared_reads=job.reused,
+                                   waited_for=[jobs[d].name for d in sorted(job.after)])
+                log.info("batch: %s %s in %.2fs (%d/%d done)", job.name, job.summary['status'],
+                         job.summary['wall_s'], len(done), len(jobs))
+    summary = summarize(jobs, time.perf_counter() - t0, workers, memory_mb)
+    path = out_root / _SUMMARY
+    path.write_text(json.dumps(summary, indent=2))
+    log.info("batch: summary written to %s", path)
+    return summary
+
+
+def summarize(jobs: list[BatchJob], wall_s: float, workers: int, memory_mb: Optional[float]) -> dict:
+    rows = [j.summary for j in jobs if j.summary is not None]
+    failed = [r['name'] for r in rows if r['status'] != 'ok']
+    job_wall = sum(r['wall_s'] for r in rows)
+    total = sum(r.get('total') or 0 for r in rows)
+    matched = sum(r.get('matched') or 0 for r in rows)
+    return {
+        'jobs': len(jobs),
+        'ok': len(rows) - len(failed),
+        'failed': failed,
+        'workers': workers,
+        'memory_budget_mb': round(memory_mb, 1) if memory_mb is not None else None,
+        'wall_s': round(wall_s, 3),
+        'job_wall_s': round(job_wall, 3),  # sum over jobs; / wall_s is the effective parallelism
+        'shared_reads': sum(j.reused for j in jobs),
+        'total': total,
+        'matched': matched,
+        'match_rate': round(matched / total, 6) if total else None,
+        'results': rows,
+    }
+
+
+def format_summary(summary: dict) -> str:
+    """The summary as a fixed-width table, one line per job."""
+    lines = [f"{'job':<32} {'status':<7} {'wall_s':>8} {'rows_A':>11} {'rows_B':>11} {'total':>10} {'match_rate':>10}"]
+    for r in summary['results']:
+        rate = f"{r['match_rate']:.4f}" if r.get('match_rate') is not None else '-'
+        fmt = lambda v: '-' if v is None else str(v)
+        lines.append(f"{r['name'][:32]:<32} {r['status']:<7} {r['wall_s']:>8.2f} {fmt(r.get('rows_A')):>11} "
+                     f"{fmt(r.get('rows_B')):>11} {fmt(r.get('total')):>10} {rate:>10}")
+    lines.append(f"{summary['ok']}/{summary['jobs']} ok in {summary['wall_s']:.2f}s "
+                 f"(job time {summary['job_wall_s']:.2f}s on {summary['workers']} workers, "
+                 f"{summary['shared_reads']} shared reads)")
+    for r in summary['results']:
+        if r['status'] != 'ok':
+            lines.append(f"FAILED {r['name']}: {r['error']}")
+    return '\n'.join(lines)
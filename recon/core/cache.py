@@ -0,0 +1,307 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from .utils import sha256_text
+
+import logging
+log = logging.getLogger(__name__)
+
+# bump when the shape of cached frames changes so old entries are never read back
+_CACHE_VERSION = 1
+_INDEX = 'fingerprints.json'
+_HASH_BLOCK = 1 << 20
+# ReadCfg fields that change how a file is read, not what comes out of it
+_NOT_IN_KEY = {'chunksize'}
+
+
+def _dump(obj: Any) -> Any:
+    if obj is None:
+        return None
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump(mode='json')
+    return obj
+
+
+class PreparedCache:
+    """On-disk cache of prepared (read + sanitize + prefilter) input frames.
+
+    Entries are Parquet files named by a key built from the input file's fingerprint
+    (size, mtime and content hash) and the hash of the side's ReadCfg, so any change to
+    either misses. The directory is kept under `max_bytes` by evicting the least recently
+    used entries (a hit refreshes the entry's mtime).
+    """
+
+    def __init__(self, directory: str, max_bytes: int, refresh: bool = False):
+        self.dir = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self.refresh = refresh
+        self._lock = threading.Lock()
+
+    # --- keys ---
+    def _content_hash(self, path: Path, size: int, mtime_ns: int) -> str:
+        # hashing is still far cheaper than parsing, but skip it while size/mtime are unchanged
+        index_path = self.dir / _INDEX
+        with self._lock:
+            try:
+                index = json.loads(index_path.read_text())
+            except (OSError, ValueError):
+                index = {}
+            known = index.get(str(path))
+            if known and known.get('size') == size and known.get('mtime_ns') == mtime_ns:
+                return known['sha256']
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            try:
+                index = json.loads(index_path.read_text())
+            except (OSError, ValueError):
+                index = {}
+            index[str(path)] = {'size': size, 'mtime_ns': mtime_ns, 'sha256': digest}
+            self.dir.mkdir(parents=True, exist_ok=True)
+            tmp = index_path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_text(json.dumps(index, indent=2))
+            os.replace(tmp, index_path)
+        return digest
+
+    def fingerprint(self, path: str) -> dict:
+        p = Path(path).resolve()
+        st = p.stat()
+        return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': self._content_hash(p, st.st_size, st.st_mtime_ns)}
+
+    def key(self, read_cfg, backend: str, columns=None, aggregate=None, content: bool = True) -> Optional[str]:
+        """Cache key for one input side; None (don't cache) when the file can't be fingerprinted.
+
+        content=False identifies the file by path, size and mtime instead of hashing it: cheap enough
+        to group reads up front (batch planning), but not what entries are stored under."""
+        read = {k: v for k, v in (_dump(read_cfg) or {}).items() if k not in _NOT_IN_KEY}
+        try:
+            if content:
+                file = self.fingerprint(read_cfg.path)['sha256']
+            else:
+                st = Path(read_cfg.path).resolve().stat()
+                file = {'path': str(Path(read_cfg.path).resolve()), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        except OSError as e:
+            log.warning("cache: cannot fingerprint %s (%s); reading uncached", read_cfg.path, e)
+            return None
+        payload = {
+            'version': _CACHE_VERSION,
+            'backend': backend,
+            # the content hash identifies the data; size/mtime only gate re-hashing
+            'file': file,
+            'read': read,
+            'columns': columns,
+            'aggregate': _dump(aggregate),
+        }
+        return sha256_text(json.dumps(payload, sort_keys=True, default=str))
+
+    def path(self, key: str) -> Path:
+        return self.dir / f"{key}.parquet"
+
+    # --- entries ---
+    def lookup(self, key: str) -> Optional[Path]:
+        p = self.path(key)
+        if self.refresh or not p.exists():
+            return None
+        try:
+            os.utime(p)  # LRU: a hit makes the entry the most recently used
+        except OSError:
+            return None
+        return p
+
+    def load(self, backend, key: Optional[str], label: str = ''):
+        """The cached frame for `key` as `backend` frame, or None on a miss."""
+        hit = self.lookup(key) if key else None
+        if hit is None:
+            return None
+        try:
+            df = backend.cache_read(hit)
+        except NotImplementedError:
+            return None
+        except Exception as e:  # a broken entry is a miss, never a failed run
+            log.warning("cache: unreadable entry %s (%s); re-reading %s", hit.name, e, label)
+            return None
+        log.info("cache: hit %s -> %s", label, hit.name)
+        return df
+
+    def store(self, backend, key: Optional[str], df, label: str = ''):
+        """Write `df` under `key` (then evict down to max_bytes); returns the frame to carry on with."""
+        if not key:
+            return df
+        self.dir.mkdir(parents=True, exist_ok=True)
+        # written under a temp name and renamed, so readers never see a partial entry
+        tmp = self.dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            df = backend.cache_write(df, tmp)
+            os.replace(tmp, self.path(key))
+            log.info("cache: stored %s -> %s", label, self.path(key).name)
+            self.evict(keep=self.path(key))
+        except NotImplementedError:
+            pass
+        except Exception as e:
+            log.warning("cache: could not store %s (%s)", label, e)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return df
+
+    def evict(self, keep: Optional[Path] = None):
+        with self._lock:
+            entries = []
+            for p in self.dir.glob('*.parquet'):
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+            total = sum(size for _, size, _ in entries)
+            for _, size, p in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                if keep is not None and p == keep:
+                    continue
+                try:
+                    p.unlink()
+                    total -= size
+                    log.info("cache: evicted %s (%d bytes)", p.name, size)
+                except OSError:
+                    pass
+
+
+class MemoryCache(PreparedCache):
+    """In-process LRU of pandas frames for long-running processes (core/service.py).
+
+    Keys are the PreparedCache keys, so a frame is found under the same key whether it was
+    prepared here or loaded from disk; content hashes are memoized per (path, size, mtime).
+    Besides prepared inputs it holds aggregates and joined frames (`memoize_aggregates`), so a
+    re-run that only changes reconcile/report settings skips reading, aggregating and joining. Frames are handed out and
+    kept as shallow copies: the pipeline adds columns to its frames (join's key codes) but never
+    writes into existing ones. Use over() to put it in front of a job's on-disk cache.
+    """
+    memoize_aggregates = True
+
+    def __init__(self, max_bytes: int):
+        super().__init__('', max_bytes)
+        self._entries: OrderedDict[str, tuple[Any, int, Optional[dict]]] = OrderedDict()
+        self._hashes: dict = {}
+        self.hits = self.misses = 0
+
+    def _content_hash(self, path: Path, size: int, mtime_ns: int) -> str:
+        known = self._hashes.get(str(path))
+        if known and known[:2] == (size, mtime_ns):
+            return known[2]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+                h.update(block)
+        self._hashes[str(path)] = (size, mtime_ns, h.hexdigest())
+        return h.hexdigest()
+
+    def get(self, key: Optional[str]):
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[0].copy(deep=False)
+
+    def put(self, key: Optional[str], df) -> None:
+        import pandas as pd
+        from .dtypes import memory_report
+        if not key or not isinstance(df, pd.DataFrame):
+            return  # lazy polars/duckdb frames live in their engine, not here
+        # the deep size walk is the expensive part of a warm run, so keep it for memory_report()
+        rep = memory_report(df)
+        size = rep['bytes'] + int(df.index.memory_usage(deep=True))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._entries[key] = (df.copy(deep=False), size, rep)
+            self._entries.move_to_end(key)
+            total = sum(e[1] for e in self._entries.values())
+            while total > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                total -= evicted[1]
+
+    def memory_report(self, key: Optional[str], df) -> Optional[dict]:
+        """dtypes.memory_report of `df`, reusing the one taken when it was cached under `key`."""
+        from .dtypes import memory_report
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+        return dict(entry[2]) if entry is not None and entry[2] is not None else memory_report(df)
+
+    def load(self, backend, key: Optional[str], label: str = ''):
+        df = self.get(key)
+        if df is not None:
+            log.info("cache: memory hit %s", label)
+        return df
+
+    def store(self, backend, key: Optional[str], df, label: str = ''):
+        self.put(key, df)
+        return df
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': sum(e[1] for e in self._entries.values()),
+                    'max_bytes': self.max_bytes, 'hits': self.hits, 'misses': self.misses}
+
+    def over(self, disk: Optional[PreparedCache]) -> 'TieredCache':
+        return TieredCache(self, disk)
+
+
+class TieredCache:
+    """A MemoryCache in front of a job's on-disk PreparedCache (or alone when the job has none)."""
+
+    def __init__(self, memory: MemoryCache, disk: Optional[PreparedCache]):
+        self.memory, self.disk = memory, disk
+        self.dir = disk.dir if disk is not None else None
+        self.max_bytes = memory.max_bytes
+        self.refresh = disk.refresh if disk is not None else False
+        self.memoize_aggregates = memory.memoize_aggregates
+
+    def key(self, read_cfg, backend: str, columns=None, aggregate=None) -> Optional[str]:
+        return (self.disk or self.memory).key(read_cfg, backend, columns, aggregate=aggregate)
+
+    def load(self, backend, key: Optional[str], label: str = ''):
+        if self.refresh:
+            return None
+        df = self.memory.load(backend, key, label)
+        if df is None and self.disk is not None:
+            df = self.disk.load(backend, key, label)
+            self.memory.put(key, df)
+        return df
+
+    def store(self, backend, key: Optional[str], df, label: str = '', memory_only: bool = False):
+        if self.disk is not None and not memory_only:
+            df = self.disk.store(backend, key, df, label)
+        self.memory.put(key, df)
+        return df
+
+    def memory_report(self, key: Optional[str], df) -> Optional[dict]:
+        return self.memory.memory_report(key, df)
+
+
+def open_cache(job_cfg, enabled: bool = True, refresh: bool = False,
+               default_dir: Optional[str] = None) -> Optional[PreparedCache]:
+    """The job's cache per job.cache and the CLI switches; None when caching is off.
+
+    `default_dir` (batch) is used when the job doesn't enable a cache of its own."""
+    if not enabled:
+        return None
+    cfg = getattr(job_cfg, 'cache', None)
+    if cfg is not None and getattr(cfg, 'enabled', False):
+        directory = getattr(cfg, 'dir', '.recon_cache')
+    elif default_dir is not None:
+        directory = default_dir
+    else:
+        return None
+    return PreparedCache(directory, int(getattr(cfg, 'max_size_mb', 2048)) * 1024 * 1024, refresh=refresh)
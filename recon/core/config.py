@@ -1,12 +1,20 @@
 # recon/core/config.py
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Literal
+from typing import Any, List, Dict, Optional, Literal, Union
 
 class SanitizeCfg(BaseModel):
     rename: Dict[str, str] = Field(default_factory=dict)
     select: List[str] = Field(default_factory=list)
     normalize: Dict[str, List[str] | bool] = Field(default_factory=dict)
 
+# Compact dtypes for the pandas backend (core/dtypes.py)
+class DtypePlanCfg(BaseModel):
+    enabled: bool = False  # opt-in
+    sample_rows: int = 100_000  # rows read up front to find low-cardinality text columns
+    max_categories: int = 10_000  # a text column with at most this many distinct values in the sample...
+    max_ratio: float = 0.2  # ...and at most this many per sampled row is read as category
+    downcast: Literal["none", "integer", "all"] = "integer"  # all: float64 -> float32 too (changes sums' rounding)
+
 class ReadCfg(BaseModel):
     path: str
     delimiter: str = ","
@@ -15,36 +23,79 @@ class ReadCfg(BaseModel):
     header: Optional[int] = 0
     sanitize: Optional[SanitizeCfg] = None
     prefilter: List[Dict] = Field(default_factory=list)
+    chunksize: Optional[int] = None  # set to stream the file in chunks (projection + prefilter per chunk)
+    format: Literal["csv", "parquet", "feather", "arrow"] = "csv"
+    compression: Optional[str] = None  # csv only: gzip/bz2/zip/xz/zstd; default infers from the extension
+    dtype_plan: DtypePlanCfg = Field(default_factory=DtypePlanCfg)
 
 class AggregateSpec(BaseModel):
     group_by: List[str] = Field(default_factory=list)
-    metrics: Dict[str, Dict[str, str]] = Field(default_factory=dict)
+    metrics: Dict[str, Dict[str, Any]] = Field(default_factory=dict)  # {col: {agg, distinct?, precision?}}
 
 # Typed wrapper for A/B aggregate
 class AggregateCfg(BaseModel):
     A: Optional[AggregateSpec] = None
     B: Optional[AggregateSpec] = None
 
+# A second-chance matching pass over keys left unmatched by the exact join
+class FuzzyJoinCfg(BaseModel):
+    on: str  # the join key allowed to differ
+    method: Literal["nearest", "string"] = "nearest"
+    by: Optional[List[str]] = None  # exact blocking keys; default: the other join keys
+    tolerance: Optional[Union[float, str]] = None  # nearest: max distance (seconds or "5s" for datetimes); None = any
+    threshold: float = 0.9  # string: min similarity (0-1) after normalization
+    prefix_block: int = 0  # string: also block on the first N normalized characters
+    max_block_pairs: int = 1_000_000  # string: skip blocks with more A x B candidates than this
+
+# What to do when a join key repeats on a side (checked before the merge)
+class DuplicateKeysCfg(BaseModel):
+    policy: Optional[Literal["allow", "report", "fail", "dedupe", "rank", "cap"]] = None  # default: report when a side isn't aggregated, else allow
+    order_by: List[str] = Field(default_factory=list)  # row order within a key: dedupe keeps the first, rank pairs in order
+    max_pairs_per_key: int = 100  # cap: keys with more A x B pairs than this are paired 1:1 by rank instead
+    max_rows: Optional[int] = None  # fail before merging when the projected join output is larger
+
 class JoinCfg(BaseModel):
     keys: List[str] = Field(default_factory=list)
     key_name: Optional[str] = None
     type: Literal["inner","left","right","outer"] = "outer"
+    fuzzy: List[FuzzyJoinCfg] = Field(default_factory=list)  # applied in order to the unmatched residue
+    duplicates: DuplicateKeysCfg = Field(default_factory=DuplicateKeysCfg)
 
 class ReconNumeric(BaseModel):
     column: str
-    comparator: Literal["relative","absolute","rounded","exact"] = "relative"
+    comparator: str = "relative"  # relative/absolute/rounded/exact/bps or any registered comparator
     tol_pct: Optional[float] = None
     tol_abs: Optional[float] = None
     round: Optional[int] = None
     min_base: float = 1e-8
+    tol_bps: Optional[float] = None
+    params: Dict[str, Any] = Field(default_factory=dict)  # comparator arguments; override the fields above
+
+class ReconNonNumeric(BaseModel):
+    column: str
+    comparator: Literal["exact", "case_insensitive", "normalized", "date_tolerance"] = "exact"
+    tol_days: float = 0  # date_tolerance: max |B - A| in days
+    null_equal: bool = True  # both sides missing counts as a match
 
 # Wrapper for reconcile section with numeric list
 class ReconcileCfg(BaseModel):
     numeric: List[ReconNumeric] = Field(default_factory=list)
+    non_numeric: List[ReconNonNumeric] = Field(default_factory=list)
+
+class ParquetOutputCfg(BaseModel):
+    compression: Literal["zstd", "snappy", "gzip", "lz4", "none"] = "zstd"
+    compression_level: Optional[int] = None  # codec default when unset
+    row_group_size: int = 1_000_000  # rows per row group
+    statistics: bool = True  # min/max/null counts per column chunk, for readers' row-group pruning
+    partition_by: List[str] = Field(default_factory=list)  # hive layout: <name>.parquet/book=X/part-0.parquet
 
 class ReportOutputs(BaseModel):
     dir: str = "out"
     formats: List[str] = Field(default_factory=lambda: ["csv"])
+    compression: Optional[Literal["gzip", "zstd"]] = None  # CSV outputs as <name>.csv.gz / .csv.zst
+    chunk_rows: int = 1_000_000  # rows per streamed write; bounds the writer's memory
+    csv_engine: Literal["pandas", "pyarrow", "auto"] = "pandas"  # pyarrow: faster, different text form; auto: pyarrow when installed
+    parquet: ParquetOutputCfg = Field(default_factory=ParquetOutputCfg)
 
 # Typed wrapper for report select
 class ReportSelect(BaseModel):
@@ -67,10 +118,24 @@ class DrilldownCfg(BaseModel):
     enabled: bool = False
     strategy: Literal["add","remove"] = "add"
     levels: List[DrillLevel] = Field(default_factory=list)
+    max_workers: int = 1  # >1 runs levels' join/reconcile/report concurrently (threads)
+
+class CacheCfg(BaseModel):
+    enabled: bool = False  # opt-in; dir is relative to the working directory
+    dir: str = ".recon_cache"
+    max_size_mb: int = 2048  # least recently used entries are evicted beyond this
+
+class IncrementalCfg(BaseModel):
+    enabled: bool = False
+    state_dir: Optional[str] = None  # default: <out>/state
 
 class JobCfg(BaseModel):
     name: str
-    backend: Literal["pandas"] = "pandas"
+    backend: Literal["pandas", "polars", "duckdb"] = "pandas"
+    backend_options: Dict[str, Any] = Field(default_factory=dict)  # e.g. duckdb: temp_directory, memory_limit, threads
+    parallel_inputs: bool = True  # read+prep A and B concurrently
+    cache: CacheCfg = Field(default_factory=CacheCfg)  # prepared-input cache (core/cache.py)
+    incremental: IncrementalCfg = Field(default_factory=IncrementalCfg)  # re-reconcile changed keys only
     join_type: str = "outer"
     timezone: str = "Asia/Kolkata"
 
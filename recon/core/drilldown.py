@@ -1,7 +1,10 @@
 # recon/core/drilldown.py
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from pathlib import Path
+import json
+import time
 from typing import Dict, List, Any, Optional
 
 import pandas as pd
@@ -9,10 +12,10 @@ import pandas as pd
 import logging
 log = logging.getLogger(__name__)
 
-from .aggregate import aggregate
-from .joiner import join
-from .reconcile import reconcile
-from .report import emit_reports
+from .aggregate import rollup_spec
+from .reconcile import recon_columns
+from .profiling import RunProfile
+from ..backends import get_backend
 
 def _dedup_keep_order(seq):
     seen = set()
@@ -22,18 +25,60 @@ def _dedup_keep_order(seq):
             out.append(x); seen.add(x)
     return out
 
+def _with(obj, **update):
+    # shallow copy with a few fields replaced (pydantic models); only plain objects get deep-copied
+    if hasattr(obj, "model_copy"):
+        return obj.model_copy(update=update)
+    obj2 = deepcopy(obj)
+    for k, v in update.items():
+        setattr(obj2, k, v)
+    return obj2
+
 def _adjust_groupby(spec: Optional[Dict[str, Any]], add: List[str] | None, remove: List[str] | None) -> Optional[Dict[str, Any]]:
     if not spec:
         return spec
-    spec2 = deepcopy(spec)
-    gb = getattr(spec2, "group_by", None) or []
+    gb = getattr(spec, "group_by", None) or []
     if remove:
         rem = set(remove)
         gb = [c for c in gb if c not in rem]
     if add:
         gb = _dedup_keep_order(list(gb) + list(add))
-    setattr(spec2, "group_by", gb)
-    return spec2
+    return _with(spec, group_by=gb)
+
+class _SharedScan:
+    """One side's level aggregates, all derived from a single scan of the prepared rows.
+
+    The finest grouping any level needs (union of every level's group_by) is aggregated from
+    the prepared frame once; each level is then rolled up from the coarsest frame computed so
+    far whose group_by still covers it (cube-style reuse), so a level usually re-aggregates a
+    frame far smaller than the input. Falls back to aggregating the prepared frame per level
+    when a metric cannot be rolled up (first/last/nunique) or the side is not aggregated.
+    count/min/max come out identical either way; a rolled-up sum adds partial sums in a
+    different order than a direct one, so float sums can differ in the last bits.
+    """
+
+    def __init__(self, backend, prepared, specs: List[Optional[Any]]):
+        self.backend = backend
+        self.prepared = prepared
+        self.computed: List[tuple] = []  # (group_by set, frame)
+        group_bys = [getattr(s, "group_by", None) for s in specs]
+        base = next((s for s in specs if s), None)
+        self.rollup = rollup_spec(base) if base is not None and all(group_bys) else None
+        if self.rollup is not None:
+            finest_gb = _dedup_keep_order([c for gb in group_bys for c in gb])
+            finest = backend.persist(backend.aggregate(prepared, _with(base, group_by=finest_gb)))
+            self.computed.append((set(finest_gb), finest))
+            log.info("drilldown: shared scan at finest grain %s", finest_gb)
+
+    def aggregate(self, spec):
+        if self.rollup is None:
+            return self.backend.aggregate(self.prepared, spec)
+        gb = getattr(spec, "group_by", [])
+        # coarsest already-computed frame that still has every column this level groups by
+        src = min((c for c in self.computed if set(gb) <= c[0]), key=lambda c: len(c[0]))[1]
+        out = self.backend.aggregate(src, _with(self.rollup, group_by=gb))
+        self.computed.append((set(gb), out))
+        return out
 
 def run_drilldown(
     A_prepared: pd.DataFrame,
@@ -41,9 +86,15 @@ def run_drilldown(
     full_cfg: "RootCfg",
     levels: List["DrillLevel"],
     strategy: str = "add",  # "add" (drill-down) or "remove" (drill-up)
+    backend: Optional["DataFrameBackend"] = None,
+    max_workers: int = 1,
+    profile: Optional[RunProfile] = None,
 ) -> None:
     if not levels:
         return
+    profile = profile or RunProfile()  # stage records per level (run_profile.json when run_job passes its own)
+    if backend is None:
+        backend = get_backend("pandas")
     log.debug("drilldown: A shape=%s B shape=%s", getattr(A_prepared, 'shape', None), getattr(B_prepared, 'shape', None))
     # DEBUG: uncomment to inspect a small sample during investigation
     # log.debug("A head:\n%s", A_prepared.head(3))
@@ -53,7 +104,7 @@ def run_drilldown(
     aggB_base = getattr(agg_cfg, "B", None) if agg_cfg else None
 
     join_cfg = getattr(full_cfg, "join", None)
-    report_cfg_base = deepcopy(getattr(full_cfg, "report", None))
+    report_cfg_base = getattr(full_cfg, "report", None)
 
     # Determine base output directory using attributes, defaulting to "out/drilldown"
     base_out_dir = "out"
@@ -65,8 +116,10 @@ def run_drilldown(
     base_join_keys = (getattr(join_cfg, "keys", None) or []) if join_cfg else []
     join_type = (getattr(join_cfg, "type", None) or "outer") if join_cfg else "outer"
 
+    # Resolve per-level adds/removes (support both common and per-side) and group_by up front,
+    # so the finest grain is known before anything is aggregated
+    plan = []
     for idx, level in enumerate(levels, start=1):
-        # Resolve per-level adds/removes (support both common and per-side)
         add_common = getattr(level, "add", None) if strategy == "add" else None
         rem_common = getattr(level, "remove", None) if strategy == "remove" else None
         A_add = getattr(level, "A_add", None) or add_common or []
@@ -77,42 +130,74 @@ def run_drilldown(
         # Adjust group_by for each side
         aggA = _adjust_groupby(aggA_base, add=A_add, remove=A_rem)
         aggB = _adjust_groupby(aggB_base, add=B_add, remove=B_rem)
+        plan.append((idx, A_add, B_add, aggA, aggB))
+
+    scanA = _SharedScan(backend, A_prepared, [p[3] for p in plan])
+    scanB = _SharedScan(backend, B_prepared, [p[4] for p in plan])
+
+    # Selection (reuse top-level selection if present)
+    select_cols = None
+    if report_cfg_base and hasattr(report_cfg_base, "select") and report_cfg_base.select is not None:
+        if hasattr(report_cfg_base.select, "keys") and report_cfg_base.select.keys is not None:
+            select_cols = report_cfg_base.select.keys
+
+    value_cols = recon_columns(getattr(full_cfg, "reconcile", None))
+
+    def _emit_level(work: dict) -> dict:
+        idx = work["level"]
+        start = time.perf_counter()
+        with profile.stage(f"drilldown level {idx:02d}", level=idx) as st:
+            st.inputs(work["A_agg"], work["B_agg"])
+            # Join directly on columns (no recon_key) so keys appear unsuffixed
+            dfJ = backend.join(
+                work["A_agg"], work["B_agg"],
+                keys=work["join_keys"],
+                how=join_type,
+                key_name=None,  # <-- ensure unsuffixed key columns
+                value_cols=value_cols,
+            )
+
+            # Reconcile
+            dfR = backend.reconcile(dfJ, getattr(full_cfg, "reconcile", None))
+            res = backend.write(dfR, work["report_cfg"], select_cols=work["select_cols"])
+            st.outputs(res)
+        dur = time.perf_counter() - start
+        return {
+            "level": idx,
+            "dir": work["report_cfg"].outputs.dir if work["report_cfg"] else None,
+            "join_keys": work["join_keys"],
+            "rows": int(getattr(res, "shape", (0,))[0]),
+            "aggregate_s": round(work["aggregate_s"], 6),
+            "join_reconcile_write_s": round(dur, 6),
+        }
+
+    # Aggregation stays sequential: the roll-ups are cheap and reuse each other, and a fixed order
+    # keeps the float sums (and so the outputs) identical whatever max_workers is.
+    works = []
+    for idx, A_add, B_add, aggA, aggB in plan:
         log.info("drilldown level %02d: aggA=%s aggB=%s", idx, bool(aggA), bool(aggB))
+        start = time.perf_counter()
         # Aggregate at this level
-        A_agg = aggregate(A_prepared, aggA)
-        B_agg = aggregate(B_prepared, aggB)
+        with profile.stage(f"drilldown level {idx:02d} aggregate", level=idx) as st:
+            A_agg = scanA.aggregate(aggA)
+            B_agg = scanB.aggregate(aggB)
+            st.outputs(A_agg, B_agg)
 
         # Determine join keys at this level:
         # base keys + (added dims that exist on both sides)
         common_added = [c for c in A_add if c in B_add]
         # keep only columns that truly exist post-aggregation
-        A_cols = set(A_agg.columns)
-        B_cols = set(B_agg.columns)
+        A_cols = set(backend.columns(A_agg))
+        B_cols = set(backend.columns(B_agg))
         common_added = [c for c in common_added if (c in A_cols and c in B_cols)]
         level_join_keys = _dedup_keep_order(list(base_join_keys) + common_added)
 
-        # Join directly on columns (no recon_key) so keys appear unsuffixed
-        dfJ = join(
-            A_agg, B_agg,
-            keys=level_join_keys,
-            how=join_type,
-            key_name=None  # <-- ensure unsuffixed key columns
-        )
-
-        # Reconcile
-        dfR = reconcile(dfJ, getattr(full_cfg, "reconcile", None))
-
-        # Output directory per level (mutate dataclass copy)
-        report_cfg = deepcopy(report_cfg_base)
+        # Output directory per level (shallow copies; only outputs.dir differs)
+        report_cfg = report_cfg_base
         if report_cfg and hasattr(report_cfg, "outputs") and report_cfg.outputs is not None:
             if hasattr(report_cfg.outputs, "dir"):
-                report_cfg.outputs.dir = str(out_base_dir / f"level_{idx:02d}")
-
-        # Selection (reuse top-level selection if present)
-        select_cols = None
-        if report_cfg and hasattr(report_cfg, "select") and report_cfg.select is not None:
-            if hasattr(report_cfg.select, "keys") and report_cfg.select.keys is not None:
-                select_cols = report_cfg.select.keys
+                outputs = _with(report_cfg.outputs, dir=str(out_base_dir / f"level_{idx:02d}"))
+                report_cfg = _with(report_cfg, outputs=outputs)
 
         # drilldown will have columns from group by + select_cols
         drilldown_columns = (A_add or []) + (select_cols or [])
@@ -123,4 +208,25 @@ def run_drilldown(
         # no duplicate columns post drilldown selections
         result_columns = [x for x in drilldown_columns if not (x in seen or seen.add(x))]
 
-        emit_reports(dfR, report_cfg, select_cols=result_columns)
\ No newline at end of file
+        works.append({
+            "level": idx, "A_agg": A_agg, "B_agg": B_agg, "join_keys": level_join_keys,
+            "report_cfg": report_cfg, "select_cols": result_columns,
+            "aggregate_s": time.perf_counter() - start,
+        })
+
+    # Levels are independent from here on. Threads share the aggregated frames (and the
+    # prepared inputs behind them) without copying; pandas/pyarrow release the GIL in the
+    # heavy merge, compare and write paths.
+    workers = max(1, int(max_workers or 1))
+    if workers > 1 and not getattr(backend, "thread_safe", True):
+        log.warning("drilldown: backend %s is not thread-safe; running levels sequentially", backend.name)
+        workers = 1
+    log.info("drilldown: running %d levels with max_workers=%d", len(works), workers)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drilldown") as pool:
+            timings = list(pool.map(_emit_level, works))  # map keeps level order
+    else:
+        timings = [_emit_level(w) for w in works]
+
+    out_base_dir.mkdir(parents=True, exist_ok=True)
+    (out_base_dir / "timings.json").write_text(json.dumps({"max_workers": workers, "levels": timings}, indent=2))
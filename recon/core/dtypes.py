@@ -0,0 +1,127 @@
+from __future__ import annotations
+import sys
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_integer_dtype
+
+import logging
+log = logging.getLogger(__name__)
+
+# Dtype planning: dimension columns (book, ccy, desk...) repeat a handful of values over millions
+# of rows. Parsed as object they cost one Python string per row; as `category` they are a small
+# int code per row plus the distinct values once. The planner looks at a sample of the input and
+# declares such columns `category`, so the parser builds them directly; integer columns are
+# downcast after the read and widened back (widen_integers) before the join, so only the
+# prepare/aggregate stages hold the narrow types and reports keep 64-bit ints.
+
+# declared dtypes the planner may replace with 'category'
+_TEXT = ('object', 'string', 'str')
+_PTR = np.dtype(object).itemsize
+
+
+def sample_frame(spec, rows: int) -> pd.DataFrame:
+    """The first `rows` rows of `spec`'s file, projected like the real read."""
+    if spec.format != 'csv':  # columnar: the first batches of the scan
+        return spec._scanner().head(rows).to_pandas()
+    return pd.read_csv(spec.path, delimiter=spec.delimiter, encoding=spec.encoding, header=spec.header,
+                       usecols=spec._usecols(), nrows=rows, compression=spec.compression or 'infer',
+                       dtype={k: v for k, v in (spec.dtypes or {}).items() if v in _TEXT} or None)
+
+
+def plan_dtypes(spec, cfg) -> dict:
+    """`spec.dtypes` with the low-cardinality text columns of a sample switched to 'category'."""
+    declared = dict(spec.dtypes or {})
+    if cfg is None or not getattr(cfg, 'enabled', False):
+        return declared
+    try:
+        sample = sample_frame(spec, int(cfg.sample_rows))
+    except Exception as e:  # planning is an optimization; the regular read reports real problems
+        log.warning("dtype plan %s: could not sample (%s); reading with the declared dtypes", spec.path, e)
+        return declared
+    planned = []
+    for c in sample.columns:
+        want = declared.get(c)
+        s = sample[c]
+        if want is None and not (s.dtype == object or isinstance(s.dtype, pd.StringDtype)):
+            continue
+        if want is not None and want not in _TEXT:
+            continue
+        n = s.nunique(dropna=True)
+        if n <= cfg.max_categories and n <= cfg.max_ratio * len(s):
+            planned.append(c)
+    if planned:
+        log.info("dtype plan %s: %s -> category (sample of %d rows)", spec.path, planned, len(sample))
+    return {**declared, **{c: 'category' for c in planned}}
+
+
+def downcast(df: pd.DataFrame, mode: str = 'integer') -> pd.DataFrame:
+    """Shrink numeric columns in place: 'integer' to the smallest int type that holds them, 'all' also float64 -> float32."""
+    if mode == 'none':
+        return df
+    for c in df.columns:
+        s = df[c]
+        if not isinstance(s.dtype, np.dtype) or is_bool_dtype(s):
+            continue
+        if is_integer_dtype(s):
+            df[c] = pd.to_numeric(s, downcast='signed' if s.dtype.kind == 'i' else 'unsigned')
+        elif mode == 'all' and s.dtype == np.float64:
+            df[c] = s.astype(np.float32)
+    return df
+
+
+def widen_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """Integer columns narrower than 64 bits back to int64 (uint64 for unsigned), undoing `downcast`."""
+    wide = {c: np.int64 if t.kind == 'i' else np.uint64 for c, t in df.dtypes.items()
+            if isinstance(t, np.dtype) and t.kind in 'iu' and t.itemsize < 8}
+    return df.astype(wide) if wide else df
+
+
+def categorical_map(s: pd.Series, fn, na: str | None = None) -> pd.Series:
+    """`fn` (a Series -> Series string op) applied to the categories of `s` instead of its rows.
+
+    Categories that become equal are merged; the result keeps sorted categories so groupby
+    output stays in value order. Missing values stay missing, or become `fn(na)` when `na` is given.
+    """
+    codes = s.cat.codes.to_numpy()
+    texts = s.cat.categories.astype(str)
+    missing = na is not None and bool((codes < 0).any())
+    if missing:
+        texts = texts.append(pd.Index([na]))
+        codes = np.where(codes < 0, len(texts) - 1, codes)
+    new_codes, uniques = pd.factorize(fn(pd.Series(texts)), sort=True)
+    codes = np.where(codes >= 0, new_codes[codes] if len(new_codes) else codes, -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=s.index, name=s.name)
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat that keeps categorical columns categorical when the pieces' categories differ."""
+    if len(frames) > 1:
+        for c in frames[0].columns:
+            if all(isinstance(f[c].dtype, pd.CategoricalDtype) for f in frames if c in f.columns):
+                cats = frames[0][c].cat.categories
+                for f in frames[1:]:
+                    if c in f.columns:
+                        cats = cats.union(f[c].cat.categories)
+                frames = [f.assign(**{c: f[c].cat.set_categories(cats)}) if c in f.columns else f for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def memory_report(df) -> dict | None:
+    """Rows and in-memory bytes of a pandas frame, and roughly what it would take without the dtype plan
+    (categoricals as str objects, downcast numerics at 8 bytes)."""
+    if not isinstance(df, pd.DataFrame):
+        return None
+    usage = df.memory_usage(index=False, deep=True)
+    as_object = int(usage.sum())
+    for c in df.columns:
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # one pointer per row plus a str object per row (what an object column of the same values holds)
+            sizes = s.cat.categories.astype(str).map(sys.getsizeof).to_numpy(dtype=np.int64)
+            codes = s.cat.codes.to_numpy()
+            per_row = int(np.bincount(codes[codes >= 0], minlength=len(sizes)) @ sizes) if len(sizes) else 0
+            as_object += len(s) * _PTR + per_row - int(usage[c])
+        elif isinstance(s.dtype, np.dtype) and s.dtype.kind in 'iuf' and s.dtype.itemsize < 8:
+            as_object += len(s) * (8 - s.dtype.itemsize)
+    return {'rows': int(len(df)), 'bytes': int(usage.sum()), 'bytes_unplanned': as_object}
+
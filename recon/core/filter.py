@@ -1,26 +1,335 @@
 from __future__ import annotations
+import re
+import numpy as np
 import pandas as pd
 
+import logging
+log = logging.getLogger(__name__)
+
+# Filter predicates (prefilter and the post-aggregate `filters`) are compiled into a tree once and
+# then evaluated on row positions: an AND hands only the rows its earlier children kept to the next
+# child, an OR only the rows none of them matched yet, so expensive predicates (regex, string
+# prefixes) see a shrinking subset. Children are ordered by a rough per-row cost and, on large
+# frames, by how many rows they keep on a sample. The same trees translate to pyarrow scan
+# expressions (pushdown), polars expressions and DuckDB SQL.
+#
+#   - {col: ccy, op: in, value: [USD, EUR]}        a leaf
+#   - {or: [<predicate>, ...]}                     any of
+#   - {and: [<predicate>, ...]}                    all of (a plain list is all of, too)
+#   - {not: <predicate>}                           rows the inner predicate doesn't keep
+
+def _str(s: pd.Series):
+    try:
+        return s.str
+    except AttributeError as e:
+        raise ValueError(f"filter: column {s.name!r} ({s.dtype}) is not text") from e
+
 _OPS = {
     'eq': lambda s, v: s == v,
-    'ne': lambda s, v: s != v,
+    # missing values are "not equal", like polars' ne_missing and DuckDB's IS DISTINCT FROM
+    'ne': lambda s, v: (s != v) | s.isna(),
     'gt': lambda s, v: s > v,
     'ge': lambda s, v: s >= v,
     'lt': lambda s, v: s < v,
     'le': lambda s, v: s <= v,
+    'between': lambda s, v: s.between(v[0], v[1]),  # inclusive on both ends
     'in': lambda s, v: s.isin(v),
     'not_in': lambda s, v: ~s.isin(v),
     'is_null': lambda s, v: s.isna(),
     'not_null': lambda s, v: ~s.isna(),
+    'startswith': lambda s, v: _str(s).startswith(tuple(v) if isinstance(v, (list, tuple)) else v, na=False),
+    'regex': lambda s, v: _str(s).contains(v, regex=True, na=False),  # re.search: anywhere in the value
+}
+
+_ORDERED = ('gt', 'ge', 'lt', 'le', 'between')
+_NA_KEEPS = ('ne', 'not_in', 'is_null')  # ops a missing value passes
+# rough per-row cost of an op on a plain column; categoricals evaluate on their categories (cheap)
+_COST = {'is_null': 1, 'not_null': 1, 'eq': 2, 'ne': 2, 'gt': 2, 'ge': 2, 'lt': 2, 'le': 2, 'between': 3,
+         'in': 4, 'not_in': 4, 'startswith': 10, 'regex': 25}
+_TEXT_COST = 3  # extra factor for comparisons on object/string columns
+_SAMPLE_MIN = 200_000  # frames at least this long get their children ordered by sampled selectivity
+_SAMPLE_ROWS = 2_000
+
+# ops a columnar scan may evaluate early. Only ops under which a null never survives are listed,
+# so pruning with them can't drop a row the pandas filter would keep.
+_PUSHDOWN_OPS = {
+    'eq': lambda f, v: f == v,
+    'gt': lambda f, v: f > v,
+    'ge': lambda f, v: f >= v,
+    'lt': lambda f, v: f < v,
+    'le': lambda f, v: f <= v,
+    'between': lambda f, v: (f >= v[0]) & (f <= v[1]),
+    'in': lambda f, v: f.isin(list(v)),
+    'startswith': lambda f, v: _arrow_any([_pc().starts_with(f, pattern=p) for p in (v if isinstance(v, (list, tuple)) else [v])]),
+    'regex': lambda f, v: _pc().match_substring_regex(f, pattern=v),
 }
 
-def apply_filters(df: pd.DataFrame, predicates: list[dict] | None) -> pd.DataFrame:
-    if not predicates:
+def _pc():
+    import pyarrow.compute as pc
+    return pc
+
+def _arrow_any(exprs):
+    out = exprs[0]
+    for e in exprs[1:]:
+        out = out | e
+    return out
+
+
+class Leaf:
+    def __init__(self, col: str, op: str, value=None):
+        self.col, self.op, self.value = col, op, value
+
+    @property
+    def columns(self) -> list[str]:
+        return [self.col]
+
+    def __repr__(self):
+        return f"{self.col} {self.op} {self.value!r}" if self.op not in ('is_null', 'not_null') else f"{self.col} {self.op}"
+
+class All:
+    def __init__(self, children: list):
+        self.children = children
+
+    @property
+    def columns(self) -> list[str]:
+        return list(dict.fromkeys(c for ch in self.children for c in ch.columns))
+
+    def __repr__(self):
+        return '(' + ' AND '.join(map(repr, self.children)) + ')'
+
+class Any(All):
+    def __repr__(self):
+        return '(' + ' OR '.join(map(repr, self.children)) + ')'
+
+class Not:
+    def __init__(self, child):
+        self.child = child
+
+    @property
+    def columns(self) -> list[str]:
+        return self.child.columns
+
+    def __repr__(self):
+        return f"NOT {self.child!r}"
+
+
+def _leaf(p: dict) -> Leaf:
+    col, op, val = p.get('col'), p.get('op'), p.get('value')
+    if not col or op not in _OPS:
+        raise ValueError(f"filter: unknown predicate {p!r}; ops are {sorted(_OPS)}")
+    if op in ('in', 'not_in') and not isinstance(val, (list, tuple, set)):
+        raise ValueError(f"filter: {op!r} on {col!r} needs a list value, got {val!r}")
+    if op == 'between' and not (isinstance(val, (list, tuple)) and len(val) == 2):
+        raise ValueError(f"filter: 'between' on {col!r} needs [low, high], got {val!r}")
+    prefixes = val if isinstance(val, (list, tuple)) else [val]
+    if op == 'startswith' and not (prefixes and all(isinstance(v, str) for v in prefixes)):
+        raise ValueError(f"filter: 'startswith' on {col!r} needs a string or a non-empty list of strings, got {val!r}")
+    if op == 'regex':
+        try:
+            re.compile(val)
+        except (re.error, TypeError) as e:
+            raise ValueError(f"filter: bad regex {val!r} on {col!r}: {e}") from e
+    return Leaf(col, op, val)
+
+def compile_filter(predicates) -> All | Any | Not | Leaf | None:
+    """The predicate tree of a prefilter/filters section (a list is AND); None when there is nothing to filter."""
+    if predicates is None:
+        return None
+    if isinstance(predicates, (list, tuple)):
+        children = [n for n in (compile_filter(p) for p in predicates) if n is not None]
+        if not children:
+            return None
+        return children[0] if len(children) == 1 else All(children)
+    if not isinstance(predicates, dict):
+        raise ValueError(f"filter: a predicate must be a mapping or a list, got {predicates!r}")
+    groups = [k for k in ('and', 'or', 'not') if k in predicates]
+    if len(groups) > 1 or (groups and 'col' in predicates):
+        raise ValueError(f"filter: {predicates!r} mixes {groups + (['col'] if 'col' in predicates else [])}")
+    if not groups:
+        return _leaf(predicates)
+    kind = groups[0]
+    body = predicates[kind]
+    children = [n for n in (compile_filter(p) for p in (body if isinstance(body, (list, tuple)) else [body]))
+                if n is not None]
+    if not children:
+        raise ValueError(f"filter: empty {kind!r} group")
+    if len(children) == 1:
+        return Not(children[0]) if kind == 'not' else children[0]
+    if kind == 'not':
+        return Not(All(children))
+    return Any(children) if kind == 'or' else All(children)
+
+def filter_columns(predicates) -> list[str]:
+    """Columns the predicates read (for projection)."""
+    node = compile_filter(predicates)
+    return node.columns if node is not None else []
+
+def fold(node, leaf, all_, any_, not_):
+    """Translate a tree bottom-up: leaf(Leaf), all_(list), any_(list), not_(x)."""
+    if isinstance(node, Leaf):
+        return leaf(node)
+    if isinstance(node, Not):
+        return not_(fold(node.child, leaf, all_, any_, not_))
+    parts = [fold(ch, leaf, all_, any_, not_) for ch in node.children]
+    return any_(parts) if isinstance(node, Any) else all_(parts)
+
+def check_columns(node, names, where: str = 'filter'):
+    missing = [c for c in (node.columns if node is not None else []) if c not in names]
+    if missing:
+        raise ValueError(f"{where}: column(s) {missing} not found; available: {sorted(map(str, names))}")
+
+
+# --- pandas evaluation ---
+def _bool(x) -> np.ndarray:
+    if isinstance(x, pd.Series):
+        return x.to_numpy() if x.dtype == bool else x.to_numpy(dtype=bool, na_value=False)
+    return np.asarray(x, dtype=bool)
+
+def _leaf_mask(leaf: Leaf, s: pd.Series) -> np.ndarray:
+    fn = _OPS[leaf.op]
+    cat = isinstance(s.dtype, pd.CategoricalDtype)
+    if cat and leaf.op not in ('is_null', 'not_null') and not (s.cat.ordered and leaf.op in _ORDERED):
+        # evaluate on the categories once and expand by code; this also lets unordered categoricals
+        # compare <, > by value instead of refusing (ordered ones compare by category order natively)
+        hit = _bool(fn(pd.Series(s.cat.categories), leaf.value))
+        codes = s.cat.codes.to_numpy()
+        return np.append(hit, leaf.op in _NA_KEEPS)[codes]  # code -1 (missing) -> the last slot
+    try:
+        return _bool(fn(s, leaf.value))
+    except TypeError as e:
+        raise ValueError(f"filter: {leaf!r} does not apply to column {s.name!r} ({s.dtype}): {e}") from e
+
+def _cost(node, df: pd.DataFrame) -> float:
+    if isinstance(node, Leaf):
+        dtype = df[node.col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            return 1
+        cost = _COST[node.op]
+        text = dtype == object or isinstance(dtype, pd.StringDtype)
+        # string ops are priced for text already; comparisons on text cost more than on numbers
+        return cost * _TEXT_COST if text and cost < _COST['startswith'] else cost
+    if isinstance(node, Not):
+        return _cost(node.child, df)
+    return sum(_cost(ch, df) for ch in node.children)
+
+def _order(children, df: pd.DataFrame, pos: np.ndarray, conjunction: bool) -> list:
+    """Children in evaluation order: for AND the ones that are cheap and drop many rows first, for OR
+    the cheap ones that keep many. Pass rates come from a strided sample on large frames."""
+    costs = [_cost(ch, df) for ch in children]
+    if len(pos) < _SAMPLE_MIN:
+        return [ch for _, ch in sorted(zip(costs, children), key=lambda t: t[0])]
+    sample = pos[::max(1, len(pos) // _SAMPLE_ROWS)]
+    ranks = []
+    for cost, ch in zip(costs, children):
+        rate = float(_eval(ch, df, sample).mean()) if len(sample) else 0.5
+        # expected cost per row removed (AND) / kept (OR)
+        ranks.append(cost / max(1 - rate if conjunction else rate, 1e-3))
+    order = [ch for _, ch in sorted(zip(ranks, children), key=lambda t: t[0])]
+    log.debug("filter: order %s (rank %s)", order, sorted(ranks))
+    return order
+
+def _eval(node, df: pd.DataFrame, pos: np.ndarray | None) -> np.ndarray:
+    """Boolean mask over the rows at positions `pos` (None: all rows)."""
+    if isinstance(node, Leaf):
+        s = df[node.col]
+        return _leaf_mask(node, s if pos is None else s.take(pos))
+    if isinstance(node, Not):
+        return ~_eval(node.child, df, pos)
+    n = len(df) if pos is None else len(pos)
+    if pos is None:
+        pos = np.arange(n)
+    live = np.arange(n)  # indices into pos still undecided
+    first = True
+    if isinstance(node, Any):
+        out = np.zeros(n, dtype=bool)
+        for ch in _order(node.children, df, pos, conjunction=False):
+            hit = _eval(ch, df, None if first and n == len(df) else pos[live])
+            out[live[hit]] = True
+            live = live[~hit]
+            first = False
+            if not len(live):
+                break
+        return out
+    for ch in _order(node.children, df, pos, conjunction=True):
+        keep = _eval(ch, df, None if first and n == len(df) else pos[live])
+        live = live[keep]
+        first = False
+        if not len(live):
+            break
+    out = np.zeros(n, dtype=bool)
+    out[live] = True
+    return out
+
+def apply_filters(df: pd.DataFrame, predicates, where: str = 'filter') -> pd.DataFrame:
+    """Rows of df the predicates keep. Unknown columns and ops raise ValueError."""
+    node = compile_filter(predicates)
+    if node is None:
+        return df
+    check_columns(node, df.columns, where)
+    mask = _eval(node, df, None)
+    if mask.all():
         return df
-    mask = pd.Series([True] * len(df), index=df.index)
-    for p in predicates:
-        col, op, val = p['col'], p['op'], p.get('value')
-        if op not in _OPS or col not in df.columns:
-            continue
-        mask &= _OPS[op](df[col], val)
-    return df[mask]
+    return df.iloc[np.flatnonzero(mask)]
+
+
+# --- pushdown ---
+def pushdown_expression(predicates, names):
+    """A pyarrow.dataset expression implied by the predicates, for pruning a scan; None if nothing can be pushed.
+
+    Only null-rejecting ops go down. An AND keeps whichever children can be pushed (a weaker filter
+    is still safe), an OR only when all of them can; NOT never does."""
+    node = compile_filter(predicates)
+    if node is None:
+        return None
+    import pyarrow.dataset as ds
+    names = set(names)
+
+    def leaf(n: Leaf):
+        if n.col not in names or n.op not in _PUSHDOWN_OPS:
+            return None
+        try:
+            return _PUSHDOWN_OPS[n.op](ds.field(n.col), n.value)
+        except (TypeError, ValueError) as e:  # e.g. `in` mixing strings and numbers: pyarrow can't type the list
+            log.debug("pushdown: %r not pushed (%s)", n, e)
+            return None
+
+    def all_(parts):
+        parts = [p for p in parts if p is not None]
+        out = parts[0] if parts else None
+        for p in parts[1:]:
+            out = out & p
+        return out
+
+    def any_(parts):
+        return None if any(p is None for p in parts) or not parts else _arrow_any(parts)
+
+    return fold(node, leaf, all_, any_, lambda x: None)
+
+def weaken(predicates, fn):
+    """Predicates (as dicts) implied by `predicates`, with each leaf replaced by fn(leaf dict) or dropped
+    when fn returns None: an AND keeps its other children, an OR or NOT containing a dropped leaf goes."""
+    node = compile_filter(predicates)
+    if node is None:
+        return None
+
+    # each part is (predicate or None, exact): a NOT may only keep an inner predicate nothing was dropped from
+    def leaf(n: Leaf):
+        p = fn({'col': n.col, 'op': n.op, 'value': n.value})
+        return p, p is not None
+
+    def all_(parts):
+        kept = [p for p, _ in parts if p is not None]
+        out = None if not kept else kept[0] if len(kept) == 1 else {'and': kept}
+        return out, all(exact for _, exact in parts)
+
+    def any_(parts):
+        if any(p is None for p, _ in parts):
+            return None, False
+        return {'or': [p for p, _ in parts]}, all(exact for _, exact in parts)
+
+    def not_(part):
+        p, exact = part
+        return ({'not': p}, True) if exact else (None, False)
+
+    out, _ = fold(node, leaf, all_, any_, not_)
+    return None if out is None else [out]
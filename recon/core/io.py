@@ -1,8 +1,26 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, Iterator
 import pandas as pd
 
+from .dtypes import concat_frames, downcast
+from .filter import pushdown_expression
+
+import logging
+log = logging.getLogger(__name__)
+
+_DEF_CHUNKSIZE = 1_000_000
+
+COLUMNAR_FORMATS = ('parquet', 'feather', 'arrow')
+
+# what pyarrow raises for a filter that doesn't fit the data (ArrowTypeError, ArrowInvalid and
+# ArrowNotImplementedError subclass these)
+_PUSHDOWN_ERRORS = (TypeError, ValueError, NotImplementedError)
+
+# dtypes the eager CSV read hands to the parser (they can't fail to parse)
+_PARSE_TEXT = ('category', 'string', 'str', 'object')
+
 @dataclass
 class ReadSpec:
     path: str
@@ -10,13 +28,145 @@ class ReadSpec:
     encoding: str = 'utf-8'
     dtypes: dict | None = None
     header: int | None = 0
+    usecols: list[str] | None = None
+    chunksize: int | None = None
+    format: str = 'csv'
+    compression: str | None = None
+    # predicates on raw column names that may prune row groups/batches at scan time
+    # (columnar formats only; the regular prefilter still runs afterwards)
+    filters: list[dict] | None = None
+    # after the read: 'integer' shrinks int columns to the smallest type that holds them, 'all' also floats
+    downcast: str = 'none'
+
+    def _parse_dtypes(self) -> dict:
+        # text and category columns are built by the parser; the rest keep the lenient cast in _cast
+        return {k: v for k, v in (self.dtypes or {}).items() if v in _PARSE_TEXT}
+
+    def _categories(self) -> list[str] | None:
+        # columnar: Arrow dictionary-encodes these while converting, never materializing the strings
+        return [k for k, v in (self.dtypes or {}).items() if v == 'category'] or None
 
-    def read(self) -> pd.DataFrame:
-        df = pd.read_csv(self.path, delimiter=self.delimiter, encoding=self.encoding, header=self.header)
-        if self.dtypes:
-            for k, v in self.dtypes.items():
-                if v.startswith('date'):
-                    df[k] = pd.to_datetime(df[k], errors='coerce')
-                else:
-                    df[k] = df[k].astype(v, errors='ignore')
+    def _usecols(self):
+        if not self.usecols:
+            return None
+        wanted = set(self.usecols)
+        # callable so columns missing from the file are tolerated (same as sanitize.select)
+        return lambda c: c in wanted
+
+    def _cast(self, df: pd.DataFrame, parsed: dict | None = None) -> pd.DataFrame:
+        # lenient: a column that doesn't convert (one bad numeric cell) stays as read
+        for k, v in (self.dtypes or {}).items():
+            if k not in df.columns or k in (parsed or {}):
+                continue
+            if v.startswith('date'):
+                df[k] = pd.to_datetime(df[k], errors='coerce')
+            elif isinstance(df[k].dtype, pd.CategoricalDtype):
+                # Arrow keeps dictionary (first-seen) order; sort like the CSV parser so that
+                # sorts and merges on the codes come out in value order
+                cats = df[k].cat.categories
+                if not cats.is_monotonic_increasing:
+                    df[k] = df[k].cat.reorder_categories(cats.sort_values())
+            else:
+                df[k] = df[k].astype(v, errors='ignore')
         return df
+
+    # --- columnar (parquet / feather / arrow IPC) ---
+    def _dataset(self):
+        import pyarrow.dataset as ds
+        return ds.dataset(self.path, format='parquet' if self.format == 'parquet' else 'ipc')
+
+    def _scanner(self, pushdown: bool = True):
+        dataset = self._dataset()
+        names = set(dataset.schema.names)
+        columns = [c for c in self.usecols if c in names] if self.usecols else None
+        scan = lambda expr: dataset.scanner(batch_size=self.chunksize or _DEF_CHUNKSIZE, columns=columns, filter=expr)
+        if pushdown and self.filters:
+            try:
+                expr = pushdown_expression(self.filters, names)
+                log.debug("scan %s: columns=%s filter=%s", self.path, columns, expr)
+                return scan(expr)
+            except _PUSHDOWN_ERRORS as e:
+                # e.g. a predicate value that doesn't compare with the column type: skip the pruning only
+                log.warning("scan %s: pushdown filter not applicable (%s); reading without it", self.path, e)
+        return scan(None)
+
+    def _scan_table(self):
+        try:
+            return self._scanner().to_table()
+        except _PUSHDOWN_ERRORS as e:
+            if not self.filters:
+                raise
+            # the filter may also fail while the scan runs (evaluated per batch); the prefilter runs anyway
+            log.warning("scan %s: pushdown filter failed (%s); reading without it", self.path, e)
+            return self._scanner(pushdown=False).to_table()
+
+    def _scan_batches(self) -> Iterator:
+        batches = iter(self._scanner().to_batches())
+        first = True
+        while True:
+            try:
+                batch = next(batches)
+            except StopIteration:
+                return
+            except _PUSHDOWN_ERRORS as e:
+                # once batches went out a rescan would repeat their rows, so only a failing first batch falls back
+                if not (first and self.filters):
+                    raise
+                log.warning("scan %s: pushdown filter failed (%s); reading without it", self.path, e)
+                yield from self._scanner(pushdown=False).to_batches()
+                return
+            first = False
+            yield batch
+
+    def iter_chunks(self, transform: Callable[[pd.DataFrame], pd.DataFrame] | None = None) -> Iterator[pd.DataFrame]:
+        """Stream the file chunk by chunk with projection and the same dtypes as read().
+
+        `transform` (typically sanitize + prefilter) runs on every chunk before it
+        is yielded, so callers only ever hold the surviving rows.
+        """
+        if self.format in COLUMNAR_FORMATS:
+            for i, batch in enumerate(self._scan_batches()):
+                chunk = self._cast(batch.to_pandas(categories=self._categories()))
+                rows_in = len(chunk)
+                if transform is not None:
+                    chunk = transform(chunk)
+                log.debug("read batch %d: rows_in=%d rows_out=%d", i, rows_in, len(chunk))
+                yield chunk
+            return
+        parsed = self._parse_dtypes()
+        reader = pd.read_csv(
+            self.path,
+            delimiter=self.delimiter,
+            encoding=self.encoding,
+            header=self.header,
+            usecols=self._usecols(),
+            dtype=parsed or None,
+            chunksize=self.chunksize or _DEF_CHUNKSIZE,
+            compression=self.compression or 'infer',
+        )
+        with reader:
+            for i, chunk in enumerate(reader):
+                # the same lenient casts as the eager read, per chunk
+                chunk = self._cast(chunk, parsed)
+                rows_in = len(chunk)
+                if transform is not None:
+                    chunk = transform(chunk)
+                log.debug("read chunk %d: rows_in=%d rows_out=%d", i, rows_in, len(chunk))
+                yield chunk
+
+    def read(self, transform: Callable[[pd.DataFrame], pd.DataFrame] | None = None) -> pd.DataFrame:
+        if self.chunksize:
+            chunks = list(self.iter_chunks(transform))
+            if not chunks:
+                return pd.DataFrame()
+            return downcast(concat_frames(chunks), self.downcast)
+        if self.format in COLUMNAR_FORMATS:
+            df = self._cast(self._scan_table().to_pandas(categories=self._categories()))
+        else:
+            parsed = self._parse_dtypes()
+            df = pd.read_csv(self.path, delimiter=self.delimiter, encoding=self.encoding, header=self.header,
+                             usecols=self._usecols(), compression=self.compression or 'infer', dtype=parsed or None)
+            df = self._cast(df, parsed)
+        if transform is not None:
+            df = transform(df)
+        return downcast(df, self.downcast)
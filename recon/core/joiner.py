@@ -1,6 +1,12 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+from .text import as_text, normalize
+
+import logging
+log = logging.getLogger(__name__)
 
 JOIN_TYPE_MAP = {
     'inner': 'inner',
@@ -9,20 +15,360 @@ JOIN_TYPE_MAP = {
     'outer': 'outer',
 }
 
+# merge indicator column (categorical: left_only / right_only / both), dropped after the flags are derived
+_COVERAGE = '__coverage'
+
+# Mixed-radix codes are re-compacted before they could overflow int64
+_MAX_CODE = 1 << 62
+
+def _key_text(s: pd.Series) -> pd.Series:
+    # a missing part reads 'nan' whether the column holds NaN, None (Arrow) or is categorical
+    text = s.astype(str)
+    return text.where(s.notna(), 'nan') if s.dtype == object else text
+
+def _readable_key(df: pd.DataFrame, keys: list[str], sep: str = '|') -> pd.Series:
+    # column-wise concatenation: same text as a row-wise '|'.join over astype(str), no per-row Python call
+    out = _key_text(df[keys[0]])
+    for k in keys[1:]:
+        out = out + sep + _key_text(df[k])
+    return out
+
 def build_join_key(df: pd.DataFrame, keys: list[str], key_name: str = 'recon_key') -> pd.DataFrame:
-    df[key_name] = df[keys].astype(str).agg('|'.join, axis=1)
+    df[key_name] = _readable_key(df, keys)
+    return df
+
+def encode_join_keys(A: pd.DataFrame, B: pd.DataFrame, keys: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Integer join codes for A and B, consistent across both sides and collision-free.
+
+    Each key column is factorized over A and B together and the per-column codes are
+    combined mixed-radix. Columns whose dtypes differ between sides are compared on
+    their string form, matching build_join_key.
+    """
+    n_a = len(A)
+    combined = np.zeros(n_a + len(B), dtype=np.int64)
+    card = 1
+    for k in keys:
+        a, b = A[k], B[k]
+        if a.dtype != b.dtype:
+            a, b = a.astype(str), b.astype(str)
+        codes, uniques = pd.factorize(pd.concat([a, b], ignore_index=True), use_na_sentinel=False)
+        n = max(len(uniques), 1)
+        if card * n >= _MAX_CODE:
+            combined, seen = pd.factorize(combined)
+            card = len(seen)
+        combined = combined * n + codes
+        card *= n
+    return combined[:n_a], combined[n_a:]
+
+def align_categoricals(A: pd.DataFrame, B: pd.DataFrame, keys: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """A and B with categorical key columns on the same categories (or plain when only one side is categorical).
+
+    Keys coalesce and get rewritten across sides, which a categorical only allows for its own categories.
+    """
+    for k in keys:
+        a, b = A[k], B[k]
+        a_cat, b_cat = isinstance(a.dtype, pd.CategoricalDtype), isinstance(b.dtype, pd.CategoricalDtype)
+        if not (a_cat or b_cat) or a.dtype == b.dtype:
+            continue
+        if a_cat and b_cat:
+            cats = a.cat.categories.union(b.cat.categories)
+            a, b = a.cat.set_categories(cats), b.cat.set_categories(cats)
+        elif a_cat:
+            a = a.astype(a.cat.categories.dtype)
+        else:
+            b = b.astype(b.cat.categories.dtype)
+        A, B = A.assign(**{k: a}), B.assign(**{k: b})
+    return A, B
+
+def _nulls_last(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """`df` (an outer merge on `keys`) in the order the same merge on plain keys gives.
+
+    pandas sorts an outer merge on categorical keys by code, which puts missing keys (code -1)
+    first; on plain keys they sort last. Categories are sorted (see ReadSpec), so only the
+    missing keys need moving.
+    """
+    cats = [k for k in keys if isinstance(df[k].dtype, pd.CategoricalDtype)]
+    if not any(df[k].isna().any() for k in cats):
+        return df
+    order = []
+    for k in reversed(keys):
+        s = df[k]
+        codes = s.cat.codes.to_numpy() if k in cats else pd.factorize(s, sort=True)[0]
+        order.append(np.where(codes < 0, codes.max() + 1, codes))
+    return df.take(np.lexsort(order)).reset_index(drop=True)
+
+def _key_labels(A: pd.DataFrame, B: pd.DataFrame, codes_a: np.ndarray, codes_b: np.ndarray, keys: list[str]) -> pd.Series:
+    """code -> readable key, spelled out once per distinct key from each side's own dtypes."""
+    ua, ia = np.unique(codes_a, return_index=True)
+    ub, ib = np.unique(codes_b, return_index=True)
+    only_b = ~np.isin(ub, ua)
+    labels_a = _readable_key(A.iloc[ia], keys).to_numpy()
+    labels_b = _readable_key(B.iloc[ib[only_b]], keys).to_numpy()
+    return pd.Series(np.concatenate([labels_a, labels_b]), index=np.concatenate([ua, ub[only_b]]))
+
+# === Fuzzy passes over the unmatched residue ===
+# The exact merge leaves keys that only differ by formatting (trade ids) or by a few seconds
+# (timestamps) as only_in_A/only_in_B. Each JoinCfg.fuzzy pass pairs the distinct unmatched
+# key tuples of A and B one-to-one, blocked by the exact keys so the work stays per block;
+# B's paired keys are then rewritten to A's, so the regular join lines them up.
+
+FUZZY_FLAG = 'fuzzy_matched'
+_TO = '__to_'
+_FUZZY = '__fuzzy_'  # B's own value of a rewritten key until the merge; then <on><prefix_B>
+
+def _aligned(a: pd.Series, b: pd.Series) -> tuple[pd.Series, pd.Series]:
+    # blocking keys must compare across sides; like encode_join_keys, differing dtypes go by string form
+    return (a.astype(str), b.astype(str)) if a.dtype != b.dtype else (a, b)
+
+def _ordered(s: pd.Series) -> pd.Series:
+    """Values merge_asof can measure distances on: datetimes, floats, or ISO 8601 text parsed to datetimes."""
+    if is_datetime64_any_dtype(s):
+        return s
+    if is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return s.astype('float64')
+    return pd.to_datetime(s.astype(object), format='ISO8601', errors='coerce')
+
+def _tolerance(tol, values: pd.Series):
+    if tol is None:
+        return None
+    if is_datetime64_any_dtype(values):
+        return pd.Timedelta(tol) if isinstance(tol, str) else pd.Timedelta(seconds=float(tol))
+    return float(tol)
+
+def _mutual_best(cand: pd.DataFrame, score: str, higher_is_better: bool) -> pd.DataFrame:
+    """One-to-one pairs out of scored candidates: keep (a, b) when each is the other's best."""
+    cand = cand.sort_values([score, '__a', '__b'], ascending=[not higher_is_better, True, True], kind='stable')
+    best_for_a = cand.drop_duplicates('__a')[['__a', '__b']]
+    best_for_b = cand.drop_duplicates('__b')[['__a', '__b']]
+    return best_for_a.merge(best_for_b, on=['__a', '__b'])
+
+def _nearest_pairs(a: pd.DataFrame, b: pd.DataFrame, on: str, by: list[str], tol) -> pd.DataFrame:
+    va, vb = _ordered(a[on]), _ordered(b[on])
+    left = pd.DataFrame({'__a': np.arange(len(a)), '__v': va.to_numpy()})
+    right = pd.DataFrame({'__b': np.arange(len(b)), '__v': vb.to_numpy(), '__vb': vb.to_numpy()})
+    for k in by:
+        left[k], right[k] = (s.to_numpy() for s in _aligned(a[k], b[k]))
+    left = left.dropna(subset=['__v']).sort_values('__v', kind='stable')
+    right = right.dropna(subset=['__v']).sort_values('__v', kind='stable')
+    if left.empty or right.empty:
+        return pd.DataFrame({'__a': [], '__b': []}, dtype='int64')
+    m = pd.merge_asof(left, right, on='__v', by=by or None, tolerance=_tolerance(tol, left['__v']), direction='nearest')
+    m = m.dropna(subset=['__b']).astype({'__b': 'int64'})
+    m['__d'] = (m['__vb'] - m['__v']).abs()
+    return _mutual_best(m, '__d', higher_is_better=False)
+
+def _similarity(a: list[str], b: list[str]) -> np.ndarray:
+    """Indel similarity per pair: 2 * matching characters / total length (1.0 = equal)."""
+    try:
+        from rapidfuzz.distance import Indel
+        from rapidfuzz.process import cpdist
+    except ImportError:
+        from difflib import SequenceMatcher
+        log.warning("join: rapidfuzz not installed; scoring %d fuzzy candidates with difflib (slower)", len(a))
+        return np.fromiter((SequenceMatcher(None, x, y, autojunk=False).ratio() for x, y in zip(a, b)), float, len(a))
+    return np.asarray(cpdist(a, b, scorer=Indel.normalized_similarity, workers=-1), dtype=float)
+
+def _string_pairs(a: pd.DataFrame, b: pd.DataFrame, on: str, by: list[str], threshold: float,
+                  prefix_block: int, max_block_pairs: int) -> pd.DataFrame:
+    # formatting drift: case, punctuation and whitespace don't count
+    left = pd.DataFrame({'__a': np.arange(len(a)), '__n': as_text(a[on], normalize).str.replace(' ', '').to_numpy()})
+    right = pd.DataFrame({'__b': np.arange(len(b)), '__n': as_text(b[on], normalize).str.replace(' ', '').to_numpy()})
+    for k in by:
+        left[k], right[k] = (s.to_numpy() for s in _aligned(a[k], b[k]))
+    left, right = left.dropna(subset=['__n']), right.dropna(subset=['__n'])
+    # 1) equal once normalized: a plain hash join
+    same = left.merge(right, on=by + ['__n']).drop_duplicates('__a').drop_duplicates('__b')[['__a', '__b']]
+    left, right = left[~left['__a'].isin(same['__a'])], right[~right['__b'].isin(same['__b'])]
+    # 2) similarity, only between candidates in the same block
+    block = list(by)
+    if prefix_block:
+        left = left.assign(__p=left['__n'].str.slice(0, prefix_block))
+        right = right.assign(__p=right['__n'].str.slice(0, prefix_block))
+        block.append('__p')
+    if not block:
+        left, right = left.assign(__p=0), right.assign(__p=0)
+        block = ['__p']
+    sizes = pd.merge(left.groupby(block, dropna=False, observed=True).size().rename('__na').reset_index(),
+                     right.groupby(block, dropna=False, observed=True).size().rename('__nb').reset_index(), on=block)
+    big = sizes['__na'] * sizes['__nb'] > max_block_pairs
+    if big.any():
+        log.warning("join: fuzzy %s skips %d blocks over max_block_pairs=%d (largest %d x %d); add blocking keys or prefix_block",
+                    on, int(big.sum()), max_block_pairs, int(sizes.loc[big, '__na'].max()), int(sizes.loc[big, '__nb'].max()))
+    cand = left.merge(sizes.loc[~big, block], on=block).merge(right, on=block, suffixes=('_a', '_b'))
+    if cand.empty:
+        return same
+    cand['__s'] = _similarity(cand['__n_a'].tolist(), cand['__n_b'].tolist())
+    cand = cand[cand['__s'] >= threshold]
+    return pd.concat([same, _mutual_best(cand, '__s', higher_is_better=True)], ignore_index=True)
+
+def fuzzy_key_map(A_res: pd.DataFrame, B_res: pd.DataFrame, keys: list[str], passes) -> pd.DataFrame:
+    """Pair the distinct unmatched key tuples of A and B through the configured fuzzy passes.
+
+    Returns one row per paired B tuple: B's key columns plus `__to_<key>` holding A's values.
+    """
+    A_res, B_res = A_res[keys].reset_index(drop=True), B_res[keys].reset_index(drop=True)
+    parts = []
+    for p in passes:
+        if A_res.empty or B_res.empty:
+            break
+        by = [k for k in keys if k != p.on] if p.by is None else list(p.by)
+        if p.on not in keys or any(k not in keys for k in by):
+            raise ValueError(f"join.fuzzy: on={p.on!r} and by={by} must be join keys {keys}")
+        if p.method == 'nearest':
+            pairs = _nearest_pairs(A_res, B_res, p.on, by, p.tolerance)
+        else:
+            pairs = _string_pairs(A_res, B_res, p.on, by, p.threshold, p.prefix_block, p.max_block_pairs)
+        log.info("join: fuzzy %s pass on %s paired %d keys (unmatched A=%d B=%d)", p.method, p.on, len(pairs), len(A_res), len(B_res))
+        if pairs.empty:
+            continue
+        ia, ib = pairs['__a'].to_numpy(), pairs['__b'].to_numpy()
+        m = B_res.iloc[ib].reset_index(drop=True)
+        for k in keys:
+            m[f"{_TO}{k}"] = A_res[k].iloc[ia].to_numpy()
+        parts.append(m)
+        A_res = A_res.drop(index=A_res.index[ia]).reset_index(drop=True)
+        B_res = B_res.drop(index=B_res.index[ib]).reset_index(drop=True)
+    if not parts:
+        return pd.DataFrame(columns=list(keys) + [f"{_TO}{k}" for k in keys])
+    return pd.concat(parts, ignore_index=True)
+
+def apply_fuzzy(A: pd.DataFrame, B: pd.DataFrame, keys: list[str], passes) -> pd.DataFrame:
+    """B with fuzzily paired keys rewritten to A's, B's own value kept as __fuzzy_<on>, plus fuzzy_matched.
+
+    The kept values can't take their final <on><prefix_B> name yet: with a key_name the merge
+    suffixes B's key columns to exactly that (see restore_fuzzy).
+    """
+    codes_a, codes_b = encode_join_keys(A, B, keys)
+    A_res = A.loc[~np.isin(codes_a, codes_b), keys].drop_duplicates()
+    B_res = B.loc[~np.isin(codes_b, codes_a), keys].drop_duplicates()
+    mapping = fuzzy_key_map(A_res, B_res, keys, passes)
+    B = B.copy(deep=False)
+    if mapping.empty:
+        B[FUZZY_FLAG] = False
+        return B
+    codes_b, codes_m = encode_join_keys(B, mapping, keys)
+    pos = pd.Index(codes_m).get_indexer(codes_b)
+    hit = pos >= 0
+    take = np.where(hit, pos, 0)
+    for on in dict.fromkeys(p.on for p in passes):
+        B[f"{_FUZZY}{on}"] = B[on].where(hit)
+    for k in keys:
+        B[k] = B[k].mask(hit, pd.Series(mapping[f"{_TO}{k}"].to_numpy()[take], index=B.index))
+    B[FUZZY_FLAG] = hit
+    return B
+
+def restore_fuzzy(df: pd.DataFrame, passes, prefix_B: str = '_B') -> pd.DataFrame:
+    """Move apply_fuzzy's kept values to <on><prefix_B> in the merged frame.
+
+    When the merge already made that column (B's rewritten key, with a key_name), the kept value
+    replaces it on the fuzzily paired rows.
+    """
+    for on in dict.fromkeys(p.on for p in passes):
+        kept = df.pop(f"{_FUZZY}{on}") if f"{_FUZZY}{on}" in df.columns else None
+        if kept is None:
+            continue
+        b_col = f"{on}{prefix_B}"
+        df[b_col] = kept.where(kept.notna(), df[b_col]) if b_col in df.columns else kept
     return df
 
-def join(A: pd.DataFrame, B: pd.DataFrame, keys: list[str], how, key_name, prefix_A="_A", prefix_B='_B') -> pd.DataFrame:
+# === Duplicate join keys ===
+# Without aggregation (or with a group_by finer than the join keys) a key can repeat on both
+# sides, and the merge emits every A x B pair of it. Per-side key counts (hash group-bys) give
+# the projected output size before the merge allocates anything; the policies then either stop,
+# or make each key join 1:1 through a per-key row number (RANK).
+
+RANK = '__dup_rank'
+_PAIRING = ('dedupe', 'rank', 'cap')
+
+def key_counts(A: pd.DataFrame, B: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """keys + count_A/count_B for every distinct key (0 on a side it is missing from)."""
+    ca = A.groupby(keys, dropna=False, observed=True, sort=False).size().rename('count_A').reset_index()
+    cb = B.groupby(keys, dropna=False, observed=True, sort=False).size().rename('count_B').reset_index()
+    for k in keys:
+        ca[k], cb[k] = _aligned(ca[k], cb[k])
+    counts = ca.merge(cb, on=keys, how='outer')
+    return counts.fillna({'count_A': 0, 'count_B': 0}).astype({'count_A': 'int64', 'count_B': 'int64'})
+
+def duplicate_report(counts: pd.DataFrame, how: str, cfg) -> tuple[pd.DataFrame, dict]:
+    """Keys repeated on either side (largest expansion first) and a summary with the projected join size."""
+    a, b = counts['count_A'].to_numpy(), counts['count_B'].to_numpy()
+    cross = a * b
+    policy = getattr(cfg, 'policy', 'allow')
+    if policy == 'dedupe':
+        a, b = np.minimum(a, 1), np.minimum(b, 1)
+    ranked = np.zeros(len(a), dtype=bool)
+    if policy == 'rank':
+        ranked[:] = True
+    elif policy == 'cap':
+        ranked = cross > int(getattr(cfg, 'max_pairs_per_key', 100))
+    pairs = np.where(ranked, np.minimum(a, b), a * b)
+    only_a = np.where(ranked, a - pairs, np.where(b == 0, a, 0))
+    only_b = np.where(ranked, b - pairs, np.where(a == 0, b, 0))
+    rows = {'inner': pairs, 'left': pairs + only_a, 'right': pairs + only_b}.get(how, pairs + only_a + only_b)
+    dup = (counts['count_A'].to_numpy() > 1) | (counts['count_B'].to_numpy() > 1)
+    dups = counts[dup].assign(pairs=cross[dup]).sort_values('pairs', ascending=False, kind='stable')
+    info = {
+        'policy': policy,
+        'duplicate_keys_A': int((counts['count_A'] > 1).sum()),
+        'duplicate_keys_B': int((counts['count_B'] > 1).sum()),
+        'largest_key_pairs': int(cross.max()) if len(cross) else 0,
+        'projected_rows': int(rows.sum()),
+    }
+    return dups, info
+
+def enforce_duplicates(info: dict, cfg):
+    """Raise per the policy / max_rows before anything is merged."""
+    if getattr(cfg, 'policy', 'allow') == 'fail' and (info['duplicate_keys_A'] or info['duplicate_keys_B']):
+        raise ValueError(f"join: duplicate keys (A={info['duplicate_keys_A']}, B={info['duplicate_keys_B']}, "
+                         f"largest key {info['largest_key_pairs']} pairs); see duplicate_keys")
+    max_rows = getattr(cfg, 'max_rows', None)
+    if max_rows is not None and info['projected_rows'] > max_rows:
+        raise ValueError(f"join: would produce {info['projected_rows']} rows, over join.duplicates.max_rows={max_rows}; "
+                         f"see duplicate_keys")
+
+def rank_duplicates(A: pd.DataFrame, B: pd.DataFrame, keys: list[str], cfg) -> tuple[pd.DataFrame, pd.DataFrame, bool]:
+    """A/B prepared for a pairing policy; the flag says whether the join must also match on RANK.
+
+    dedupe keeps each key's first row; rank numbers the rows of every key; cap numbers only the
+    keys whose A x B pairs exceed max_pairs_per_key (the rest keep RANK 0 and cross-join).
+    """
+    order = [c for c in getattr(cfg, 'order_by', None) or [] if c in A.columns and c in B.columns]
+    if order:
+        A, B = A.sort_values(order, kind='stable'), B.sort_values(order, kind='stable')
+    codes_a, codes_b = encode_join_keys(A, B, keys)
+    rank_a = pd.Series(codes_a).groupby(codes_a, sort=False).cumcount().to_numpy()
+    rank_b = pd.Series(codes_b).groupby(codes_b, sort=False).cumcount().to_numpy()
+    if cfg.policy == 'dedupe':
+        return A[rank_a == 0].copy(deep=False), B[rank_b == 0].copy(deep=False), False
+    if cfg.policy == 'cap':
+        pairs = pd.Series(codes_a).value_counts().mul(pd.Series(codes_b).value_counts(), fill_value=0)
+        over = pairs.index[pairs.to_numpy() > cfg.max_pairs_per_key]
+        rank_a = np.where(np.isin(codes_a, over), rank_a, 0)
+        rank_b = np.where(np.isin(codes_b, over), rank_b, 0)
+    A, B = A.copy(deep=False), B.copy(deep=False)
+    A[RANK], B[RANK] = rank_a, rank_b
+    return A, B, True
+
+def join(A: pd.DataFrame, B: pd.DataFrame, keys: list[str], how, key_name, prefix_A="_A", prefix_B='_B', readable_key: bool = True, value_cols: list[str] | None = None, fuzzy=None, duplicates=None) -> pd.DataFrame:
+    A, B = align_categoricals(A, B, keys)
+    if fuzzy:
+        B = apply_fuzzy(A, B, keys, fuzzy)
+    ranked = False
+    if duplicates is not None and getattr(duplicates, 'policy', 'allow') in _PAIRING:
+        A, B, ranked = rank_duplicates(A, B, keys, duplicates)
+    match_keys = keys + [RANK] if ranked else keys
     if key_name:
-        A = build_join_key(A, keys, key_name)
-        B = build_join_key(B, keys, key_name)
+        # merge on compact integer codes; the readable key is rebuilt after the merge only if wanted
+        codes_a, codes_b = encode_join_keys(A, B, match_keys)
+        A[key_name], B[key_name] = codes_a, codes_b
         on = [key_name]
     else:
-        on = keys
+        on = match_keys
     suffixes=(f"{prefix_A}", f"{prefix_B}")
     # Use merge with explicit suffixes to avoid collisions
-    df = A.merge(B, how=JOIN_TYPE_MAP.get(how, 'outer'), on=on, suffixes=suffixes)
+    df = A.merge(B, how=JOIN_TYPE_MAP.get(how, 'outer'), on=on, suffixes=suffixes, indicator=_COVERAGE)
+    if not key_name and JOIN_TYPE_MAP.get(how, 'outer') == 'outer':
+        df = _nulls_last(df, on)
     # === NEW: coalesce original join key columns back to unsuffixed names ===
     # Prefer A_<col>, fall back to B_<col>. If both exist and are equal, either is fine.
     for k in keys:
@@ -35,14 +381,25 @@ def join(A: pd.DataFrame, B: pd.DataFrame, keys: list[str], how, key_name, prefi
                 df[k] = df[a_col]
             elif b_col in df.columns:
                 df[k] = df[b_col]
-    # === coverage flags (unchanged) ===
-    # Coverage flags 
-    if prefix_A and prefix_B:
-        df['only_in_A'] = df.filter(like=prefix_B).isna().all(axis=1)
-        df['only_in_B'] = df.filter(like=prefix_A).isna().all(axis=1)
-        df['in_both'] = ~(df['only_in_A'] | df['only_in_B'])
-
-    # === NEW: fill NaN for numeric columns with 0.0 ===
-    num_cols = df.select_dtypes(include=[np.number]).columns
+    if key_name and readable_key:
+        df[key_name] = df[key_name].map(_key_labels(A, B, codes_a, codes_b, keys))
+    if ranked:
+        df = df.drop(columns=[c for c in (RANK, f"{RANK}{prefix_A}", f"{RANK}{prefix_B}") if c in df.columns])
+    # === coverage flags from the merge indicator: one small categorical column, O(rows) ===
+    # (a B row whose values are all null is still "in B")
+    side = df.pop(_COVERAGE)
+    df['only_in_A'] = (side == 'left_only').to_numpy()
+    df['only_in_B'] = (side == 'right_only').to_numpy()
+    df['in_both'] = (side == 'both').to_numpy()
+    if fuzzy:
+        df[FUZZY_FLAG] = df[FUZZY_FLAG].eq(True).to_numpy() & df['in_both'].to_numpy()
+        df = restore_fuzzy(df, fuzzy, prefix_B)
+
+    # === fill NaN with 0.0 so deltas compute: only the reconciled value columns when known ===
+    if value_cols is None:
+        num_cols = df.select_dtypes(include=[np.number]).columns
+    else:
+        candidates = dict.fromkeys(f"{c}{sfx}" for c in value_cols for sfx in (prefix_A, prefix_B, ''))
+        num_cols = [c for c in candidates if c in df.columns and pd.api.types.is_numeric_dtype(df[c])]
     df[num_cols] = df[num_cols].fillna(0.0)
     return df
@@ -1,33 +1,36 @@
 from __future__ import annotations
+import json
 import yaml
 from pathlib import Path
 import pandas as pd
-from .io import ReadSpec
-from .sanitize import sanitize
-from .filter import apply_filters
-from .aggregate import aggregate
-from .joiner import join
-from .reconcile import reconcile
-from .report import emit_reports
+from .reconcile import recon_columns
 from .audit import write_audit
 from .drilldown import run_drilldown   
 from .config import RootCfg
+from .cache import open_cache
+from .utils import sha256_text
+from .dtypes import memory_report
+from .filter import compile_filter, filter_columns
+from .profiling import RunProfile
+from .incremental import RunState, config_hash, reconcile_incremental
+from .joiner import duplicate_report, enforce_duplicates
+from .report import update_metrics, write_table
+from ..backends import get_backend
 
 import logging
 log = logging.getLogger(__name__)
 
-import time
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
-@contextmanager
-def _stage(name: str):
-    start = time.perf_counter()
-    log.info("%s: start", name)
-    try:
-        yield
-    finally:
-        dur = time.perf_counter() - start
-        log.info("%s: done in %.3fs", name, dur)
+def _track(memory: dict, stage: str, df, cache=None, key=None):
+    # per-stage footprint of pandas frames, for metrics.json's memory section; a memory cache
+    # already measured the frames it holds
+    report = getattr(cache, 'memory_report', None)
+    rep = report(key, df) if report is not None else memory_report(df)
+    if rep is not None:
+        memory[stage] = rep
+        log.info("%s: %d rows, %.1f MiB in memory (%.1f MiB without the dtype plan)", stage, rep['rows'],
+                 rep['bytes'] / 2**20, rep['bytes_unplanned'] / 2**20)
 
 
 _DEF_JOIN_TYPE='outer'
@@ -41,27 +44,62 @@ def _load_config(path: str) -> tuple[RootCfg, str]:
     return RootCfg(**raw), text
 
 
-def _load_and_prepare(label: str, cfg) -> pd.DataFrame:
-    # cfg is a dataclass (e.g., InputCfg) with attributes like path, delimiter, encoding, dtypes, header
-    read = ReadSpec(
-        path=cfg.path,
-        delimiter=getattr(cfg, 'delimiter', None),
-        encoding=getattr(cfg, 'encoding', None),
-        dtypes=getattr(cfg, 'dtypes', None),
-        header=getattr(cfg, 'header', None),
-    )
-    df = read.read()
-    df = sanitize(df, getattr(cfg, 'sanitize', None))
-    df = apply_filters(df, getattr(cfg, 'prefilter', None))
-    return df
+def _required_columns(cfg: RootCfg, side: str) -> list[str] | None:
+    """Post-sanitize columns side `side` contributes downstream; None when every column may be needed.
+
+    With an aggregate spec only its group_by/metrics, join keys, reconcile columns, drilldown
+    additions and prefilter columns survive, so readers can skip everything else.
+    """
+    spec = getattr(getattr(cfg, 'aggregate', None), side, None)
+    group_by = list(getattr(spec, 'group_by', None) or [])
+    if not group_by:
+        return None
+    cols = group_by + list(getattr(spec, 'metrics', {}) or {})
+    cols += list(getattr(getattr(cfg, 'join', None), 'keys', None) or [])
+    cols += recon_columns(getattr(cfg, 'reconcile', None)) or []
+    cols += recon_columns(getattr(cfg, 'reconcile', None), 'non_numeric') or []
+    dd = getattr(cfg, 'drilldown', None)
+    if dd is not None and getattr(dd, 'enabled', False):
+        for level in getattr(dd, 'levels', None) or []:
+            cols += list(getattr(level, 'add', None) or []) + list(getattr(level, f'{side}_add', None) or [])
+    side_cfg = getattr(getattr(cfg, 'inputs', None), side, None)
+    cols += filter_columns(getattr(side_cfg, 'prefilter', None))
+    return list(dict.fromkeys(cols))
+
+
+def _post_filters(cfg: RootCfg) -> dict:
+    """Top-level `filters` by side, checked up front so a typo fails before anything is read."""
+    filters = getattr(cfg, 'filters', None) or {}
+    unknown = sorted(set(filters) - {'A', 'B'})
+    if unknown:
+        raise ValueError(f"filters: unknown side(s) {unknown}; expected A and/or B")
+    for side, preds in filters.items():
+        compile_filter(preds)
+    return {side: preds for side, preds in filters.items() if preds}
+
 
+def run_job(config_path: str, out_dir: str, backend_name: str | None = None,
+            use_cache: bool = True, refresh_cache: bool = False, profile: str | None = None,
+            memory_cache=None, progress=None, cache_dir: str | None = None):
+    """Run one reconciliation job; per-stage measurements go to <out_dir>/run_profile.json.
 
-def run_job(config_path: str, out_dir: str, backend_name: str = 'pandas'):
+    `profile` ('cprofile' or 'pyinstrument') additionally captures the whole run. Long-running
+    callers (core/service.py) pass a MemoryCache kept between jobs, and a `progress(event, stage,
+    wall_s)` callback that sees every stage start and finish. `cache_dir` (batch) is the prepared-input
+    cache for jobs that don't enable one in job.cache.
+    """
+    prof = RunProfile(capture=profile, listener=progress)
+    prof.info = {'config': str(config_path), 'status': 'failed'}
+    prof.start_capture()
     try:
-        log.info("Run started: backend=%s, out_dir=%s", backend_name, out_dir)
         cfg, cfg_text = _load_config(config_path)
         log.debug("config loaded from %s", config_path)
         job = getattr(cfg, 'job', None)
+        # explicit --backend wins over job.backend
+        backend_name = backend_name or getattr(job, 'backend', None) or 'pandas'
+        backend = get_backend(backend_name, **(getattr(job, 'backend_options', None) or {}))
+        prof.info.update(job=getattr(job, 'name', None), backend=backend_name)
+        log.info("Run started: backend=%s, out_dir=%s", backend_name, out_dir)
         if job : 
             log.info(" **** Running Reconciliation Framework for %s **** ", getattr(job,'name', ''))
         inputs = getattr(cfg, 'inputs', None)
@@ -77,65 +115,209 @@ def run_job(config_path: str, out_dir: str, backend_name: str = 'pandas'):
         
         suffix_A = f"_A"
         suffix_B = f"_B"
-        with _stage("read+prep A"):
-            A = _load_and_prepare('A', A_cfg)
-            log.debug("A shape: %s", getattr(A, 'shape', None))
-            # DEBUG: uncomment to sample rows during investigation
-            # log.debug("A head:\n%s", A.head(5))
-        with _stage("read+prep B"):
-            B = _load_and_prepare('B', B_cfg)
-            log.debug("B shape: %s", getattr(B, 'shape', None))
-            # DEBUG: uncomment to sample rows during investigation
-            # log.debug("B head:\n%s", B.head(5))
-        # Aggregate separately
-        with _stage("aggregate"):
-            A_agg = aggregate(A, getattr(getattr(cfg, 'aggregate', None), 'A', None))
-            B_agg = aggregate(B, getattr(getattr(cfg, 'aggregate', None), 'B', None))
+        aggA_spec = getattr(getattr(cfg, 'aggregate', None), 'A', None)
+        aggB_spec = getattr(getattr(cfg, 'aggregate', None), 'B', None)
+        dd = getattr(cfg, 'drilldown', None)
+        drill = bool(dd and getattr(dd, 'enabled', False) and getattr(dd, 'levels', None))
+
+        cache = open_cache(job, enabled=use_cache, refresh=refresh_cache, default_dir=cache_dir)
+        if memory_cache is not None and use_cache:
+            cache = memory_cache.over(cache)
+        if cache is not None:
+            log.info("cache: dir=%s max_bytes=%d refresh=%s", cache.dir, cache.max_bytes, cache.refresh)
+        memory = {}
+
+        def _prep_side(label: str, side_cfg, spec):
+            prepared = agg = prep_key = agg_key = None
+            with prof.stage(f"read+prep {label}") as st:
+                columns = _required_columns(cfg, label)
+                if cache is not None:
+                    # warm runs skip parsing: the prepared frame, or (when this side would have been
+                    # streamed straight into its aggregate) the aggregate itself
+                    prep_key = cache.key(side_cfg, backend.name, columns)
+                    prepared = cache.load(backend, prep_key, label)
+                    if prepared is None and not drill:
+                        agg_key = cache.key(side_cfg, backend.name, columns, aggregate=spec)
+                        agg = cache.load(backend, agg_key, label)
+                loaded = prepared is not None or agg is not None
+                # drilldown re-aggregates the prepared rows, so it still needs them
+                if not loaded and not drill:
+                    agg = backend.read_aggregated(label, side_cfg, spec, columns=columns)
+                    if agg is not None and cache is not None:
+                        agg = cache.store(backend, agg_key, agg, label)
+                if prepared is None and agg is None:
+                    prepared = backend.prepare(label, side_cfg, columns=columns)
+                    if cache is not None:
+                        prepared = cache.store(backend, prep_key, prepared, label)
+                if drill and not loaded:
+                    # every level reuses the prepared frames; lazy engines would otherwise re-scan per level
+                    # (frames loaded from the cache are already materialized)
+                    prepared = backend.persist(prepared)
+                log.debug("%s shape: %s", label, getattr(prepared, 'shape', None))
+                _track(memory, f"prepare_{label}" if prepared is not None else f"aggregate_{label}",
+                       prepared if prepared is not None else agg, cache, prep_key if prepared is not None else agg_key)
+                st.outputs(prepared if prepared is not None else agg)
+                # DEBUG: uncomment to sample rows during investigation
+                # log.debug("%s head:\n%s", label, prepared.head(5))
+            return prepared, agg
+
+        agg_keys = {}
+
+        def _aggregate(label: str, side_cfg, df, spec):
+            # a memory cache (service) also keeps aggregates and joins, so re-runs that only change
+            # reconcile/report settings skip both
+            key = None
+            if getattr(cache, 'memoize_aggregates', False) and getattr(spec, 'group_by', None):
+                key = agg_keys[label] = cache.key(side_cfg, backend.name, _required_columns(cfg, label), aggregate=spec)
+                agg = cache.load(backend, key, f"{label} aggregate")
+                if agg is not None:
+                    return agg
+            agg = backend.aggregate(df, spec)
+            if key is not None:
+                agg = cache.store(backend, key, agg, f"{label} aggregate", memory_only=True)
+            return agg
+
+        # A and B are independent: parse them side by side (the CSV/Arrow parsers release the GIL)
+        sides = [('A', A_cfg, aggA_spec), ('B', B_cfg, aggB_spec)]
+        parallel = getattr(job, 'parallel_inputs', True) and getattr(backend, 'thread_safe', True)
+        with prof.stage("read+prep"):
+            if parallel:
+                with ThreadPoolExecutor(max_workers=2, thread_name_prefix="prep") as pool:
+                    (A, A_agg), (B, B_agg) = pool.map(lambda side: _prep_side(*side), sides)
+            else:
+                (A, A_agg), (B, B_agg) = [_prep_side(*side) for side in sides]
+        # Aggregate separately (sides already folded while streaming are skipped)
+        with prof.stage("aggregate") as st:
+            st.inputs(A if A_agg is None else None, B if B_agg is None else None)
+            if A_agg is None:
+                A_agg = _aggregate('A', A_cfg, A, aggA_spec)
+                _track(memory, 'aggregate_A', A_agg, cache, agg_keys.get('A'))
+            if B_agg is None:
+                B_agg = _aggregate('B', B_cfg, B, aggB_spec)
+                _track(memory, 'aggregate_B', B_agg, cache, agg_keys.get('B'))
             log.debug("A_agg shape: %s; B_agg shape: %s", getattr(A_agg, 'shape', None), getattr(B_agg, 'shape', None))
+            st.outputs(A_agg, B_agg)
+        # Post-aggregate filters (top-level `filters`, per side); drilldown levels re-aggregate the
+        # prepared rows and are not affected
+        post = _post_filters(cfg)
+        if post:
+            with prof.stage("filters") as st:
+                st.inputs(A_agg, B_agg)
+                if post.get('A'):
+                    A_agg = backend.filter(A_agg, post['A'])
+                if post.get('B'):
+                    B_agg = backend.filter(B_agg, post['B'])
+                st.outputs(A_agg, B_agg)
         # Join
         join_cfg = getattr(cfg, 'join', None)
         keys = (getattr(join_cfg, 'keys', None) or []) if join_cfg else []
         join_type = (getattr(join_cfg, 'type', None) or _DEF_JOIN_TYPE) if join_cfg else _DEF_JOIN_TYPE
         key_name = getattr(join_cfg, 'key_name', None) if join_cfg else None
-        log.info("join: keys=%s, how=%s, key_name=%s", keys, join_type, key_name)
-        with _stage("join"):
-            df = join(A_agg, B_agg, keys=keys, how=join_type, key_name=key_name, prefix_A=suffix_A, prefix_B=suffix_B)
-            log.debug("joined shape: %s", getattr(df, 'shape', None))
-            # DEBUG: uncomment to sample rows during investigation
-            # log.debug("joined head:\n%s", df.head(5))
-        # Reconcile
-        with _stage("reconcile"):
-            df = reconcile(
-                df,
-                getattr(cfg, 'reconcile', None),
-                recon_cols_section='numeric',
-                prefix_A=suffix_A,
-                prefix_B=suffix_B,
-            )
-        log.debug("post-reconcile shape: %s", getattr(df, 'shape', None))
-        # Reports
         report_cfg = getattr(cfg, 'report', None)
         select_keys = None
         if report_cfg is not None and getattr(report_cfg, 'select', None) is not None:
             if getattr(report_cfg.select, 'keys', None) is not None:
                 select_keys = report_cfg.select.keys
-        with _stage("emit_reports"):
-            emit_reports(df, report_cfg, select_cols=select_keys, suffix_A=suffix_A, suffix_B=suffix_B)
+        # only spell out the readable key_name when the report will actually show it
+        readable_key = not select_keys or key_name in select_keys
+        log.info("join: keys=%s, how=%s, key_name=%s", keys, join_type, key_name)
+        join_kwargs = dict(how=join_type, key_name=key_name, prefix_A=suffix_A, prefix_B=suffix_B,
+                           readable_key=readable_key, value_cols=recon_columns(getattr(cfg, 'reconcile', None)),
+                           fuzzy=(getattr(join_cfg, 'fuzzy', None) or None) if join_cfg else None)
+        reconcile_kwargs = dict(rules=getattr(cfg, 'reconcile', None), recon_cols_section='numeric',
+                                prefix_A=suffix_A, prefix_B=suffix_B)
+        # duplicate keys: count per side before the merge can blow up. Raw (unaggregated) rows are where
+        # keys repeat, so they are checked by default
+        dup_cfg = getattr(join_cfg, 'duplicates', None) if join_cfg else None
+        raw_side = not getattr(aggA_spec, 'group_by', None) or not getattr(aggB_spec, 'group_by', None)
+        policy = getattr(dup_cfg, 'policy', None) or ('report' if raw_side else 'allow')
+        dup_info = None
+        if keys and dup_cfg is not None and (policy != 'allow' or dup_cfg.max_rows is not None):
+            dup_cfg = dup_cfg.model_copy(update={'policy': policy})
+            with prof.stage("duplicate keys") as st:
+                st.inputs(A_agg, B_agg)
+                dups, dup_info = duplicate_report(backend.key_counts(A_agg, B_agg, keys), join_type, dup_cfg)
+                st.outputs(dups)
+                log.info("join: duplicate keys A=%d B=%d, projected rows=%d (policy=%s)", dup_info['duplicate_keys_A'],
+                         dup_info['duplicate_keys_B'], dup_info['projected_rows'], policy)
+                if report_cfg is not None:
+                    write_table(report_cfg, 'duplicate_keys', dups)
+                enforce_duplicates(dup_info, dup_cfg)
+            if policy in ('dedupe', 'rank', 'cap'):
+                join_kwargs['duplicates'] = dup_cfg
+        inc_cfg = getattr(job, 'incremental', None)
+        incremental = bool(inc_cfg and getattr(inc_cfg, 'enabled', False))
+        if incremental and not (keys and isinstance(A_agg, pd.DataFrame) and isinstance(B_agg, pd.DataFrame)):
+            log.warning("incremental: needs join keys and the pandas backend; reconciling everything")
+            incremental = False
+        if incremental and join_kwargs['fuzzy']:
+            # a fuzzy pair can span a changed and an unchanged key
+            log.warning("incremental: join.fuzzy pairs keys across runs' changes; reconciling everything")
+            incremental = False
+        inc_info = None
+        if incremental:
+            state = RunState(getattr(inc_cfg, 'state_dir', None) or Path(out_dir) / 'state')
+            with prof.stage("join+reconcile (incremental)") as st:
+                st.inputs(A_agg, B_agg)
+                df, inc_info = reconcile_incremental(backend, A_agg, B_agg, keys, state, config_hash(cfg, backend.name),
+                                                     join_kwargs, reconcile_kwargs)
+                st.outputs(df)
+        else:
+            with prof.stage("join") as st:
+                st.inputs(A_agg, B_agg)
+                join_key = None
+                if agg_keys.get('A') and agg_keys.get('B'):
+                    join_key = sha256_text(json.dumps({'A': agg_keys['A'], 'B': agg_keys['B'], 'filters': post,
+                                                       'keys': keys, 'join': join_kwargs}, sort_keys=True, default=str))
+                df = cache.load(backend, join_key, 'join') if join_key else None
+                if df is None:
+                    df = backend.join(A_agg, B_agg, keys=keys, **join_kwargs)
+                    if join_key:
+                        df = cache.store(backend, join_key, df, 'join', memory_only=True)
+                st.outputs(df)
+                _track(memory, 'join', df, cache, join_key)
+                log.debug("joined shape: %s", getattr(df, 'shape', None))
+                # DEBUG: uncomment to sample rows during investigation
+                # log.debug("joined head:\n%s", df.head(5))
+            # Reconcile
+            with prof.stage("reconcile") as st:
+                st.inputs(df)
+                df = backend.reconcile(df, **reconcile_kwargs)
+                st.outputs(df)
+        _track(memory, 'reconcile', df)
+        log.debug("post-reconcile shape: %s", getattr(df, 'shape', None))
+        # Reports
+        with prof.stage("emit_reports") as st:
+            st.inputs(df)
+            df = backend.write(df, report_cfg, select_cols=select_keys, suffix_A=suffix_A, suffix_B=suffix_B)
+            if inc_info is not None:
+                update_metrics(report_cfg, incremental=inc_info)
+            if dup_info is not None:
+                update_metrics(report_cfg, duplicates=dup_info)
+            if memory:
+                update_metrics(report_cfg, memory=memory)
         # Audit
-        with _stage("audit"):
+        with prof.stage("audit"):
             write_audit(out_dir, cfg_text)
         # === NEW: Drill-down (iterative un-group) ===
         # ...
         # === Drill paths ===
-        dd = getattr(cfg, 'drilldown', None)
-        if dd and getattr(dd, 'enabled', False) and getattr(dd, 'levels', None):
+        if drill:
             log.info("drilldown: enabled strategy=%s levels=%d", getattr(dd, 'strategy', 'add'), len(dd.levels))
-            with _stage("drilldown"):
-                run_drilldown(A, B, cfg, dd.levels, strategy=getattr(dd, 'strategy', 'add'))
+            with prof.stage("drilldown") as st:
+                st.inputs(A, B)
+                run_drilldown(A, B, cfg, dd.levels, strategy=getattr(dd, 'strategy', 'add'), backend=backend,
+                              max_workers=getattr(dd, 'max_workers', 1), profile=prof)
         else:
             log.info("drilldown: disabled")
         log.info("Run completed: backend=%s", backend_name)
+        prof.info['status'] = 'ok'
         return df
     except Exception:
         log.exception("Pipeline failed: config_path=%s", config_path)
         raise
+    finally:
+        try:
+            prof.write(out_dir)
+        except Exception:  # never mask the run's own outcome
+            log.exception("profile: could not write run_profile.json")
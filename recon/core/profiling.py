@@ -0,0 +1,212 @@
+from __future__ import annotations
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import logging
+log = logging.getLogger(__name__)
+
+# Per-stage instrumentation: every pipeline stage (and drilldown level) records wall and CPU time,
+# resident memory, the shapes of the frames going in and out, and the bytes the process read and
+# wrote meanwhile. CPU, memory and I/O counters are process-wide, so stages running concurrently
+# (read+prep A/B, parallel drilldown levels) see each other's work. The whole run can additionally
+# be captured with cProfile or pyinstrument (--profile). Everything lands in run_profile.json.
+
+CAPTURES = ('cprofile', 'pyinstrument')
+_MB = 1024 * 1024
+_HOTSPOTS = 30
+
+
+def _rss() -> Optional[int]:
+    # current resident set size (Linux); None elsewhere
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB on Linux
+
+
+def _io() -> dict:
+    # bytes moved through read/write syscalls, page cache hits included (Linux); {} elsewhere
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ', 1) for line in f.read().splitlines() if ': ' in line)
+        return {'read': int(fields['rchar']), 'written': int(fields['wchar'])}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _mb(b: Optional[int]) -> Optional[float]:
+    return None if b is None else round(b / _MB, 3)
+
+
+def _shape(df) -> dict:
+    # lazy frames (polars LazyFrame, duckdb relations) have no row count without running them
+    shape = getattr(df, 'shape', None)
+    if isinstance(shape, tuple) and len(shape) == 2:
+        return {'rows': int(shape[0]), 'cols': int(shape[1])}
+    return {'rows': None, 'cols': None}
+
+
+class StageRecord:
+    """Measurements of one stage; the caller adds the frames going in and out."""
+
+    def __init__(self, name: str, level: Optional[int] = None):
+        self.name = name
+        self.level = level
+        self.status = 'ok'
+        self.frames_in: list[dict] = []
+        self.frames_out: list[dict] = []
+        self.metrics: dict = {}
+
+    def inputs(self, *frames):
+        self.frames_in += [_shape(f) for f in frames if f is not None]
+
+    def outputs(self, *frames):
+        self.frames_out += [_shape(f) for f in frames if f is not None]
+
+    def to_dict(self) -> dict:
+        out = {'stage': self.name}
+        if self.level is not None:
+            out['level'] = self.level
+        out.update(self.metrics)
+        out['status'] = self.status
+        out['frames_in'] = self.frames_in
+        out['frames_out'] = self.frames_out
+        return out
+
+
+class RunProfile:
+    """Stage records of one run, plus an optional cProfile/pyinstrument capture of the whole run."""
+
+    def __init__(self, capture: Optional[str] = None, listener=None):
+        if capture is not None and capture not in CAPTURES:
+            raise ValueError(f"profile capture must be one of {CAPTURES}, got {capture!r}")
+        self.capture = capture
+        self.stages: list[StageRecord] = []
+        self.info: dict = {}
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._profiler = None
+        # listener(event, stage, wall_s): 'start' when a stage begins, then 'ok'/'failed' (service progress)
+        self.listener = listener
+
+    def _notify(self, event: str, name: str, wall: Optional[float] = None):
+        if self.listener is None:
+            return
+        try:
+            self.listener(event, name, wall)
+        except Exception:  # progress reporting never fails the run
+            log.debug("profile: listener failed for %s %s", event, name, exc_info=True)
+
+    @contextmanager
+    def stage(self, name: str, level: Optional[int] = None):
+        rec = StageRecord(name, level)
+        log.info("%s: start", name)
+        self._notify('start', name)
+        io0, rss0, peak0 = _io(), _rss(), _peak_rss()
+        start, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield rec
+        except BaseException:
+            rec.status = 'failed'
+            raise
+        finally:
+            wall = time.perf_counter() - start
+            io1, rss1, peak1 = _io(), _rss(), _peak_rss()
+            rec.metrics = {
+                'thread': threading.current_thread().name,
+                'start_s': round(start - self._t0, 6),
+                'wall_s': round(wall, 6),
+                'cpu_s': round(time.process_time() - cpu0, 6),
+                'rss_start_mb': _mb(rss0),
+                'rss_end_mb': _mb(rss1),
+                # growth of the process's high-water mark during the stage (0 when it stayed below it)
+                'peak_rss_delta_mb': _mb(peak1 - peak0) if peak0 is not None else None,
+                'bytes_read': io1['read'] - io0['read'] if io0 else None,
+                'bytes_written': io1['written'] - io0['written'] if io0 else None,
+            }
+            with self._lock:
+                self.stages.append(rec)
+            log.info("%s: done in %.3fs", name, wall)
+            self._notify(rec.status, name, round(wall, 6))
+
+    # --- whole-run capture (--profile) ---
+    def start_capture(self):
+        if self.capture == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+                self._profiler = Profiler()
+            except ImportError:
+                log.warning("profile: pyinstrument not installed; capturing with cProfile")
+                self.capture = 'cprofile'
+        if self.capture == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self._profiler is not None:
+            self._profiler.start()
+
+    def stop_capture(self, out_dir: Path) -> Optional[dict]:
+        """Stop the capture and save it under out_dir; returns the run_profile.json `capture` section."""
+        prof, self._profiler = self._profiler, None
+        if prof is None:
+            return None
+        if self.capture == 'cprofile':
+            import pstats
+            prof.disable()
+            path = out_dir / 'profile.pstats'
+            prof.dump_stats(path)
+            stats = pstats.Stats(prof).stats
+            top = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)[:_HOTSPOTS]
+            hotspots = [{'function': f"{func} ({Path(file).name}:{line})", 'calls': nc,
+                         'tottime_s': round(tt, 6), 'cumtime_s': round(ct, 6)}
+                        for (file, line, func), (cc, nc, tt, ct, _) in top]
+            # cProfile follows the thread that started it: work on the prep/drilldown threads isn't in it
+            return {'tool': 'cprofile', 'file': path.name, 'hotspots': hotspots}
+        prof.stop()
+        path = out_dir / 'profile.html'
+        path.write_text(prof.output_html())
+        return {'tool': 'pyinstrument', 'file': path.name}
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = sorted((s.to_dict() for s in self.stages), key=lambda s: s['start_s'])
+        return {
+            **self.info,
+            'wall_s': round(time.perf_counter() - self._t0, 6),
+            'cpu_s': round(time.process_time() - self._cpu0, 6),
+            'peak_rss_mb': _mb(_peak_rss()),
+            'stages': stages,
+        }
+
+    def write(self, out_dir: str | Path) -> Path:
+        """Write run_profile.json (and the capture, if any) into out_dir, next to audit.json."""
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        capture = self.stop_capture(out)
+        doc = self.to_dict()
+        if capture is not None:
+            doc['capture'] = capture
+        path = out / 'run_profile.json'
+        path.write_text(json.dumps(doc, indent=2))
+        log.info("profile: wrote %s", path)
+        return path
@@ -1,21 +1,77 @@
 from __future__ import annotations
 import math
+import warnings
+import numpy as np
 import pandas as pd
 from typing import Optional
+from .registry import get_comparator, register_comparator, rule_param
+from .text import as_text, lower, normalize
 import logging
 log = logging.getLogger(__name__)
 
 _DEF_MIN_BASE = 1e-8
 
-def _rel_match(a: pd.Series, b: pd.Series, tol_pct: float, min_base: float=_DEF_MIN_BASE) -> pd.Series:
-    base = pd.concat([a.abs(), b.abs()], axis=1).max(axis=1).clip(lower=min_base)
-    return (a - b).abs() <= (base * tol_pct)
+def _values(s: pd.Series):
+    # plain numpy numerics go through ndarray ufuncs; extension dtypes (nullable, arrow) keep their
+    # pandas semantics by staying Series (the same expressions below work on both)
+    if not (isinstance(s.dtype, np.dtype) and s.dtype.kind in 'iuf'):
+        return s
+    # downcast ints (dtype plan) would wrap around in b - a
+    return s.to_numpy(dtype=np.int64) if s.dtype.kind in 'iu' and s.dtype.itemsize < 8 else s.to_numpy()
 
-def _abs_match(a: pd.Series, b: pd.Series, tol_abs: float) -> pd.Series:
-    return (a - b).abs() <= tol_abs
+# Built-in comparators (batched contract, see registry). They reuse reconcile's |b - a|.
 
-def _rounded_match(a: pd.Series, b: pd.Series, decimals: int) -> pd.Series:
-    return a.round(decimals).eq(b.round(decimals))
+@register_comparator('relative')
+def _rel_match(a, b, rule, abs_diff=None):
+    base = np.fmax(np.abs(a), np.abs(b))  # row-wise max that skips a missing side, like max(axis=1)
+    base = np.maximum(base, float(rule_param(rule, 'min_base', _DEF_MIN_BASE)))
+    abs_diff = np.abs(a - b) if abs_diff is None else abs_diff
+    return abs_diff <= base * float(rule_param(rule, 'tol_pct', 0.0))
+
+@register_comparator('absolute')
+def _abs_match(a, b, rule, abs_diff=None):
+    abs_diff = np.abs(a - b) if abs_diff is None else abs_diff
+    return abs_diff <= float(rule_param(rule, 'tol_abs', 0.0))
+
+@register_comparator('rounded')
+def _rounded_match(a, b, rule):
+    decimals = int(rule_param(rule, 'round', 2))
+    return np.round(a, decimals) == np.round(b, decimals)
+
+@register_comparator('exact')
+def _exact_match(a, b, rule):
+    return a == b
+
+@register_comparator('bps')
+def _bps_match(a, b, rule, abs_diff=None):
+    # basis-point tolerance on the larger magnitude: tol_bps=1 -> 0.01%
+    base = np.maximum(np.fmax(np.abs(a), np.abs(b)), float(rule_param(rule, 'min_base', _DEF_MIN_BASE)))
+    abs_diff = np.abs(a - b) if abs_diff is None else abs_diff
+    return abs_diff <= base * float(rule_param(rule, 'tol_bps', 0.0)) / 1e4
+
+def recon_columns(rules: Optional['ReconcileCfg'], recon_cols_section: str = 'numeric') -> list[str]:
+    """Base names of the value columns compared by `rules` (what join must zero-fill), each once."""
+    # several rules may check the same column (e.g. an absolute and a relative tolerance)
+    return list(dict.fromkeys(r.column for r in (getattr(rules, recon_cols_section, []) if rules is not None else [])))
+
+def _reconcile_rule(df: pd.DataFrame, rule, prefix_A: str, prefix_B: str) -> dict:
+    """delta/abs_delta/pct_delta/match columns of one numeric rule, as arrays (Series for extension dtypes)."""
+    out = {}
+    col = rule.column
+    a = _values(df[f"{col}{prefix_A}"] if f"{col}{prefix_A}" in df.columns else df[col])
+    b = _values(df[f"{col}{prefix_B}"] if f"{col}{prefix_B}" in df.columns else df[col])
+    # deltas
+    d = b - a
+    abs_d = np.abs(d)  # |b - a| == |a - b| exactly, so the comparators reuse it
+    out[f"delta_{col}"] = d
+    out[f"abs_delta_{col}"] = abs_d
+    out[f"pct_delta_{col}"] = d / (a.replace(0, _DEF_MIN_BASE) if isinstance(a, pd.Series) else np.where(a == 0, _DEF_MIN_BASE, a))
+    # comparator via the registry (built-ins above, register_comparator, entry points)
+    comp = getattr(rule, 'comparator', 'relative')
+    log.debug("reconcile: column=%s comparator=%s", col, comp)
+    flag = get_comparator(comp)(a, b, rule, abs_diff=abs_d)
+    out[f"match_{col}"] = flag
+    return out
 
 def reconcile(
     df: pd.DataFrame,
@@ -24,43 +80,87 @@ def reconcile(
     prefix_A: str = '_A',
     prefix_B: str = '_B'
 ) -> pd.DataFrame:
-    df = df.copy()
+    # One pass over the rules on the underlying arrays: each delta is computed once and reused, and
+    # the results go straight onto a shallow copy, so the input's columns are never duplicated and
+    # at most one rule's temporaries are alive at a time.
+    df = df.copy(deep=False)
     log.info("reconcile: section=%s", recon_cols_section)
     log.debug("reconcile: input shape=%s", getattr(df, 'shape', None))
     # DEBUG: uncomment to inspect a sample
     # log.debug("reconcile head:\n%s", df.head(5))
-    per_col_flags = []
-    for rule in (getattr(rules, recon_cols_section, []) if rules is not None else []):
-        col = rule.column
-        a = df[f"{col}{prefix_A}"] if f"{col}{prefix_A}" in df.columns else df[col]
-        b = df[f"{col}{prefix_B}"] if f"{col}{prefix_B}" in df.columns else df[col]
-        # deltas
-        df[f"delta_{col}"] = b - a
-        df[f"abs_delta_{col}"] = (b - a).abs()
-        df[f"pct_delta_{col}"] = (b - a) / (a.replace(0, _DEF_MIN_BASE))
-        # comparator via attributes
-        comp = getattr(rule, 'comparator', 'relative')
-        log.debug("reconcile: column=%s comparator=%s", col, comp)
-        if comp == 'relative':
-            tol = float(getattr(rule, 'tol_pct', 0.0))
-            flag = _rel_match(a, b, tol, float(getattr(rule, 'min_base', _DEF_MIN_BASE)))
-        elif comp == 'absolute':
-            flag = _abs_match(a, b, float(getattr(rule, 'tol_abs', 0.0)))
-        elif comp == 'rounded':
-            flag = _rounded_match(a, b, int(getattr(rule, 'round', 2)))
+    # keyed by match column: a later rule on the same column replaces an earlier one
+    flags = {}
+    # pandas silences these for NaN/inf arithmetic; keep the ndarray path just as quiet. Adding one
+    # block per column is the point here, so the fragmentation hint is noise too.
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+        for rule in (getattr(rules, recon_cols_section, []) if rules is not None else []):
+            for name, values in _reconcile_rule(df, rule, prefix_A, prefix_B).items():
+                df[name] = values
+            flags[f"match_{rule.column}"] = values  # match_* comes last
+        # the main pass folds the attribute rules into the same match_flag
+        non_numeric = (getattr(rules, 'non_numeric', None) or []) if recon_cols_section == 'numeric' and rules is not None else []
+        for rule in non_numeric:
+            for name, values in _non_numeric_rule(df, rule, prefix_A, prefix_B).items():
+                df[name] = values
+            flags[f"match_{rule.column}"] = values
+        if flags and any(isinstance(f, pd.Series) for f in flags.values()):
+            # nullable flags: keep all(axis=1)'s NA handling and result dtype
+            df['match_flag'] = df[list(flags)].all(axis=1)
+        elif flags:
+            df['match_flag'] = np.logical_and.reduce(list(flags.values()))
         else:
-            flag = a.eq(b)
-        df[f"match_{col}"] = flag
-        per_col_flags.append(f"match_{col}")
-    if per_col_flags:
-        df['match_flag'] = df[per_col_flags].all(axis=1)
-    else:
-        df['match_flag'] = True
-    log.debug("reconcile: flags computed for %d columns", len(per_col_flags))
+            df['match_flag'] = True
+    log.debug("reconcile: flags computed for %d columns", len(flags))
     return df
 
-# Optional non-numeric API (signature only)
+# === Non-numeric rules ===
+# Attributes (counterparty, status, dates) are compared as Arrow-backed strings (core/text.py).
+
+_TEXT_TRANSFORMS = {'exact': None, 'case_insensitive': lower, 'normalized': normalize}
+
+def _dates(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    # ISO 8601 text (dates with or without a time part), like the polars/duckdb backends; else NaT
+    return pd.to_datetime(s.astype(object) if isinstance(s.dtype, pd.CategoricalDtype) else s, format='ISO8601', errors='coerce')
+
+def _non_numeric_rule(df: pd.DataFrame, rule, prefix_A: str, prefix_B: str) -> dict:
+    """match (and for dates delta_days) columns of one non-numeric rule."""
+    out = {}
+    col = rule.column
+    a = df[f"{col}{prefix_A}"] if f"{col}{prefix_A}" in df.columns else df[col]
+    b = df[f"{col}{prefix_B}"] if f"{col}{prefix_B}" in df.columns else df[col]
+    comp = getattr(rule, 'comparator', 'exact')
+    log.debug("reconcile: column=%s comparator=%s (non-numeric)", col, comp)
+    if comp == 'date_tolerance':
+        a, b = _dates(a), _dates(b)
+        days = ((b - a) / pd.Timedelta(days=1)).to_numpy(dtype=float, na_value=np.nan)
+        out[f"delta_days_{col}"] = days
+        flag = np.abs(days) <= float(getattr(rule, 'tol_days', 0) or 0)
+    elif comp in _TEXT_TRANSFORMS:
+        a, b = as_text(a, _TEXT_TRANSFORMS[comp]), as_text(b, _TEXT_TRANSFORMS[comp])
+        flag = (a == b).to_numpy(dtype=bool, na_value=False)
+    else:
+        raise ValueError(f"unknown non-numeric comparator {comp!r} for column {col!r}")
+    if getattr(rule, 'null_equal', True):
+        flag = flag | (a.isna() & b.isna()).to_numpy()
+    out[f"match_{col}"] = flag
+    return out
 
 def reconcile_non_numeric(df: pd.DataFrame, rules: Optional['ReconcileCfg'], prefix_A='_A', prefix_B='_B') -> pd.DataFrame:
-    """Compare strings/attributes (exact, case-insensitive, normalized)."""
-    raise NotImplementedError
+    """Compare strings/attributes (exact, case-insensitive, normalized, date tolerance) on their own.
+
+    Adds match_<col> per reconcile.non_numeric rule and ANDs them into an existing match_flag
+    (reconcile() already does this for the main pass).
+    """
+    df = df.copy(deep=False)
+    flags = []
+    for rule in ((getattr(rules, 'non_numeric', None) or []) if rules is not None else []):
+        for name, values in _non_numeric_rule(df, rule, prefix_A, prefix_B).items():
+            df[name] = values
+        flags.append(values)
+    if flags:
+        flag = np.logical_and.reduce(flags)
+        df['match_flag'] = df['match_flag'] & flag if 'match_flag' in df.columns else flag
+    return df
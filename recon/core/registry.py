@@ -1,10 +1,111 @@
 from __future__ import annotations
-from typing import Callable, Dict
+import inspect
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
 
-comparators: Dict[str, Callable] = {}
+import numpy as np
 
-def register_comparator(name: str):
+import logging
+log = logging.getLogger(__name__)
+
+# Comparators decide, for one reconcile rule, which rows match. The batched contract is
+#   fn(a, b, rule) -> boolean mask
+# where a/b are the A/B value arrays (numpy; pandas Series for extension dtypes) and `rule` the
+# ReconNumeric entry. kind="vectorized" functions get the whole arrays (and may take an
+# `abs_diff` keyword to reuse reconcile's |b - a|). kind="scalar" / "numba" functions are
+# elementwise kernels fn(a_i, b_i, *params) -> bool; `params` names the rule attributes (or
+# rule.params keys) passed after the two values. "numba" kernels are compiled into a ufunc
+# when numba is installed; without it, and for "scalar", they run through np.vectorize.
+
+ENTRY_POINT_GROUP = 'recon.comparators'
+_KINDS = ('vectorized', 'scalar', 'numba')
+
+
+def rule_param(rule, name: str, default: Any = None) -> Any:
+    """A comparator parameter from rule.params, else a rule attribute of that name."""
+    params = getattr(rule, 'params', None) or {}
+    if name in params:
+        return params[name]
+    value = getattr(rule, name, None)
+    return default if value is None else value
+
+
+@dataclass
+class Comparator:
+    name: str
+    fn: Callable
+    kind: str = 'vectorized'
+    params: Tuple[str, ...] = ()
+    _batched: Optional[Callable] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.kind not in _KINDS:
+            raise ValueError(f"comparator {self.name!r}: kind must be one of {_KINDS}, got {self.kind!r}")
+        self._wants_abs_diff = self.kind == 'vectorized' and 'abs_diff' in inspect.signature(self.fn).parameters
+
+    def _kernel(self) -> Callable:
+        if self._batched is None:
+            if self.kind == 'numba':
+                try:
+                    import numba
+                    self._batched = numba.vectorize(nopython=True)(self.fn)
+                except ImportError:
+                    log.warning("comparator %s: numba not installed; running the kernel through np.vectorize", self.name)
+            if self._batched is None:
+                self._batched = np.vectorize(self.fn, otypes=[bool])
+        return self._batched
+
+    def __call__(self, a, b, rule, abs_diff=None):
+        if self.kind == 'vectorized':
+            if self._wants_abs_diff:
+                return self.fn(a, b, rule, abs_diff=abs_diff)
+            return self.fn(a, b, rule)
+        args = [rule_param(rule, p) for p in self.params]
+        missing = [p for p, v in zip(self.params, args) if v is None]
+        if missing:
+            raise ValueError(f"comparator {self.name!r} needs {missing} on rule for column {rule.column!r}")
+        a = a.to_numpy(dtype=float, na_value=np.nan) if hasattr(a, 'to_numpy') else a
+        b = b.to_numpy(dtype=float, na_value=np.nan) if hasattr(b, 'to_numpy') else b
+        return np.asarray(self._kernel()(a, b, *args), dtype=bool)
+
+
+comparators: Dict[str, Comparator] = {}
+_entry_points_loaded = False
+
+
+def register_comparator(name: str, kind: str = 'vectorized', params: Tuple[str, ...] | list = ()):
     def deco(fn):
-        comparators[name] = fn
+        comparators[name] = fn if isinstance(fn, Comparator) else Comparator(name, fn, kind, tuple(params))
         return fn
     return deco
+
+
+def load_entry_points():
+    """Import comparators published by installed packages under the `recon.comparators` group.
+
+    An entry point may name a module (that registers with the decorator on import) or a
+    comparator callable, which is registered under the entry point's name.
+    """
+    global _entry_points_loaded
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            obj = ep.load()
+        except Exception:
+            log.exception("comparator entry point %s (%s) failed to load", ep.name, ep.value)
+            continue
+        if isinstance(obj, Comparator):
+            comparators.setdefault(ep.name, obj)
+        elif callable(obj) and ep.name not in comparators:
+            comparators[ep.name] = Comparator(ep.name, obj)
+        log.debug("comparator entry point loaded: %s", ep.name)
+
+
+def get_comparator(name: str) -> Comparator:
+    if name not in comparators and not _entry_points_loaded:
+        load_entry_points()
+    try:
+        return comparators[name]
+    except KeyError:
+        raise ValueError(f"unknown comparator {name!r}; registered: {sorted(comparators)}") from None
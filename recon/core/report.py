@@ -1,23 +1,41 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import json
+import shutil
+import time
+from urllib.parse import quote
+import numpy as np
 import pandas as pd
 import logging
 log = logging.getLogger(__name__)
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # CSV goes through pandas' writer; Parquet can't be written
+    pa = None
+
 _DEF_FORMATS = ["csv"]
+_DEF_CHUNK_ROWS = 1_000_000
+_SUFFIX = {'gzip': '.gz', 'zstd': '.zst'}  # compressed CSV file names
+_HIVE_NULL = '__HIVE_DEFAULT_PARTITION__'
+_MAX_PARTITIONS = 1024  # open files per partitioned output
 
-def _apply_dataset_labels(df: pd.DataFrame, report_cfg: 'ReportCfg'):
-    """
-    Rename A_/B_ (or _A/_B) columns to user-provided dataset names via report_cfg.dataset_names.
-    Returns (renamed_df, rename_map_old_to_new).
-    """
+# Reports are written in one pass: the frame is cut into chunks of `chunk_rows` rows, each chunk
+# is converted once (to Arrow) and split by match_flag, and the pieces go to every output file at
+# the same time on a small thread pool (Arrow's encoders release the GIL). At most two chunks are
+# in flight, so the writer needs a bounded amount of memory next to the frame itself.
+
+def _label_map(columns, report_cfg: 'ReportCfg') -> dict:
+    """old -> new names for A_/B_ (or _A/_B) columns per report_cfg.dataset_names."""
     labels = getattr(report_cfg, 'dataset_names', {}) or {}
     a_label = labels.get("A")
     b_label = labels.get("B")
     rename_map = {}
 
-    for col in df.columns:
+    for col in columns:
         # prefix form: A_foo / B_foo
         if a_label and col.startswith("A_"):
             rename_map[col] = f"{a_label}_{col[2:]}"
@@ -29,7 +47,18 @@ def _apply_dataset_labels(df: pd.DataFrame, report_cfg: 'ReportCfg'):
         elif b_label and col.endswith("_B"):
             rename_map[col] = f"{b_label}_{col[:-2]}"
 
-    return df.rename(columns=rename_map), rename_map
+    return rename_map
+
+def _apply_dataset_labels(df: pd.DataFrame, report_cfg: 'ReportCfg'):
+    """
+    Rename A_/B_ (or _A/_B) columns to user-provided dataset names via report_cfg.dataset_names.
+    Returns (renamed_df, rename_map_old_to_new).
+    """
+    rename_map = _label_map(df.columns, report_cfg)
+    if rename_map:
+        df = df.copy(deep=False)  # relabel without copying the data
+        df.columns = [rename_map.get(c, c) for c in df.columns]
+    return df, rename_map
 
 def _map_select_cols(select_cols, report_cfg: 'ReportCfg'):
     """Apply the same relabeling logic to select list (if user still uses A_/B_ names)."""
@@ -50,15 +79,364 @@ def _map_select_cols(select_cols, report_cfg: 'ReportCfg'):
 
     return [_map_one(n) for n in select_cols]
 
-def _write(df: pd.DataFrame, out: Path, name: str, formats: list[str]):
+def output_path(outdir: Path, name: str, fmt: str, compression: str | None = None) -> Path:
+    """outdir/<name>.<fmt>, plus .gz / .zst for compressed CSV."""
+    return outdir / f"{name}.{fmt}{_SUFFIX.get(compression, '') if fmt == 'csv' else ''}"
+
+def compressed_stream(path: Path, compression: str):
+    """A pyarrow output stream compressing into path (for writers that take a file object)."""
+    if pa is None:
+        raise ImportError("report.outputs.compression needs pyarrow installed")
+    return pa.CompressedOutputStream(str(path), compression)
+
+def parquet_options(outputs: 'ReportOutputs | None'):
+    """report.outputs.parquet, defaulted for configs built without it."""
+    opts = getattr(outputs, 'parquet', None)
+    if opts is None:
+        from .config import ParquetOutputCfg
+        opts = ParquetOutputCfg()
+    return opts
+
+def clear_output(path: Path):
+    """Remove a previous run's file or partition directory at path (stale partitions would otherwise survive)."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+def _size(path: Path) -> tuple[int, int]:
+    """(bytes, files) at path; a partitioned output counts every file under it."""
+    if path.is_dir():
+        files = [p for p in path.rglob('*') if p.is_file()]
+        return sum(p.stat().st_size for p in files), len(files)
+    return (path.stat().st_size, 1) if path.exists() else (0, 0)
+
+def output_metrics(outdir: Path, written: dict, counts: dict, wall_s: float) -> dict:
+    """metrics.json `outputs` section: rows, bytes and write seconds of each file written into outdir.
+
+    `written` maps file names to the seconds spent writing them (busy time; the files of one
+    report are written concurrently, so these add up to more than `wall_s`)."""
+    files = {}
+    for fname, seconds in written.items():
+        name = fname.split('.', 1)[0]
+        size, n = _size(outdir / fname)
+        files[fname] = {'rows': counts.get('total' if name == 'differences' else name), 'bytes': size,
+                        'write_s': round(seconds, 6)}
+        if (outdir / fname).is_dir():
+            files[fname]['files'] = n
+    return {'wall_s': round(wall_s, 6), 'bytes': sum(f['bytes'] for f in files.values()), 'files': files}
+
+def _partition_cols(opts, columns, name: str) -> list[str]:
+    cols = list(getattr(opts, 'partition_by', None) or [])
+    missing = [c for c in cols if c not in columns]
+    if missing:
+        # drilldown levels can drop a dimension the main report is partitioned by
+        log.warning("report: %s has no column %s to partition by; partitioning by %s", name, missing, [c for c in cols if c in columns])
+    return [c for c in cols if c in columns]
+
+def _datetime_formats(df: pd.DataFrame, columns: list[str], mask=None) -> dict:
+    """strftime format per naive datetime column, chosen over the rows of one output (`mask`, default
+    all) like pandas' to_csv: dates alone when every value is midnight, else seconds (Arrow would
+    write nanoseconds)."""
+    out = {}
+    for c in columns:
+        s = df[c]
+        if not (isinstance(s.dtype, np.dtype) and s.dtype.kind == 'M'):
+            continue
+        values = (s if mask is None else s[mask]).dropna()
+        if (values.dt.nanosecond != 0).any() or (values.dt.microsecond != 0).any():
+            continue  # sub-second values: Arrow's own form keeps them
+        out[c] = '%Y-%m-%d' if (values == values.dt.normalize()).all() else '%Y-%m-%d %H:%M:%S'
+    return out
+
+class _Sink:
+    """One output file. put()/finish() time the writes, for metrics.json."""
+    arrow = True
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.seconds = 0.0
+
+    def put(self, piece):
+        start = time.perf_counter()
+        try:
+            self.write(piece)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def finish(self):
+        start = time.perf_counter()
+        try:
+            self.close()
+        finally:
+            self.seconds += time.perf_counter() - start
+
+class _ArrowCsv(_Sink):
+    def __init__(self, path: Path, schema, compression, datetimes: dict | None = None):
+        import pyarrow.compute as pc
+        super().__init__(path)
+        self.strftime = pc.strftime
+        self.datetimes = {schema.get_field_index(c): fmt for c, fmt in (datetimes or {}).items()}
+        for i in self.datetimes:
+            schema = schema.set(i, pa.field(schema.field(i).name, pa.string()))
+        self.stream = compressed_stream(path, compression) if compression else pa.OSFile(str(path), 'wb')
+        # the header goes out here, so an output with no rows still has its columns
+        self.writer = pa_csv.CSVWriter(self.stream, schema, write_options=pa_csv.WriteOptions(quoting_style='needed'))
+
+    def write(self, table):
+        for i, fmt in self.datetimes.items():
+            table = table.set_column(i, table.field(i).name, self.strftime(table.column(i), format=fmt))
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+        self.stream.close()
+
+class _PandasCsv(_Sink):
+    arrow = False
+
+    def __init__(self, path: Path, compression, datetimes: dict | None = None):
+        super().__init__(path)
+        self.compression, self.first = compression, True
+        # to_csv picks a datetime column's form per call; over several chunks it has to be the whole column's
+        self.datetimes = datetimes or {}
+
+    def write(self, frame: pd.DataFrame):
+        if self.datetimes:
+            frame = frame.assign(**{c: frame[c].dt.strftime(fmt) for c, fmt in self.datetimes.items()})
+        # appended gzip members / zstd frames decompress as one stream
+        frame.to_csv(self.path, mode='w' if self.first else 'a', header=self.first, index=False,
+                     compression=self.compression)
+        self.first = False
+
+    def close(self):
+        pass
+
+class _Parquet(_Sink):
+    """A single Parquet file; pieces are buffered into row groups of opts.row_group_size rows."""
+
+    def __init__(self, path: Path, schema, opts):
+        super().__init__(path)
+        clear_output(path)
+        self.rows = int(opts.row_group_size)
+        self.buffer, self.buffered = [], 0
+        self.writer = pq.ParquetWriter(str(path), schema, compression=opts.compression,
+                                       compression_level=opts.compression_level, write_statistics=opts.statistics)
+
+    def write(self, table):
+        if table.num_rows:
+            self.buffer.append(table)
+            self.buffered += table.num_rows
+        if self.buffered >= self.rows:
+            self._flush(final=False)
+
+    def _flush(self, final: bool):
+        table = pa.concat_tables(self.buffer)
+        whole = table.num_rows if final else table.num_rows - table.num_rows % self.rows
+        if whole:
+            self.writer.write_table(table.slice(0, whole), row_group_size=self.rows)
+        rest = table.slice(whole)
+        self.buffer, self.buffered = ([rest], rest.num_rows) if rest.num_rows else ([], 0)
+
+    def close(self):
+        try:
+            if self.buffer:
+                self._flush(final=True)
+        finally:
+            self.writer.close()
+
+class _ParquetDataset(_Sink):
+    """A hive-partitioned Parquet directory: <path>/<col>=<value>/.../part-0.parquet, one file per partition.
+
+    The partition columns live in the directory names only. Every piece is split by partition and
+    appended to that partition's file, so a row group holds at most one chunk's rows of a partition."""
+
+    def __init__(self, path: Path, schema, opts, partition_by: list[str]):
+        super().__init__(path)
+        clear_output(path)
+        self.opts, self.partition_by = opts, partition_by
+        self.file_schema = pa.schema([f for f in schema if f.name not in partition_by], metadata=schema.metadata)
+        self.writers: dict[tuple, pq.ParquetWriter] = {}
+
+    def _dir(self, key: tuple) -> Path:
+        out = self.path
+        for col, value in zip(self.partition_by, key):
+            if pd.isna(value):  # null / NaN / NA, named like Hive and Arrow do
+                text = _HIVE_NULL
+            else:
+                text = str(value).lower() if isinstance(value, (bool, np.bool_)) else str(value)
+            out = out / f"{col}={quote(text, safe='')}"
+        return out
+
+    def _writer(self, key: tuple) -> pq.ParquetWriter:
+        writer = self.writers.get(key)
+        if writer is None:
+            if len(self.writers) >= _MAX_PARTITIONS:
+                raise RuntimeError(f"report: {self.path} would have more than {_MAX_PARTITIONS} partitions; "
+                                   f"partition_by {self.partition_by} is too fine")
+            part = self._dir(key)
+            part.mkdir(parents=True, exist_ok=True)
+            writer = self.writers[key] = pq.ParquetWriter(
+                str(part / 'part-0.parquet'), self.file_schema, compression=self.opts.compression,
+                compression_level=self.opts.compression_level, write_statistics=self.opts.statistics)
+        return writer
+
+    def write(self, table):
+        if not table.num_rows:
+            return
+        keys = table.select(self.partition_by).to_pandas()
+        rows = table.select(self.file_schema.names)
+        for key, idx in keys.groupby(self.partition_by, dropna=False, observed=True, sort=False).indices.items():
+            key = key if isinstance(key, tuple) else (key,)
+            self._writer(key).write_table(rows.take(idx), row_group_size=int(self.opts.row_group_size))
+
+    def close(self):
+        errors = []
+        for writer in self.writers.values():
+            try:
+                writer.close()
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+def write_parquet(table, path: Path, opts, partition_by: list[str] | None = None) -> None:
+    """An Arrow table as path (a file, or a hive directory when partition_by is given) with the report's Parquet options."""
+    sink = _ParquetDataset(path, table.schema, opts, partition_by) if partition_by else _Parquet(path, table.schema, opts)
+    try:
+        sink.write(table)
+    finally:
+        sink.close()
+
+def _arrow_schema(df: pd.DataFrame, columns: list[str]):
+    """(schema, error): the Arrow schema the chunks of df[columns] are converted to, or why there is none
+    (no pyarrow, or a frame that doesn't convert, e.g. object columns mixing types)."""
+    if pa is None:
+        return None, ImportError("pyarrow is not installed")
+    try:
+        # inferred on the whole frame (a column may be all-null in the first chunk), without copying it
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        # categoricals (dtype plan) are written as their values: the file's schema doesn't depend on the plan
+        fields = [schema.field(c) for c in columns]
+        return pa.schema([pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+                          for f in fields]), None
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, KeyError) as e:
+        log.info("emit_reports: no Arrow schema for the report (%s); writing CSV with pandas", e)
+        return None, e
+
+def _open_sinks(names, outdir: Path, outputs, schema, error=None, datetimes=None) -> dict:
+    """Sinks per (name, format); `datetimes` maps each name to its CSV datetime formats."""
+    datetimes = datetimes or {}
+    formats = getattr(outputs, 'formats', _DEF_FORMATS) or _DEF_FORMATS
+    compression = getattr(outputs, 'compression', None)
+    opts = parquet_options(outputs)
+    sinks = {}
+    for name in names:
+        if 'csv' in formats:
+            path = output_path(outdir, name, 'csv', compression)
+            arrow = schema is not None and getattr(outputs, 'csv_engine', 'pandas') != 'pandas'
+            sinks[(name, 'csv')] = _ArrowCsv(path, schema, compression, datetimes.get(name)) if arrow \
+                else _PandasCsv(path, compression, datetimes.get(name))
+        if 'parquet' in formats:
+            path = output_path(outdir, name, 'parquet')
+            if schema is None:
+                raise RuntimeError(f"report: cannot write {path}: {error}") from error
+            partition_by = _partition_cols(opts, schema.names, name)
+            sinks[(name, 'parquet')] = _ParquetDataset(path, schema, opts, partition_by) if partition_by \
+                else _Parquet(path, schema, opts)
+    return sinks
+
+def _flag_masks(df: pd.DataFrame):
+    """(matched, non_matched) row masks; rows with a missing flag are in neither."""
+    if 'match_flag' not in df.columns:
+        return np.zeros(len(df), dtype=bool), np.ones(len(df), dtype=bool)
+    flag = df['match_flag']
+    if flag.dtype == bool:
+        matched = flag.to_numpy()
+        return matched, ~matched
+    return (flag.eq(True).to_numpy(dtype=bool, na_value=False),
+            flag.eq(False).to_numpy(dtype=bool, na_value=False))
+
+def _write_partitioned(df: pd.DataFrame, columns: list[str], outdir: Path, outputs) -> tuple[dict, dict]:
+    """Stream matched / non_matched / differences (every row) of df[columns] in one pass.
+
+    Returns the row counts and the seconds spent on each file written."""
+    formats = getattr(outputs, 'formats', _DEF_FORMATS) or _DEF_FORMATS
+    csv_engine = getattr(outputs, 'csv_engine', 'pandas')
+    chunk_rows = int(getattr(outputs, 'chunk_rows', None) or _DEF_CHUNK_ROWS)
+    if csv_engine == 'pyarrow' and pa is None:
+        raise ImportError("report.outputs.csv_engine 'pyarrow' needs pyarrow installed")
+    outdir.mkdir(parents=True, exist_ok=True)
+    matched, non_matched = _flag_masks(df)
+    parts = {'matched': matched, 'non_matched': non_matched, 'differences': None}
+    schema, error = _arrow_schema(df, columns) if csv_engine != 'pandas' or 'parquet' in formats else (None, None)
+    sinks, pending = {}, []
+    pool = ThreadPoolExecutor(max_workers=len(parts) * len(formats), thread_name_prefix='report')
+    try:
+        # one chunk for an empty frame, so the outputs still get their header / schema
+        for start in range(0, max(len(df), 1), chunk_rows):
+            stop = start + chunk_rows
+            frame = df.iloc[start:stop]
+            table = None if schema is None else pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            if not sinks:
+                # opened with the first table's schema: it carries the pandas metadata Parquet readers restore dtypes from
+                # a single chunk written by pandas needs no fixed datetime forms
+                fixed = table is not None or len(df) > chunk_rows
+                datetimes = {name: _datetime_formats(df, columns, mask) for name, mask in parts.items()} if fixed else None
+                sinks = _open_sinks(parts, outdir, outputs, table.schema if table is not None else None, error, datetimes)
+            with_pandas = not all(s.arrow for s in sinks.values())
+            if with_pandas:
+                frame = frame[columns]
+            pieces = {}
+            for name, mask in parts.items():
+                m = None if mask is None else mask[start:stop]
+                if table is not None:
+                    pieces[name, True] = table if m is None else table.filter(pa.array(m))
+                if with_pandas:
+                    pieces[name, False] = frame if m is None else frame[m]
+            # a file's previous chunk has to be out before the next one goes in
+            for f in pending:
+                f.result()
+            pending = [pool.submit(sink.put, pieces[name, sink.arrow]) for (name, _), sink in sinks.items()]
+        for f in pending:
+            f.result()
+    except BaseException:
+        pool.shutdown(wait=True)
+        for sink in sinks.values():
+            try:
+                sink.finish()
+            except Exception:  # the original error is the one to report
+                log.debug("emit_reports: closing %s after a failure", sink.path, exc_info=True)
+        raise
+    pool.shutdown(wait=True)
+    for sink in sinks.values():
+        sink.finish()
+    counts = {'total': len(df), 'matched': int(matched.sum()), 'non_matched': int(non_matched.sum())}
+    return counts, {sink.path.name: sink.seconds for sink in sinks.values()}
+
+def _write(df: pd.DataFrame, out: Path, name: str, formats: list[str], compression: str | None = None,
+           parquet=None) -> dict:
+    """df as <name>.csv / <name>.parquet in out; returns the seconds spent on each file."""
     out.mkdir(parents=True, exist_ok=True)
+    written = {}
     if 'csv' in formats:
-        df.to_csv(out / f"{name}.csv", index=False)
+        path = output_path(out, name, 'csv', compression)
+        start = time.perf_counter()
+        df.to_csv(path, index=False, compression=compression)
+        written[path.name] = time.perf_counter() - start
     if 'parquet' in formats:
+        path = output_path(out, name, 'parquet')
+        opts = parquet or parquet_options(None)
+        start = time.perf_counter()
+        clear_output(path)
         try:
-            df.to_parquet(out / f"{name}.parquet", index=False)
-        except Exception:
-            pass
+            df.to_parquet(path, index=False, compression=None if opts.compression == 'none' else opts.compression,
+                          compression_level=opts.compression_level, row_group_size=opts.row_group_size,
+                          write_statistics=opts.statistics)
+        except Exception as e:
+            raise RuntimeError(f"report: writing {path} failed: {e}") from e
+        written[path.name] = time.perf_counter() - start
+    return written
 
 def emit_reports(df: pd.DataFrame, report_cfg: 'ReportCfg', select_cols: list[str] | None = None, suffix_A: str = '_A', suffix_B: str = '_B'):
     log.debug("emit_reports: df shape=%s", getattr(df, 'shape', None))
@@ -67,6 +445,7 @@ def emit_reports(df: pd.DataFrame, report_cfg: 'ReportCfg', select_cols: list[st
     outdir = Path(report_cfg.outputs.dir)
     formats = getattr(report_cfg.outputs, 'formats', _DEF_FORMATS) or _DEF_FORMATS
     log.info("emit_reports: outdir=%s formats=%s", outdir, formats)
+    start = time.perf_counter()
     # NEW: relabel _A/_B columns -> dataset names
     df, rename_map = _apply_dataset_labels(df, report_cfg)
 
@@ -79,21 +458,21 @@ def emit_reports(df: pd.DataFrame, report_cfg: 'ReportCfg', select_cols: list[st
         base = [c for c in select_cols if c in df.columns]
     else:
         base = list(df.columns)
-    matched = df[(df.get('match_flag', False) == True)][base]
-    non_matched = df[(df.get('match_flag', False) == False)][base]
-    log.info("emit_reports: matched=%d non_matched=%d base_cols=%s", matched.shape[0], non_matched.shape[0], base)
-    # diffs = df[[c for c in df.columns if c.startswith('delta_') or c.startswith('abs_delta_') or c.startswith('pct_delta_')] + [c for c in base if c.endswith(suffix_A) or c.endswith(suffix_B)]]
-    diff_cols = [c for c in df.columns if c.startswith(('delta_', 'abs_delta_', 'pct_delta_'))]
-    # side_cols = [c for c in base if '_' in c]  # simple heuristic to include side-specific cols
-    # diffs = df[base]
-    diffs = df.copy()[base]
-    _write(matched, outdir, 'matched', formats)
-    _write(non_matched, outdir, 'non_matched', formats)
-    _write(diffs, outdir, 'differences', formats)
-    # metrics
-    metrics = {
-        'total': len(df),
-        'matched': int(matched.shape[0]),
-        'non_matched': int(non_matched.shape[0]),
-    }
+    # one pass: differences is every row, matched / non_matched the rows match_flag picks
+    metrics, written = _write_partitioned(df, base, outdir, report_cfg.outputs)
+    log.info("emit_reports: matched=%d non_matched=%d base_cols=%s", metrics['matched'], metrics['non_matched'], base)
+    metrics['outputs'] = output_metrics(outdir, written, metrics, time.perf_counter() - start)
     (outdir / 'metrics.json').write_text(json.dumps(metrics, indent=2))
+
+def write_table(report_cfg: 'ReportCfg', name: str, df: pd.DataFrame):
+    """Write an extra (pandas) table next to the reports, in the report's formats."""
+    formats = getattr(report_cfg.outputs, 'formats', _DEF_FORMATS) or _DEF_FORMATS
+    _write(df, Path(report_cfg.outputs.dir), name, formats, getattr(report_cfg.outputs, 'compression', None),
+           parquet_options(report_cfg.outputs))
+
+def update_metrics(report_cfg: 'ReportCfg', **fields):
+    """Merge extra sections into the metrics.json the backend's write just produced."""
+    path = Path(report_cfg.outputs.dir) / 'metrics.json'
+    metrics = json.loads(path.read_text()) if path.exists() else {}
+    metrics.update(fields)
+    path.write_text(json.dumps(metrics, indent=2))
@@ -1,6 +1,16 @@
 from __future__ import annotations
 import pandas as pd
 
+from .dtypes import categorical_map
+from .filter import weaken
+
+def _str_op(s: pd.Series, fn) -> pd.Series:
+    # categoricals: once per distinct value (missing becomes 'nan', as astype(str) spells it); otherwise
+    # per row on the str form
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return categorical_map(s, fn, na='nan')
+    return fn(s.astype(str))
+
 def sanitize(df: pd.DataFrame, spec: SanitizeCfg | None) -> pd.DataFrame:
     if spec is None:
         return df
@@ -8,12 +18,57 @@ def sanitize(df: pd.DataFrame, spec: SanitizeCfg | None) -> pd.DataFrame:
     df = df.rename(columns=rename)
     normalize_cfg = getattr(spec, 'normalize', {}) or {}
     if normalize_cfg.get('trim_strings'):
-        for c in df.select_dtypes(include=['object', 'string']).columns:
-            df[c] = df[c].astype(str).str.strip()
+        for c in df.select_dtypes(include=['object', 'string', 'category']).columns:
+            df[c] = _str_op(df[c], lambda t: t.str.strip())
     for up in normalize_cfg.get('upper_case', []):
         if up in df.columns:
-            df[up] = df[up].astype(str).str.upper()
+            df[up] = _str_op(df[up], lambda t: t.str.upper())
     select = getattr(spec, 'select', None)
     if select:
         df = df[[c for c in select if c in df.columns]]
     return df
+
+def source_columns(spec: SanitizeCfg | None, needed: list[str] | None = None) -> list[str] | None:
+    """Raw (pre-rename) column names to read for `spec.select`, narrowed to `needed`; None means all columns."""
+    select = getattr(spec, 'select', None) if spec is not None else None
+    if select:
+        cols = [c for c in select if needed is None or c in needed]
+    elif needed:
+        cols = list(needed)
+    else:
+        return None
+    rename = (getattr(spec, 'rename', {}) or {}) if spec is not None else {}
+    reverse = {new: old for old, new in rename.items()}
+    return [reverse.get(c, c) for c in cols]
+
+
+def source_predicates(spec: SanitizeCfg | None, predicates: list[dict] | None,
+                      dtypes: dict | None = None) -> list[dict] | None:
+    """Prefilter predicates rewritten onto raw column names, keeping only those sanitize can't change.
+
+    Used to prune columnar scans early; columns that get upper-cased, string comparisons under
+    trim_strings and date columns (parsed after the scan) are left to the regular prefilter. Within
+    and/or/not groups, an AND keeps its safe children while an OR or NOT goes whole or not at all.
+    """
+    if not predicates:
+        return None
+    rename = (getattr(spec, 'rename', {}) or {}) if spec is not None else {}
+    normalize_cfg = (getattr(spec, 'normalize', {}) or {}) if spec is not None else {}
+    reverse = {new: old for old, new in rename.items()}
+    upper = set(normalize_cfg.get('upper_case', []))
+    dates = {k for k, v in (dtypes or {}).items() if str(v).startswith('date')}
+    select = getattr(spec, 'select', None) if spec is not None else None
+
+    def raw_leaf(p: dict) -> dict | None:
+        col, val = p['col'], p.get('value')
+        raw = reverse.get(col, col)
+        if col in upper or raw in dates or (col in rename and col not in reverse):
+            return None
+        if select and col not in select:  # the prefilter fails on it anyway
+            return None
+        vals = val if isinstance(val, (list, tuple, set)) else [val]
+        if normalize_cfg.get('trim_strings') and any(isinstance(v, str) for v in vals):
+            return None
+        return {**p, 'col': raw}
+
+    return weaken(predicates, raw_leaf)
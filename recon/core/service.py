@@ -0,0 +1,415 @@
+from __future__ import annotations
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+import logging
+log = logging.getLogger(__name__)
+
+# Service mode: a long-running process that keeps warm workers. Each worker is a process that
+# imported pandas, pyarrow and the pipeline once at start-up and holds a MemoryCache of prepared
+# inputs and aggregates between jobs, so re-running a reconciliation with tweaked tolerances only
+# joins, reconciles and writes. Jobs come in over a local HTTP API and/or a drop directory; every
+# job's state and stage progress is kept here and served back. A job goes to the worker that last
+# ran a job on the same inputs when that worker is free (its cache has them), else to any free one.
+
+_POLL_S = 1.0
+_DROP_SUFFIXES = ('.yaml', '.yml', '.json')
+_KEEP_FINISHED = 1000  # finished jobs kept for status queries
+
+
+@dataclass
+class JobStatus:
+    id: str
+    config: str
+    out_dir: str
+    backend: Optional[str] = None
+    use_cache: bool = True
+    state: str = 'queued'  # queued -> running -> ok | failed
+    inputs: tuple = ()
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    worker: Optional[int] = None
+    current: Optional[str] = None
+    stages: list = field(default_factory=list)
+    error: Optional[str] = None
+    summary: Optional[dict] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        ts = lambda t: datetime.fromtimestamp(t).isoformat(timespec='milliseconds') if t else None
+        end = self.finished or time.time()
+        return {
+            'id': self.id, 'state': self.state, 'config': self.config, 'out_dir': self.out_dir,
+            'worker': self.worker, 'submitted_at': ts(self.submitted), 'started_at': ts(self.started),
+            'finished_at': ts(self.finished),
+            'queued_s': round((self.started or end) - self.submitted, 3),
+            'wall_s': round(end - self.started, 3) if self.started else None,
+            'current_stage': self.current, 'stages': list(self.stages), 'error': self.error,
+            'summary': self.summary,
+        }
+
+
+def _merge(base: dict, overrides: dict) -> dict:
+    # nested mappings merge key by key; anything else (lists included) replaces
+    out = dict(base)
+    for k, v in overrides.items():
+        out[k] = _merge(out[k], v) if isinstance(v, dict) and isinstance(out.get(k), dict) else v
+    return out
+
+
+def _inputs(config_path: str) -> tuple:
+    # which worker's cache may hold this job's inputs: the A/B files it reads
+    try:
+        raw = yaml.safe_load(Path(config_path).read_text()) or {}
+        sides = raw.get('inputs') or {}
+        return tuple(str(Path(sides[s]['path']).resolve()) for s in ('A', 'B') if isinstance(sides.get(s), dict))
+    except (OSError, yaml.YAMLError, KeyError, TypeError):
+        return ()
+
+
+def _worker_main(index: int, tasks, events, cache_bytes: int, level: int):
+    """Worker process: warm imports and one MemoryCache, then jobs from `tasks` until None."""
+    from .batch import _init_worker, _job_summary
+    from .cache import MemoryCache
+    from .pipeline import run_job
+    _init_worker(level)
+    try:
+        import pyarrow  # noqa: F401  (parquet cache entries and Arrow CSV writes)
+    except ImportError:
+        pass
+    cache = MemoryCache(cache_bytes)
+    events.put(('ready', index, os.getpid()))
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id = task['id']
+        events.put(('start', job_id, index))
+        progress = lambda event, stage, wall: events.put(('stage', job_id, event, stage, wall))
+        t0 = time.perf_counter()
+        status, error = 'ok', None
+        try:
+            run_job(task['config'], task['out_dir'], backend_name=task.get('backend'),
+                    use_cache=task.get('use_cache', True), memory_cache=cache, progress=progress)
+        except Exception as e:  # logged by run_job
+            status, error = 'failed', f"{type(e).__name__}: {e}"
+        summary = _job_summary(task['config'], task['out_dir'], status, error, time.perf_counter() - t0)
+        summary['cache'] = cache.stats()
+        events.put(('done', job_id, summary))
+
+
+class _Worker:
+    def __init__(self, ctx, index: int, events, cache_bytes: int, level: int):
+        self.index = index
+        self.tasks = ctx.Queue()
+        self.process = ctx.Process(target=_worker_main, args=(index, self.tasks, events, cache_bytes, level),
+                                   name=f"recon-worker-{index}", daemon=True)
+        self.process.start()
+        self.job: Optional[str] = None
+        self.ready = False
+
+
+class ReconService:
+    """Warm workers, a job queue, and the HTTP / drop-directory front ends."""
+
+    def __init__(self, workers: int = 2, cache_mb: int = 2048, out_root: str | Path = 'service_runs',
+                 queue_dir: Optional[str | Path] = None, host: str = '127.0.0.1', port: Optional[int] = 8765,
+                 backend: Optional[str] = None):
+        self.n_workers = max(1, workers)
+        self.cache_bytes = int(cache_mb) * 1024 * 1024 // self.n_workers  # per worker
+        self.out_root = Path(out_root)
+        self.queue_dir = Path(queue_dir) if queue_dir else None
+        self.host, self.port = host, port
+        self.backend = backend
+        self.jobs: dict[str, JobStatus] = {}
+        self._pending: deque[str] = deque()
+        self._affinity: dict[tuple, int] = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        # spawned, not forked: workers can be (re)started while the service's threads run
+        self._ctx = mp.get_context('spawn')
+        self._events = self._ctx.Queue()
+        self._workers: list[_Worker] = []
+        self._threads: list[threading.Thread] = []
+        self._http: Optional[ThreadingHTTPServer] = None
+
+    # --- lifecycle ---
+    def start(self):
+        self.out_root.mkdir(parents=True, exist_ok=True)
+        level = logging.getLogger().level
+        self._workers = [_Worker(self._ctx, i, self._events, self.cache_bytes, level) for i in range(self.n_workers)]
+        self._spawn(self._collect, 'recon-events')
+        if self.queue_dir is not None:
+            for sub in ('', 'accepted', 'status'):
+                (self.queue_dir / sub).mkdir(parents=True, exist_ok=True)
+            self._spawn(self._watch_queue, 'recon-queue')
+        if self.port is not None:
+            self._http = ThreadingHTTPServer((self.host, self.port), _handler(self))
+            self.port = self._http.server_address[1]  # port 0 picks a free one
+            self._spawn(self._http.serve_forever, 'recon-http')
+            log.info("service: listening on http://%s:%d", self.host, self.port)
+        log.info("service: %d workers, %d MB memory cache each, queue dir %s", self.n_workers,
+                 self.cache_bytes // (1024 * 1024), self.queue_dir)
+        return self
+
+    def _spawn(self, target, name: str):
+        t = threading.Thread(target=target, name=name, daemon=True)
+        t.start()
+        self._threads.append(t)
+
+    def serve_forever(self):
+        try:
+            while not self._stop.wait(_POLL_S):
+                pass
+        except KeyboardInterrupt:
+            log.info("service: interrupted")
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self._stop.is_set() and not self._workers:
+            return
+        self._stop.set()
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+        for w in self._workers:
+            w.tasks.put(None)
+        for w in self._workers:
+            w.process.join(timeout=10)
+            if w.process.is_alive():
+                w.process.terminate()
+        self._workers = []
+        log.info("service: stopped")
+
+    # --- jobs ---
+    def submit(self, config: str, overrides: Optional[dict] = None, out_dir: Optional[str] = None,
+               backend: Optional[str] = None, use_cache: bool = True) -> JobStatus:
+        """Queue a job; `overrides` are merged into the config (e.g. new tolerances) for this run only."""
+        if not Path(config).is_file():
+            raise ValueError(f"config not found: {config}")
+        job_id = uuid.uuid4().hex[:12]
+        out = Path(out_dir) if out_dir else self.out_root / job_id
+        if overrides:
+            # the merged config is what runs, and what audit.json records
+            raw = yaml.safe_load(Path(config).read_text()) or {}
+            out.mkdir(parents=True, exist_ok=True)
+            merged = out / 'job_config.yaml'
+            merged.write_text(yaml.safe_dump(_merge(raw, overrides), sort_keys=False))
+            config = str(merged)
+        job = JobStatus(id=job_id, config=str(config), out_dir=str(out), backend=backend or self.backend,
+                        use_cache=use_cache, inputs=_inputs(config))
+        with self._lock:
+            self.jobs[job_id] = job
+            self._pending.append(job_id)
+            self._forget()
+        log.info("service: queued %s (%s)", job_id, config)
+        self._dispatch()
+        return job
+
+    def status(self, job_id: str) -> Optional[JobStatus]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def health(self) -> dict:
+        with self._lock:
+            states = {}
+            for j in self.jobs.values():
+                states[j.state] = states.get(j.state, 0) + 1
+            return {
+                'workers': [{'index': w.index, 'pid': w.process.pid, 'alive': w.process.is_alive(),
+                             'ready': w.ready, 'job': w.job} for w in self._workers],
+                'queued': len(self._pending),
+                'jobs': states,
+            }
+
+    def _forget(self):
+        # bound the status table: drop the oldest finished jobs
+        finished = [j for j in self.jobs.values() if j.finished]
+        for j in sorted(finished, key=lambda j: j.finished)[:max(0, len(finished) - _KEEP_FINISHED)]:
+            del self.jobs[j.id]
+
+    def _dispatch(self):
+        with self._lock:
+            while self._pending:
+                idle = [w for w in self._workers if w.ready and w.job is None and w.process.is_alive()]
+                if not idle:
+                    return
+                job = self.jobs[self._pending.popleft()]
+                warm = self._affinity.get(job.inputs)
+                worker = next((w for w in idle if w.index == warm), idle[0])
+                worker.job = job.id
+                job.worker = worker.index
+                if job.inputs:
+                    self._affinity[job.inputs] = worker.index
+                worker.tasks.put({'id': job.id, 'config': job.config, 'out_dir': job.out_dir,
+                                  'backend': job.backend, 'use_cache': job.use_cache})
+
+    def _collect(self):
+        """Apply worker events to the job table; restart workers that died."""
+        while not self._stop.is_set():
+            try:
+                event = self._events.get(timeout=_POLL_S)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            kind = event[0]
+            with self._lock:
+                if kind == 'ready':
+                    _, index, pid = event
+                    self._workers[index].ready = True
+                    log.info("service: worker %d ready (pid %d)", index, pid)
+                elif kind == 'start':
+                    _, job_id, index = event
+                    job = self.jobs.get(job_id)
+                    if job is not None:
+                        job.state, job.started = 'running', time.time()
+                elif kind == 'stage':
+                    _, job_id, what, stage, wall = event
+                    job = self.jobs.get(job_id)
+                    if job is not None:
+                        if what == 'start':
+                            job.current = stage
+                        else:
+                            job.stages.append({'stage': stage, 'status': what, 'wall_s': wall})
+                            job.current = None if job.current == stage else job.current
+                elif kind == 'done':
+                    _, job_id, summary = event
+                    job = self.jobs.get(job_id)
+                    for w in self._workers:
+                        if w.job == job_id:
+                            w.job = None
+                    if job is not None:
+                        self._finish(job, summary['status'], summary.get('error'), summary)
+                job = self.jobs.get(event[1]) if kind in ('start', 'stage', 'done') else None
+            if job is not None:
+                self._write_status(job)
+            if kind in ('ready', 'done'):
+                self._dispatch()
+
+    def _finish(self, job: JobStatus, state: str, error: Optional[str], summary: Optional[dict] = None):
+        job.state, job.error, job.summary = state, error, summary
+        job.finished, job.current = time.time(), None
+        job.done.set()
+        log.info("service: %s %s in %.3fs", job.id, state, job.finished - (job.started or job.submitted))
+
+    def _check_workers(self):
+        with self._lock:
+            for i, w in enumerate(self._workers):
+                if w.process.is_alive() or self._stop.is_set():
+                    continue
+                log.error("service: worker %d died (exit code %s); restarting it", i, w.process.exitcode)
+                job = self.jobs.get(w.job) if w.job else None
+                if job is not None:
+                    self._finish(job, 'failed', f"worker died (exit code {w.process.exitcode})")
+                    self._write_status(job)
+                self._workers[i] = _Worker(self._ctx, i, self._events, self.cache_bytes, logging.getLogger().level)
+
+    # --- drop directory ---
+    def _watch_queue(self):
+        """Pick up configs (*.yaml) and job requests (*.json, same fields as POST /jobs) dropped into queue_dir.
+
+        Write files under another name and rename them in, so a half-written file is never read. Status
+        goes to status/<job id>.json, linked from status/<accepted name>.id (or .error when rejected)."""
+        while not self._stop.wait(_POLL_S):
+            for path in sorted(self.queue_dir.iterdir()):
+                if not path.is_file() or path.suffix not in _DROP_SUFFIXES:
+                    continue
+                accepted = self.queue_dir / 'accepted' / f"{datetime.now():%Y%m%d-%H%M%S}-{path.name}"
+                try:
+                    os.replace(path, accepted)
+                    if path.suffix == '.json':
+                        job = self.submit(**_request(json.loads(accepted.read_text())))
+                    else:
+                        job = self.submit(str(accepted))
+                except (OSError, ValueError, TypeError) as e:
+                    log.error("service: rejected %s: %s", path.name, e)
+                    (self.queue_dir / 'status' / f"{accepted.name}.error").write_text(str(e))
+                    continue
+                # the dropped file's name leads to its job: status/<accepted name>.id holds the job id
+                try:
+                    (self.queue_dir / 'status' / f"{accepted.name}.id").write_text(job.id)
+                except OSError as e:
+                    log.warning("service: cannot link %s to job %s: %s", accepted.name, job.id, e)
+                log.info("service: %s -> job %s", path.name, job.id)
+
+    def _write_status(self, job: JobStatus):
+        if self.queue_dir is None:
+            return
+        path = self.queue_dir / 'status' / f"{job.id}.json"
+        tmp = path.with_suffix('.tmp')
+        try:
+            tmp.write_text(json.dumps(job.to_dict(), indent=2))
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning("service: cannot write %s: %s", path, e)
+
+
+def _request(body: dict) -> dict:
+    """submit() arguments from a POST /jobs body or a dropped .json file."""
+    if not isinstance(body, dict) or not body.get('config'):
+        raise ValueError("a job request needs 'config' (path to the YAML)")
+    unknown = set(body) - {'config', 'overrides', 'out_dir', 'backend', 'use_cache', 'wait'}
+    if unknown:
+        raise ValueError(f"unknown job request field(s) {sorted(unknown)}")
+    if body.get('overrides') is not None and not isinstance(body['overrides'], dict):
+        raise ValueError("'overrides' must be a mapping")
+    return {k: body[k] for k in ('config', 'overrides', 'out_dir', 'backend', 'use_cache') if k in body}
+
+
+def _handler(service: ReconService):
+    class Handler(BaseHTTPRequestHandler):
+        """POST /jobs, GET /jobs, GET /jobs/<id>, GET /health."""
+
+        def _send(self, code: int, doc):
+            data = json.dumps(doc, indent=2).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parts = [p for p in self.path.split('?')[0].split('/') if p]
+            if parts == ['health']:
+                return self._send(200, service.health())
+            if parts == ['jobs']:
+                with service._lock:
+                    return self._send(200, [j.to_dict() for j in service.jobs.values()])
+            if len(parts) == 2 and parts[0] == 'jobs':
+                job = service.status(parts[1])
+                return self._send(200, job.to_dict()) if job else self._send(404, {'error': f"no job {parts[1]}"})
+            self._send(404, {'error': f"no route {self.path}"})
+
+        def do_POST(self):
+            if self.path.split('?')[0].rstrip('/') != '/jobs':
+                return self._send(404, {'error': f"no route {self.path}"})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                job = service.submit(**_request(body))
+            except (ValueError, TypeError) as e:
+                return self._send(400, {'error': str(e)})
+            # wait: block until the job finishes (a number caps the wait in seconds)
+            wait = body.get('wait')
+            if wait:
+                job.done.wait(None if wait is True else float(wait))
+            self._send(200 if job.done.is_set() else 202, job.to_dict())
+
+        def log_message(self, fmt, *args):
+            log.debug("http: " + fmt, *args)
+
+    return Handler
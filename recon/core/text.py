@@ -0,0 +1,36 @@
+from __future__ import annotations
+import pandas as pd
+
+# Text handling shared by reconcile's non-numeric rules, the fuzzy join and the backends' versions
+# of both. Strings are Arrow-backed, so trimming, case folding and regex replaces run in Arrow
+# kernels instead of per-row Python on object arrays. Categoricals only transform their
+# categories and then take by code.
+
+try:
+    import pyarrow  # noqa: F401
+    STRING = 'string[pyarrow]'
+except ImportError:  # plain StringDtype: same results, slower
+    STRING = 'string'
+
+# ASCII punctuation spelled as ranges: means the same to Python re, RE2 (Arrow, DuckDB) and Rust regex
+PUNCT = r"[!-/:-@\[-`{-~]"
+
+def lower(t: pd.Series) -> pd.Series:
+    return t.str.lower()
+
+def normalize(t: pd.Series) -> pd.Series:
+    # strip punctuation, collapse whitespace runs, trim, case-fold
+    return t.str.replace(PUNCT, '', regex=True).str.replace(r'\s+', ' ', regex=True).str.strip().str.lower()
+
+def as_text(s: pd.Series, transform=None) -> pd.Series:
+    """`s` as an Arrow-backed string Series with `transform` applied."""
+    if transform is None:
+        return s if s.dtype == STRING else s.astype(STRING)
+    # attributes repeat a lot: transform each distinct value (or category) once, then expand by
+    # code (-1 -> NA)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, uniques = s.cat.codes.to_numpy(), s.cat.categories
+    else:
+        codes, uniques = pd.factorize(s)
+    cats = transform(pd.Series(uniques).astype(STRING))
+    return pd.Series(cats.array.take(codes, allow_fill=True), index=s.index)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from recon.core.pipeline import run_job  # noqa: E402
+
+BACKENDS = ['pandas', 'polars', 'duckdb']
+
+
+def merge(base: dict, overrides: dict) -> dict:
+    out = dict(base)
+    for k, v in overrides.items():
+        out[k] = merge(out[k], v) if isinstance(v, dict) and isinstance(out.get(k), dict) else v
+    return out
+
+
+def frames():
+    """Two small sides: one mismatch, one key per side missing from the other."""
+    A = pd.DataFrame({'book': ['EQD', 'EQD', 'FX', 'RATES', 'RATES'],
+                      'ccy': ['USD', 'EUR', 'USD', 'USD', 'JPY'],
+                      'balance': [100.0, 200.0, 300.0, 400.0, 64417255000000.0]})
+    B = pd.DataFrame({'book': ['EQD', 'EQD', 'FX', 'RATES', 'CREDIT'],
+                      'ccy': ['USD', 'EUR', 'USD', 'USD', 'USD'],
+                      'balance': [100.0, 250.0, 300.0, 400.0, 0.0]})
+    return A, B
+
+
+class Job:
+    def __init__(self, root: Path, A: pd.DataFrame, B: pd.DataFrame, **overrides):
+        self.root = root
+        root.mkdir(parents=True, exist_ok=True)
+        A.to_csv(root / 'A.csv', index=False)
+        B.to_csv(root / 'B.csv', index=False)
+        self.report = root / 'report'
+        side = lambda name: {'path': str(root / name), 'dtypes': {'balance': 'float64'}}
+        cfg = {
+            'job': {'name': 'test', 'cache': {'enabled': False}},
+            'inputs': {'A': side('A.csv'), 'B': side('B.csv')},
+            'join': {'keys': ['book', 'ccy']},
+            'reconcile': {'numeric': [{'column': 'balance', 'comparator': 'absolute', 'tol_abs': 0.01}]},
+            'report': {'outputs': {'dir': str(self.report), 'formats': ['csv']}},
+        }
+        self.config = merge(cfg, overrides)
+        self.path = root / 'job.yaml'
+        self.path.write_text(yaml.safe_dump(self.config, sort_keys=False))
+
+    def run(self, backend: str = 'pandas', **kwargs):
+        run_job(str(self.path), str(self.root / 'run'), backend_name=backend, **kwargs)
+        return self
+
+    def table(self, name: str = 'differences') -> pd.DataFrame:
+        return pd.read_csv(self.report / f'{name}.csv')
+
+    def text(self, name: str = 'differences') -> str:
+        return (self.report / f'{name}.csv').read_text()
+
+
+@pytest.fixture
+def make_job(tmp_path):
+    def make(A=None, B=None, name='job', **overrides):
+        a, b = frames()
+        return Job(tmp_path / name, a if A is None else A, b if B is None else B, **overrides)
+    return make
+
+
+def by_key(df: pd.DataFrame, keys=('book', 'ccy')) -> pd.DataFrame:
+    """Rows in key order, for comparing outputs whose row order isn't part of the contract."""
+    return df.sort_values(list(keys), kind='stable').reset_index(drop=True)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon.backends.pandas_backend import PandasBackend
+from recon.core.aggregate import StreamingAggregator, aggregate
+from recon.core.config import AggregateSpec, ReadCfg
+
+AGGS = ('sum', 'count', 'min', 'max', 'first', 'last')
+
+
+def rows(n: int = 997) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    books = np.array(['EQD', 'FX', 'RATES', None], dtype=object)
+    return pd.DataFrame({'book': books[rng.integers(0, 4, n)],
+                         'ccy': np.array(['USD', 'EUR'], dtype=object)[rng.integers(0, 2, n)],
+                         'balance': rng.integers(-10_000, 10_000, n) / 4,  # quarters: chunked sums are exact
+                         'trade': rng.integers(0, 300, n)})
+
+
+def write(tmp_path, df: pd.DataFrame, chunksize: int | None = None) -> ReadCfg:
+    df.to_csv(tmp_path / 'A.csv', index=False)
+    return ReadCfg(path=str(tmp_path / 'A.csv'), chunksize=chunksize,
+                   dtypes={'book': 'string', 'ccy': 'string', 'balance': 'float64', 'trade': 'int64'})
+
+
+def spec(**metrics) -> AggregateSpec:
+    return AggregateSpec(group_by=['book', 'ccy'], metrics=metrics)
+
+
+@pytest.mark.parametrize('agg', AGGS)
+def test_chunked_read_matches_eager_aggregation(tmp_path, agg):
+    cfg = write(tmp_path, rows(), chunksize=64)
+    s = spec(balance={'agg': agg}, trade={'agg': agg})
+    backend = PandasBackend()
+    eager = aggregate(backend.prepare('A', cfg.model_copy(update={'chunksize': None})), s)
+    eager = eager.sort_values(['book', 'ccy'], na_position='last').reset_index(drop=True)
+    chunked = backend.read_aggregated('A', cfg, s)
+    assert chunked['book'].isna().sum() == 2  # the missing book is a group of its own
+    pd.testing.assert_frame_equal(chunked, eager, check_dtype=False)
+
+
+def test_read_aggregated_needs_chunks_and_groups(tmp_path):
+    cfg = write(tmp_path, rows(10))
+    assert PandasBackend().read_aggregated('A', cfg, spec(balance={'agg': 'sum'})) is None
+    chunked = cfg.model_copy(update={'chunksize': 4})
+    assert PandasBackend().read_aggregated('A', chunked, AggregateSpec(metrics={'balance': {'agg': 'sum'}})) is None
+
+
+def test_exact_distinct_counts_across_chunks():
+    df = rows()
+    agg = StreamingAggregator(spec(trade={'agg': 'nunique'}))
+    for start in range(0, len(df), 100):
+        agg.update(df.iloc[start:start + 100])
+    expected = aggregate(df, spec(trade={'agg': 'nunique'}))
+    expected = expected.sort_values(['book', 'ccy'], na_position='last').reset_index(drop=True)
+    pd.testing.assert_frame_equal(agg.result(), expected, check_dtype=False)
+
+
+def test_hll_distinct_stays_within_its_error_bound():
+    n = 200_000
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({'book': np.where(rng.random(n) < 0.5, 'EQD', 'FX'), 'ccy': 'USD',
+                       'trade': rng.integers(0, 60_000, n)})
+    agg = StreamingAggregator(spec(trade={'agg': 'nunique', 'distinct': 'hll', 'precision': 12}))
+    for start in range(0, n, 50_000):
+        agg.update(df.iloc[start:start + 50_000])
+    got = agg.result().set_index('book')['trade']
+    exact = df.groupby('book')['trade'].nunique()
+    # standard error 1.04 / sqrt(2**12) ~ 1.6%; allow three of them
+    assert ((got - exact).abs() / exact < 3 * 1.04 / 64).all(), (got, exact)
+
+
+def test_unknown_distinct_mode_is_rejected():
+    with pytest.raises(ValueError, match="unknown distinct mode 'approx' for trade"):
+        StreamingAggregator(spec(trade={'agg': 'nunique', 'distinct': 'approx'}))
+    with pytest.raises(ValueError, match='group_by'):
+        StreamingAggregator(AggregateSpec(metrics={'trade': {'agg': 'sum'}}))
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from recon.core.batch import expand_configs, format_summary, plan_batch, run_batch
+
+
+@pytest.fixture
+def jobs(make_job, tmp_path):
+    """Two jobs on the same input files and one that reads different files (job.cache off in all)."""
+    first = make_job(name='first')
+    same_inputs = {s: {'path': str(first.root / f'{s}.csv')} for s in 'AB'}
+    loose = {'reconcile': {'numeric': [{'column': 'balance', 'comparator': 'absolute', 'tol_abs': 100}]}}
+    second = make_job(name='second', inputs=same_inputs, **loose)
+    other = make_job(name='other')
+    return first, second, other
+
+
+def test_plan_shares_reads_and_serializes_report_dirs(jobs, make_job, tmp_path):
+    first, second, other = jobs
+    clash = make_job(name='clash', report={'outputs': {'dir': str(other.report)}})
+    plan = plan_batch([str(j.path) for j in (first, second, other, clash)], tmp_path / 'out')
+    assert [j.after for j in plan] == [set(), {0}, set(), {2}]
+    assert [j.reused for j in plan] == [0, 2, 0, 0]
+    # every config is named 'test' and every file job.yaml: later ones get the stem, then a counter
+    assert [j.name for j in plan] == ['test', 'test-job', 'test-job-2', 'test-job-3']
+    assert len({j.out_dir for j in plan}) == 4
+    # planning only stats the inputs; the workers hash them
+    assert not (tmp_path / 'out' / '.cache').exists()
+    assert [j.reused for j in plan_batch([str(j.path) for j in jobs], tmp_path / 'out', use_cache=False)] == [0, 0, 0]
+
+
+def test_run_batch(jobs, tmp_path):
+    first, second, other = jobs
+    broken = tmp_path / 'broken.yaml'
+    broken.write_text('job: {name: broken}\n')
+    configs = [str(first.path), str(second.path), str(other.path), str(broken)]
+    summary = run_batch(configs, tmp_path / 'out', workers=2)
+    assert summary['jobs'] == 4 and summary['ok'] == 3 and summary['failed'] == ['broken']
+    assert summary['shared_reads'] == 2
+    assert len(list((tmp_path / 'out' / '.cache').glob('*.parquet'))) == 4  # first/second share their two
+    assert json.loads((tmp_path / 'out' / 'batch_summary.json').read_text()) == summary
+    results = {r['config']: r for r in summary['results']}
+    assert results[str(second.path)]['waited_for'] == ['test']
+    assert results[str(second.path)]['matched'] == 5 and results[str(first.path)]['matched'] == 4
+    assert 'FAILED broken' in format_summary(summary)
+    # the same reports as running each job on its own
+    texts = [j.text() for j in (first, second, other)]
+    for j, text in zip((first, second, other), texts):
+        assert j.run().text() == text
+
+
+def test_expand_configs(tmp_path):
+    for name in ('b.yaml', 'a.yaml'):
+        (tmp_path / name).write_text('')
+    pattern = str(tmp_path / '*.yaml')
+    assert expand_configs([pattern, str(tmp_path / 'a.yaml')]) == [str(tmp_path / 'a.yaml'), str(tmp_path / 'b.yaml')]
+    assert expand_configs([str(tmp_path / 'none*.yaml')]) == []
@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+import yaml
+
+from conftest import frames
+
+
+def hits(caplog):
+    return sorted(r.args[0] for r in caplog.records if r.getMessage().startswith('cache: hit'))
+
+
+@pytest.fixture
+def cached(make_job, tmp_path):
+    def make(**overrides):
+        return make_job(job={'cache': {'enabled': True, 'dir': str(tmp_path / 'cache')}}, **overrides)
+    return make
+
+
+def test_cache_is_off_by_default(make_job, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    job = make_job()
+    del job.config['job']['cache']
+    job.path.write_text(yaml.safe_dump(job.config, sort_keys=False))
+    job.run()
+    assert not (tmp_path / '.recon_cache').exists()
+
+
+def test_warm_run_hits_and_matches_cold_run(cached, caplog):
+    job = cached().run()
+    cold = job.text()
+    with caplog.at_level(logging.INFO, logger='recon.core.cache'):
+        job.run()
+    assert hits(caplog) == ['A', 'B']
+    assert job.text() == cold
+
+
+def test_editing_an_input_misses_only_that_side(cached, caplog):
+    job = cached().run()
+    A, _ = frames()
+    A.loc[0, 'balance'] = 101.0
+    A.to_csv(job.root / 'A.csv', index=False)
+    with caplog.at_level(logging.INFO, logger='recon.core.cache'):
+        job.run()
+    assert hits(caplog) == ['B']
+    usd = job.table().query("book == 'EQD' and ccy == 'USD'").iloc[0]
+    assert usd['balance_A'] == 101.0 and not usd['match_flag']
+
+
+def test_changing_read_settings_misses(cached, caplog):
+    cached().run()
+    with caplog.at_level(logging.INFO, logger='recon.core.cache'):
+        job = cached(inputs={'A': {'prefilter': [{'col': 'book', 'op': 'ne', 'value': 'FX'}]}}).run()
+    assert hits(caplog) == ['B']
+    assert job.table().query("book == 'FX'")['only_in_B'].all()
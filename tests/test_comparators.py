@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from conftest import BACKENDS
+
+
+def sides():
+    A = pd.DataFrame({'book': ['EQD', 'FX', 'RATES', 'CREDIT'], 'ccy': ['USD'] * 4,
+                      'balance': [1.2, 100.0, 10_000.0, 0.0]})
+    B = pd.DataFrame({'book': ['EQD', 'FX', 'RATES', 'CREDIT'], 'ccy': ['USD'] * 4,
+                      'balance': [1.4, 103.0, 10_000.4, 1e-9]})
+    return A, B
+
+
+RULES = {
+    'absolute': {'comparator': 'absolute', 'tol_abs': 0.01},
+    'absolute_params': {'comparator': 'absolute', 'tol_abs': 0.01, 'params': {'tol_abs': 5}},
+    'relative': {'comparator': 'relative', 'tol_pct': 0.01},
+    'relative_params': {'comparator': 'relative', 'params': {'tol_pct': 0.2, 'min_base': 1.0}},
+    'rounded_half_even': {'comparator': 'rounded', 'round': 0},
+    'rounded_params': {'comparator': 'rounded', 'round': 2, 'params': {'round': 0}},
+    'bps': {'comparator': 'bps', 'tol_bps': 1},
+    'bps_params': {'comparator': 'bps', 'params': {'tol_bps': 500, 'min_base': 1.0}},
+}
+
+
+def matches(make_job, backend, rule):
+    A, B = sides()
+    if rule.get('round') == 0:
+        B.loc[2, 'balance'] = 10_000.5  # a tie: half to even gives 10000 on every engine
+    job = make_job(A, B, name=backend, reconcile={'numeric': [{'column': 'balance', **rule}]}).run(backend)
+    return job.table().set_index('book')['match_balance'].astype(str).str.lower().to_dict()
+
+
+@pytest.mark.parametrize('rule', list(RULES))
+def test_builtin_comparators_agree_across_backends(make_job, rule):
+    expected = matches(make_job, 'pandas', RULES[rule])
+    for backend in BACKENDS[1:]:
+        assert matches(make_job, backend, RULES[rule]) == expected, backend
+
+
+def test_params_override_the_rule_fields(make_job):
+    assert set(matches(make_job, 'pandas', RULES['absolute']).values()) == {'false', 'true'}
+    assert matches(make_job, 'pandas', RULES['absolute_params']) == {
+        'EQD': 'true', 'FX': 'true', 'RATES': 'true', 'CREDIT': 'true'}
+    assert matches(make_job, 'pandas', RULES['rounded_params'])['EQD'] == 'true'
+    assert matches(make_job, 'pandas', RULES['bps'])['RATES'] == 'true'
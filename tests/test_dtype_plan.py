@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from recon.core.joiner import join
+
+
+def sides():
+    # repeated so the plan reads book/ccy as category; a missing book on each side
+    A = pd.DataFrame({'book': ['RATES', 'FX', None, 'EQD', 'CREDIT'] * 20,
+                      'ccy': ['USD', 'USD', 'EUR', 'USD', 'GBP'] * 20,
+                      'balance': [float(i) for i in range(100)]})
+    B = pd.DataFrame({'book': ['FX', 'ZED', 'EQD', 'RATES', None] * 20,
+                      'ccy': ['USD', 'USD', 'USD', 'USD', 'JPY'] * 20,
+                      'balance': [float(i) for i in range(100)]})
+    return A, B
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+@pytest.mark.parametrize('key_name', [None, 'recon_key'])
+@pytest.mark.parametrize('aggregate', [False, True])
+def test_reports_are_identical_with_the_plan_on_or_off(make_job, tmp_path, fmt, key_name, aggregate):
+    A, B = sides()
+    texts = []
+    for enabled in (False, True):
+        overrides = {'join': {'keys': ['book', 'ccy'], 'key_name': key_name},
+                     'inputs': {s: {'dtype_plan': {'enabled': enabled}} for s in 'AB'}}
+        if fmt == 'parquet':
+            for s, df in (('A', A), ('B', B)):
+                df.to_parquet(tmp_path / f'{s}.parquet')
+                overrides['inputs'][s].update(path=str(tmp_path / f'{s}.parquet'), format='parquet')
+        if aggregate:
+            overrides['aggregate'] = {s: {'group_by': ['book', 'ccy'], 'metrics': {'balance': {'agg': 'sum'}}}
+                                      for s in 'AB'}
+        texts.append(make_job(A, B, name=f'plan_{enabled}', **overrides).run().text())
+    assert texts[0] == texts[1]
+
+
+def test_outer_join_on_categorical_keys_puts_missing_keys_last():
+    A, B = sides()
+    plain = join(A.copy(), B.copy(), keys=['book', 'ccy'], how='outer', key_name=None, value_cols=['balance'])
+    cat = join(A.astype({'book': 'category'}), B.astype({'book': 'category'}), keys=['book', 'ccy'],
+               how='outer', key_name=None, value_cols=['balance'])
+    assert cat['book'].astype(str).tolist() == plain['book'].fillna('nan').tolist()
+    assert cat['book'].isna().iloc[-1] and not cat['book'].isna().iloc[0]
+
+
+def test_report_schema_does_not_depend_on_the_plan(make_job):
+    pq = pytest.importorskip('pyarrow.parquet')
+    A, B = sides()
+    A['qty'] = B['qty'] = list(range(100))  # small enough for int8 under `downcast: integer`
+    schemas = []
+    for enabled in (False, True):
+        job = make_job(A, B, name=f'schema_{enabled}',
+                       inputs={s: {'dtype_plan': {'enabled': enabled}} for s in 'AB'},
+                       join={'type': 'inner'},  # no unmatched rows turning qty into floats
+                       report={'outputs': {'formats': ['parquet']}}).run()
+        schemas.append(pq.read_schema(job.report / 'differences.parquet'))
+    assert schemas[0].field('qty_A').type == 'int64'
+    assert schemas[0].remove_metadata() == schemas[1].remove_metadata()
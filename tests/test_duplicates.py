@@ -0,0 +1,82 @@
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import BACKENDS
+
+
+def sides():
+    # EQD repeats on both sides, the missing book on A; seq orders the rows within a key
+    A = pd.DataFrame({'book': ['EQD', 'EQD', 'FX', None, None], 'ccy': ['USD'] * 5,
+                      'balance': [1.0, 2.0, 3.0, 4.0, 5.0], 'seq': [2, 1, 1, 1, 2]})
+    B = pd.DataFrame({'book': ['EQD', 'EQD', 'EQD', 'FX', None], 'ccy': ['USD'] * 5,
+                      'balance': [10.0, 20.0, 30.0, 3.0, 4.0], 'seq': [1, 2, 3, 1, 1]})
+    return A, B
+
+
+def run(make_job, backend, **duplicates):
+    A, B = sides()
+    job = make_job(A, B, name=f"{backend}-{duplicates.get('policy')}",
+                   join={'keys': ['book', 'ccy'], 'duplicates': duplicates})
+    return job.run(backend)
+
+
+def pairs(job) -> list[tuple]:
+    df = job.table()
+    return sorted(zip(df['book'].fillna('-'), df['balance_A'], df['balance_B']))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_report_is_the_default_on_raw_rows(make_job, backend):
+    job = run(make_job, backend)
+    assert len(job.table()) == 2 * 3 + 1 + 2 * 1  # every A x B pair of a repeated key
+    dups = job.table('duplicate_keys')
+    assert list(dups.columns) == ['book', 'ccy', 'count_A', 'count_B', 'pairs']
+    assert dups['book'].fillna('-').tolist() == ['EQD', '-'] and dups['pairs'].tolist() == [6, 2]
+    info = json.loads((job.report / 'metrics.json').read_text())['duplicates']
+    assert info['policy'] == 'report' and info['projected_rows'] == 9
+    assert (info['duplicate_keys_A'], info['duplicate_keys_B']) == (2, 1)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_aggregated_sides_skip_the_check(make_job, backend):
+    A, B = sides()
+    agg = {s: {'group_by': ['book', 'ccy'], 'metrics': {'balance': {'agg': 'sum'}}} for s in 'AB'}
+    job = make_job(A, B, name=backend, aggregate=agg).run(backend)
+    assert not (job.report / 'duplicate_keys.csv').exists()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_fail_and_max_rows_stop_before_the_merge(make_job, backend):
+    with pytest.raises(ValueError, match='duplicate keys'):
+        run(make_job, backend, policy='fail')
+    with pytest.raises(ValueError, match='max_rows=8'):
+        run(make_job, backend, policy='report', max_rows=8)
+    assert len(run(make_job, backend, policy='report', max_rows=9).table()) == 9
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_dedupe_keeps_the_first_row_by_order_by(make_job, backend):
+    assert pairs(run(make_job, backend, policy='dedupe', order_by=['seq'])) == [
+        ('-', 4.0, 4.0), ('EQD', 2.0, 10.0), ('FX', 3.0, 3.0)]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_rank_pairs_rows_in_order(make_job, backend):
+    job = run(make_job, backend, policy='rank', order_by=['seq'])
+    # the extra rows of a key become one-sided (their missing balance is zero-filled)
+    assert pairs(job) == [('-', 4.0, 4.0), ('-', 5.0, 0.0), ('EQD', 0.0, 30.0), ('EQD', 1.0, 20.0),
+                          ('EQD', 2.0, 10.0), ('FX', 3.0, 3.0)]
+    df = job.table()
+    assert df['only_in_A'].sum() == 1 and df['only_in_B'].sum() == 1
+    assert not any(c.startswith('__') for c in df.columns)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_cap_ranks_only_keys_over_the_limit(make_job, backend):
+    job = run(make_job, backend, policy='cap', max_pairs_per_key=2, order_by=['seq'])
+    # EQD (6 pairs) is paired by rank; the missing book (2 pairs) cross-joins
+    assert pairs(job) == [('-', 4.0, 4.0), ('-', 5.0, 4.0), ('EQD', 0.0, 30.0), ('EQD', 1.0, 20.0),
+                          ('EQD', 2.0, 10.0), ('FX', 3.0, 3.0)]
+    assert json.loads((job.report / 'metrics.json').read_text())['duplicates']['projected_rows'] == 6
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon.core.filter import compile_filter
+
+from conftest import BACKENDS, by_key
+
+
+def sides():
+    # a missing balance on each side, to pin what a missing value passes
+    A = pd.DataFrame({'book': ['EQD', 'EQD', 'FX', 'RATES', 'RATES', 'CREDIT'],
+                      'ccy': ['USD', 'EUR', 'USD', 'USD', 'JPY', 'GBP'],
+                      'balance': [100.0, 200.0, 300.0, 400.0, 5.0, np.nan],
+                      'd': ['2025-01-01', '2025-01-02', '2025-01-03', None, '2025-01-02', '2025-01-05']})
+    B = pd.DataFrame({'book': ['EQD', 'EQD', 'FX', 'RATES', 'CREDIT', 'CREDIT'],
+                      'ccy': ['USD', 'EUR', 'USD', 'USD', 'USD', 'GBP'],
+                      'balance': [100.0, 250.0, 300.0, np.nan, 0.0, 7.0],
+                      'd': ['2025-01-01', '2025-01-01', '2025-01-04', '2025-01-02', None, '2025-01-03']})
+    return A, B
+
+
+CASES = {
+    'in_empty': [{'col': 'ccy', 'op': 'in', 'value': []}],
+    'not_in_empty': [{'col': 'ccy', 'op': 'not_in', 'value': []}],
+    'in': [{'col': 'ccy', 'op': 'in', 'value': ['USD', 'GBP']}],
+    'not_in': [{'col': 'book', 'op': 'not_in', 'value': ['FX']}],
+    'ne_keeps_missing': [{'col': 'balance', 'op': 'ne', 'value': 100.0}],
+    'between': [{'col': 'balance', 'op': 'between', 'value': [5, 300]}],
+    'startswith': [{'col': 'book', 'op': 'startswith', 'value': ['EQ', 'CR']}],
+    'regex': [{'col': 'ccy', 'op': 'regex', 'value': 'S'}],
+    'is_null': [{'col': 'balance', 'op': 'is_null'}],
+    'date': [{'col': 'd', 'op': 'ge', 'value': '2025-01-02'}],
+    'date_between': [{'col': 'd', 'op': 'between', 'value': ['2025-01-02', '2025-01-03']}],
+    'nested': [{'col': 'ccy', 'op': 'not_in', 'value': ['JPY']},
+               {'or': [{'col': 'balance', 'op': 'gt', 'value': 250},
+                       {'not': {'col': 'book', 'op': 'startswith', 'value': 'EQ'}}]}],
+}
+
+
+def run(make_job, backend, where, preds):
+    A, B = sides()
+    dtypes = {'balance': 'float64', 'd': 'date'}
+    if where == 'prefilter':
+        overrides = {'inputs': {s: {'prefilter': preds, 'dtypes': dtypes} for s in 'AB'}}
+    else:
+        overrides = {'inputs': {s: {'dtypes': dtypes} for s in 'AB'}, 'filters': {'A': preds, 'B': preds}}
+    return by_key(make_job(A, B, name=backend, **overrides).run(backend).table())
+
+
+@pytest.mark.parametrize('backend', BACKENDS[1:])
+@pytest.mark.parametrize('where', ['prefilter', 'filters'])
+@pytest.mark.parametrize('case', list(CASES))
+def test_backends_keep_the_same_rows(make_job, backend, where, case):
+    expected = run(make_job, 'pandas', where, CASES[case])
+    got = run(make_job, backend, where, CASES[case])
+    cols = ['book', 'ccy', 'balance_A', 'balance_B', 'only_in_A', 'only_in_B']
+    pd.testing.assert_frame_equal(got[cols], expected[cols], check_dtype=False)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_empty_lists(make_job, backend):
+    assert run(make_job, backend, 'prefilter', CASES['in_empty']).empty
+    assert len(run(make_job, backend, 'prefilter', CASES['not_in_empty'])) == 7
+
+
+@pytest.mark.parametrize('pred', [
+    {'col': 'book', 'op': 'startswith', 'value': []},
+    {'col': 'book', 'op': 'in', 'value': 'EQD'},
+    {'col': 'book', 'op': 'between', 'value': [1]},
+    {'col': 'book', 'op': 'regex', 'value': '('},
+    {'col': 'book', 'op': 'like', 'value': 'EQ%'},
+])
+def test_malformed_predicates_are_rejected(pred):
+    with pytest.raises(ValueError, match='filter:'):
+        compile_filter([pred])
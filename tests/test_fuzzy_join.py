@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from recon.core.config import FuzzyJoinCfg
+from recon.core.joiner import join
+
+from conftest import BACKENDS, by_key
+
+PASSES = [FuzzyJoinCfg(on='trade_id', method='string', threshold=0.8)]
+
+
+def sides():
+    A = pd.DataFrame({'trade_id': ['T-0001', 'T-0002', 'T-0003'], 'book': ['EQD', 'EQD', 'FX'],
+                      'balance': [1.0, 2.0, 3.0]})
+    B = pd.DataFrame({'trade_id': ['t0001', 'T-0002', 'X-9999'], 'book': ['EQD', 'EQD', 'FX'],
+                      'balance': [1.0, 2.0, 5.0]})
+    return A, B
+
+
+@pytest.mark.parametrize('key_name', [None, 'recon_key'])
+def test_fuzzy_pairs_keys_and_keeps_b_value(key_name):
+    A, B = sides()
+    df = join(A, B, keys=['trade_id', 'book'], how='outer', key_name=key_name, fuzzy=PASSES)
+    paired = df[df['fuzzy_matched']]
+    assert len(paired) == 1
+    row = paired.iloc[0]
+    assert row['trade_id'] == 'T-0001' and row['trade_id_B'] == 't0001' and row['in_both']
+    exact = df[df['trade_id'] == 'T-0002'].iloc[0]
+    assert exact['in_both'] and not exact['fuzzy_matched']
+    assert df['only_in_A'].sum() == 1 and df['only_in_B'].sum() == 1
+    assert not any(c.startswith('__') for c in df.columns)
+
+
+def test_fuzzy_join_with_key_name_end_to_end(make_job):
+    # the shipped example config sets join.key_name; B's rewritten key used to collide with <on>_B
+    A, B = sides()
+    job = make_job(A, B, join={'keys': ['trade_id', 'book'], 'key_name': 'recon_key',
+                               'fuzzy': [{'on': 'trade_id', 'method': 'string', 'threshold': 0.8}]})
+    df = job.run().table()
+    assert df['fuzzy_matched'].sum() == 1
+    assert set(df.loc[df['fuzzy_matched'], 'trade_id_B']) == {'t0001'}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_fuzzy_join_backends_agree(make_job, backend):
+    A, B = sides()
+    fuzzy = {'keys': ['trade_id', 'book'], 'fuzzy': [{'on': 'trade_id', 'method': 'string', 'threshold': 0.8}]}
+    expected = by_key(make_job(A, B, name='pandas', join=fuzzy).run().table(), ['trade_id'])
+    got = by_key(make_job(A, B, name=backend, join=fuzzy).run(backend).table(), ['trade_id'])
+    cols = ['trade_id', 'book', 'fuzzy_matched', 'match_flag']
+    pd.testing.assert_frame_equal(got[cols], expected[cols], check_dtype=False)
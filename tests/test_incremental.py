@@ -0,0 +1,49 @@
+import json
+
+import pandas as pd
+import yaml
+
+from conftest import by_key, frames
+
+INCREMENTAL = {'job': {'incremental': {'enabled': True}}}
+
+
+def info(job) -> dict:
+    return json.loads((job.report / 'metrics.json').read_text())['incremental']
+
+
+def same_as_full_run(make_job, job, A, B):
+    full = make_job(A, B, name='full').run()
+    for name in ('differences', 'matched', 'non_matched'):
+        pd.testing.assert_frame_equal(by_key(job.table(name)), by_key(full.table(name)))
+
+
+def test_unchanged_inputs_reuse_every_row(make_job):
+    job = make_job(**INCREMENTAL).run()
+    assert info(job)['mode'] == 'full'
+    job.run()
+    assert info(job) == {'mode': 'incremental', 'changed_keys': 0, 'reused_rows': 6}
+    same_as_full_run(make_job, job, *frames())
+
+
+def test_only_changed_keys_are_reconciled(make_job):
+    job = make_job(**INCREMENTAL).run()
+    A, B = frames()
+    A.loc[0, 'balance'] = 101.0  # EQD/USD edited
+    A = A.drop(index=2)  # FX/USD gone from A
+    B = pd.concat([B, pd.DataFrame({'book': ['FX'], 'ccy': ['JPY'], 'balance': [1.0]})])  # new key
+    A.to_csv(job.root / 'A.csv', index=False)
+    B.to_csv(job.root / 'B.csv', index=False)
+    job.run()
+    assert info(job) == {'mode': 'incremental', 'changed_keys': 3, 'reused_rows': 4}
+    same_as_full_run(make_job, job, A, B)
+
+
+def test_config_change_runs_in_full(make_job):
+    job = make_job(**INCREMENTAL).run()
+    job.config['reconcile']['numeric'][0]['tol_abs'] = 100
+    job.path.write_text(yaml.safe_dump(job.config, sort_keys=False))
+    job.run()
+    assert info(job)['mode'] == 'full'
+    eur = job.table().query("book == 'EQD' and ccy == 'EUR'").iloc[0]
+    assert eur['match_flag']
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from recon.core.io import ReadSpec
+
+
+def write(tmp_path, text):
+    path = tmp_path / 'in.csv'
+    path.write_text(text)
+    return str(path)
+
+
+DTYPES = {'book': 'string', 'balance': 'float64', 'qty': 'int64', 'asof': 'date'}
+
+
+@pytest.mark.parametrize('chunksize', [None, 2, 1000])
+def test_bad_numeric_cell_is_accepted_like_the_eager_read(tmp_path, chunksize):
+    path = write(tmp_path, "book,balance,qty,asof\nEQD,1.5,1,2024-01-01\nFX,abc,2,2024-01-02\nRATES,3,3,bad\n")
+    df = ReadSpec(path, dtypes=DTYPES, chunksize=chunksize).read()
+    # the column that doesn't convert stays as read; the others still get their dtypes
+    assert len(df) == 3
+    assert df['balance'].iloc[1] == 'abc'
+    assert pd.to_numeric(df['balance'], errors='coerce').tolist()[::2] == [1.5, 3.0]
+    assert df['qty'].dtype == 'int64' and df['book'].dtype == 'string'
+    assert df['asof'].isna().tolist() == [False, False, True]
+
+
+@pytest.mark.parametrize('chunksize', [2, 1000])
+def test_chunked_read_matches_eager_read(tmp_path, chunksize):
+    path = write(tmp_path, "book,balance,qty,asof\nEQD,1.5,1,2024-01-01\nFX,2.5,2,2024-01-02\nRATES,3,3,2024-01-03\n")
+    eager = ReadSpec(path, dtypes=DTYPES).read()
+    chunked = ReadSpec(path, dtypes=DTYPES, chunksize=chunksize).read()
+    pd.testing.assert_frame_equal(chunked.reset_index(drop=True), eager)
+
+
+def parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'in.parquet'
+    pd.DataFrame({'book': ['EQD', 'FX', 'RATES'], 'balance': [1.5, 2.0, 3.0]}).to_parquet(path)
+    return str(path)
+
+
+@pytest.mark.parametrize('chunksize', [None, 2])
+@pytest.mark.parametrize('filters', [
+    [{'col': 'balance', 'op': 'in', 'value': ['2', 3]}],  # pyarrow can't type the list
+    [{'col': 'balance', 'op': 'ge', 'value': 'x'}],  # no kernel for double >= string
+])
+def test_pushdown_that_does_not_fit_reads_without_it(tmp_path, chunksize, filters):
+    df = ReadSpec(parquet(tmp_path), format='parquet', filters=filters, chunksize=chunksize).read()
+    assert df['book'].tolist() == ['EQD', 'FX', 'RATES']
+
+
+@pytest.mark.parametrize('chunksize', [None, 2])
+def test_pushdown_failing_during_the_scan_reads_without_it(tmp_path, monkeypatch, chunksize):
+    import pyarrow as pa
+
+    class Failing:
+        def to_table(self):
+            raise pa.ArrowInvalid('filter failed')
+
+        def to_batches(self):
+            raise pa.ArrowInvalid('filter failed')
+            yield
+
+    scanner = ReadSpec._scanner
+    monkeypatch.setattr(ReadSpec, '_scanner', lambda self, pushdown=True: Failing() if pushdown else scanner(self, False))
+    filters = [{'col': 'balance', 'op': 'gt', 'value': 1.0}]
+    df = ReadSpec(parquet(tmp_path), format='parquet', filters=filters, chunksize=chunksize).read()
+    assert df['book'].tolist() == ['EQD', 'FX', 'RATES']
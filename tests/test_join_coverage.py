@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from recon.core.config import ReconcileCfg
+from recon.core.joiner import join
+from recon.core.reconcile import recon_columns
+
+from conftest import BACKENDS, by_key
+
+
+def test_coverage_flags_from_indicator():
+    A = pd.DataFrame({'book': ['EQD', 'FX'], 'balance': [1.0, 2.0]})
+    # a B row whose values are all null still counts as present in B
+    B = pd.DataFrame({'book': ['FX', 'RATES', 'EQD'], 'balance': [2.0, 3.0, None]})
+    df = by_key(join(A, B, keys=['book'], how='outer', key_name=None, value_cols=['balance']), ['book'])
+    assert df['book'].tolist() == ['EQD', 'FX', 'RATES']
+    assert df['in_both'].tolist() == [True, True, False]
+    assert df['only_in_A'].tolist() == [False, False, False]
+    assert df['only_in_B'].tolist() == [False, False, True]
+    # only the reconciled value columns are zero-filled
+    assert df['balance_A'].tolist() == [1.0, 2.0, 0.0] and df['balance_B'].tolist() == [0.0, 2.0, 3.0]
+
+
+def test_coverage_flags_only_in_each_side():
+    A = pd.DataFrame({'book': ['EQD', 'FX'], 'balance': [1.0, 2.0], 'note': [None, 'x']})
+    B = pd.DataFrame({'book': ['FX', 'RATES'], 'balance': [2.0, 3.0]})
+    df = by_key(join(A, B, keys=['book'], how='outer', key_name='recon_key', value_cols=['balance']), ['book'])
+    assert df['only_in_A'].tolist() == [True, False, False]
+    assert df['only_in_B'].tolist() == [False, False, True]
+    assert df['recon_key'].tolist() == ['EQD', 'FX', 'RATES']
+    assert df['note'].isna().tolist() == [True, False, True]  # not a value column: not filled
+
+
+def test_recon_columns_lists_each_column_once():
+    rules = ReconcileCfg(numeric=[{'column': 'balance', 'comparator': 'absolute', 'tol_abs': 1},
+                                  {'column': 'balance', 'comparator': 'relative', 'tol_pct': 0.01},
+                                  {'column': 'qty', 'comparator': 'exact'}])
+    assert recon_columns(rules) == ['balance', 'qty']
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_two_rules_on_one_column(make_job, backend):
+    rules = {'numeric': [{'column': 'balance', 'comparator': 'absolute', 'tol_abs': 0.01},
+                         {'column': 'balance', 'comparator': 'relative', 'tol_pct': 0.5}]}
+    df = by_key(make_job(reconcile=rules).run(backend).table())
+    assert len(df) == 6
+    assert df['only_in_A'].sum() == 1 and df['only_in_B'].sum() == 1
+    # as at baseline, the later rule on a column replaces the earlier one: 200 vs 250 is within 50%
+    eur = df[(df['book'] == 'EQD') & (df['ccy'] == 'EUR')].iloc[0]
+    assert eur['match_balance'] and eur['match_flag']
+    assert list(df.columns) == list(by_key(make_job(name='pandas', reconcile=rules).run().table()).columns)
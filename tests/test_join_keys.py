@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon.core import joiner
+from recon.core.joiner import build_join_key, encode_join_keys, join
+
+from conftest import by_key, frames
+
+
+def distinct_tuples_get_distinct_codes(A, B, keys):
+    codes_a, codes_b = encode_join_keys(A, B, keys)
+    rows = pd.concat([A[keys], B[keys]], ignore_index=True).astype(str).apply(tuple, axis=1)
+    pairs = pd.DataFrame({'row': rows, 'code': np.concatenate([codes_a, codes_b])}).drop_duplicates()
+    # one code per distinct tuple and one tuple per code
+    assert pairs['row'].is_unique and pairs['code'].is_unique
+
+
+def test_codes_are_consistent_across_sides():
+    A, B = frames()
+    distinct_tuples_get_distinct_codes(A, B, ['book', 'ccy'])
+    codes_a, codes_b = encode_join_keys(A, B, ['book', 'ccy'])
+    assert codes_a[0] == codes_b[0]  # EQD/USD on both sides
+    assert codes_a[4] not in codes_b  # RATES/JPY only in A
+
+
+def test_codes_dont_collide_where_the_text_key_would():
+    A = pd.DataFrame({'a': ['x|y', 'x'], 'b': ['z', 'y|z']})
+    assert build_join_key(A.copy(), ['a', 'b'])['recon_key'].nunique() == 1
+    codes_a, _ = encode_join_keys(A, A.iloc[:0], ['a', 'b'])
+    assert codes_a[0] != codes_a[1]
+
+
+def test_differing_dtypes_compare_by_text():
+    A = pd.DataFrame({'id': [1, 2], 'ccy': ['USD', 'EUR']})
+    B = pd.DataFrame({'id': ['2', '3'], 'ccy': ['EUR', 'USD']})
+    codes_a, codes_b = encode_join_keys(A, B, ['id', 'ccy'])
+    assert codes_a[1] == codes_b[0] and codes_a[0] not in codes_b
+
+
+def test_codes_are_recompacted_before_overflow(monkeypatch):
+    monkeypatch.setattr(joiner, '_MAX_CODE', 16)
+    rng = np.random.default_rng(0)
+    A = pd.DataFrame({k: rng.integers(0, 5, 200) for k in 'abcd'})
+    B = pd.DataFrame({k: rng.integers(0, 5, 200) for k in 'abcd'})
+    distinct_tuples_get_distinct_codes(A, B, list('abcd'))
+
+
+@pytest.mark.parametrize('how', ['outer', 'inner', 'left', 'right'])
+def test_join_on_codes_matches_join_on_columns(how):
+    A, B = frames()
+    on_cols = by_key(join(A.copy(), B.copy(), ['book', 'ccy'], how, None, value_cols=['balance']))
+    on_codes = by_key(join(A.copy(), B.copy(), ['book', 'ccy'], how, 'recon_key', value_cols=['balance']))
+    cols = ['book', 'ccy', 'balance_A', 'balance_B', 'only_in_A', 'only_in_B', 'in_both']
+    pd.testing.assert_frame_equal(on_codes[cols], on_cols[cols])
+    assert (on_codes['recon_key'] == on_codes['book'] + '|' + on_codes['ccy']).all()
+
+
+def test_readable_key_is_skipped_when_not_wanted():
+    A, B = frames()
+    df = join(A, B, ['book', 'ccy'], 'outer', 'recon_key', readable_key=False, value_cols=['balance'])
+    assert pd.api.types.is_integer_dtype(df['recon_key'])
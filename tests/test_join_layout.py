@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import BACKENDS, frames
+
+
+def with_qty():
+    # an integer value column and a missing key part on each side
+    A, B = frames()
+    A['qty'], B['qty'] = [1, 2, 3, 4, 5], [1, 2, 3, 4, 6]
+    A.loc[4, 'ccy'] = B.loc[4, 'ccy'] = np.nan
+    return A, B
+
+
+def fuzzy_sides():
+    A = pd.DataFrame({'book': ['T-0001', 'T-0002', 'T-0003'], 'ccy': ['USD', 'USD', 'EUR'], 'balance': [1.0, 2.0, 3.0]})
+    B = pd.DataFrame({'book': ['t0001', 'T-0002', 'X-9999'], 'ccy': ['USD', 'USD', 'EUR'], 'balance': [1.0, 2.0, 5.0]})
+    return A, B
+
+
+SETUPS = {
+    'plain': (with_qty, {'reconcile': {'numeric': [{'column': 'balance', 'comparator': 'absolute', 'tol_abs': 0.01},
+                                                   {'column': 'qty', 'comparator': 'exact'}]}}),
+    'inner': (with_qty, {'join': {'type': 'inner'}}),
+    'fuzzy': (fuzzy_sides, {'join': {'fuzzy': [{'on': 'book', 'method': 'string', 'threshold': 0.8}]}}),
+    'rank': (lambda: (frames()[0], pd.concat([frames()[1]] * 2, ignore_index=True)),
+             {'join': {'duplicates': {'policy': 'rank'}}}),
+}
+
+
+def report(make_job, backend, setup, key_name):
+    sides, overrides = SETUPS[setup]
+    A, B = sides()
+    join = {**overrides.get('join', {}), 'keys': ['book', 'ccy'], 'key_name': key_name}
+    job = make_job(A, B, name=f'{backend}-{setup}-{key_name}', **{**overrides, 'join': join}).run(backend)
+    df = job.table()
+    return df.sort_values(['book', 'ccy', 'balance_A', 'balance_B'], kind='stable').reset_index(drop=True)
+
+
+@pytest.mark.parametrize('key_name', [None, 'recon_key'])
+@pytest.mark.parametrize('setup', list(SETUPS))
+def test_reports_have_the_pandas_layout_on_every_backend(make_job, setup, key_name):
+    expected = report(make_job, 'pandas', setup, key_name)
+    if key_name:
+        assert {'book_A', 'book_B', 'book', key_name} <= set(expected.columns)
+    for backend in BACKENDS[1:]:
+        got = report(make_job, backend, setup, key_name)
+        assert list(got.columns) == list(expected.columns), backend
+        # values too; integer value columns stay integers where pandas' outer join makes them floats
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False, obj=backend)
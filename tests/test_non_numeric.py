@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon.core.config import ReconcileCfg
+from recon.core.reconcile import reconcile_non_numeric
+
+from conftest import BACKENDS
+
+BOOKS = ['B1', 'B2', 'B3', 'B4', 'B5']
+
+
+def sides():
+    A = pd.DataFrame({'book': BOOKS, 'ccy': 'USD', 'balance': 1.0,
+                      'cpty': ['Acme Corp.', 'acme corp', 'Beta  Ltd', None, 'Gamma'],
+                      'settle': ['2024-01-02', '2024-01-02', '2024-01-02T12:00:00', None, 'not a date']})
+    B = pd.DataFrame({'book': BOOKS, 'ccy': 'USD', 'balance': 1.0,
+                      'cpty': ['Acme Corp.', 'ACME CORP', 'beta ltd.', None, 'Delta'],
+                      'settle': ['2024-01-02', '2024-01-03', '2024-01-04', None, '2024-01-02']})
+    return A, B
+
+
+CASES = {
+    'exact': ({'column': 'cpty'}, [True, False, False, True, False]),
+    'case_insensitive': ({'column': 'cpty', 'comparator': 'case_insensitive'}, [True, True, False, True, False]),
+    'normalized': ({'column': 'cpty', 'comparator': 'normalized'}, [True, True, True, True, False]),
+    'nulls_differ': ({'column': 'cpty', 'comparator': 'normalized', 'null_equal': False},
+                     [True, True, True, False, False]),
+    'date_tolerance': ({'column': 'settle', 'comparator': 'date_tolerance', 'tol_days': 1},
+                       [True, True, False, True, False]),
+}
+
+
+def flags(df: pd.DataFrame, col: str) -> list:
+    return df.sort_values('book')[col].astype(str).str.lower().eq('true').tolist()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('case', list(CASES))
+def test_non_numeric_rules(make_job, backend, case):
+    rule, expected = CASES[case]
+    A, B = sides()
+    job = make_job(A, B, name=f'{backend}-{case}', reconcile={
+        'numeric': [{'column': 'balance', 'comparator': 'absolute', 'tol_abs': 0.01}], 'non_numeric': [rule]}).run(backend)
+    df = job.table()
+    assert flags(df, f"match_{rule['column']}") == expected
+    assert flags(df, 'match_flag') == expected  # balances all match
+    if case == 'date_tolerance':
+        days = df.sort_values('book')['delta_days_settle'].to_numpy(dtype=float)
+        np.testing.assert_allclose(days, [0, 1, 1.5, np.nan, np.nan])
+
+
+def test_reconcile_non_numeric_ands_into_match_flag():
+    A, B = sides()
+    df = A.merge(B, on=['book', 'ccy'], suffixes=('_A', '_B'))
+    df['match_flag'] = [True, True, True, False, True]
+    rules = ReconcileCfg(non_numeric=[CASES['normalized'][0], CASES['date_tolerance'][0]])
+    out = reconcile_non_numeric(df, rules)
+    assert out['match_cpty'].tolist() == [True, True, True, True, False]
+    assert out['match_settle'].tolist() == [True, True, False, True, False]
+    assert out['match_flag'].tolist() == [True, True, False, False, False]
+    assert 'match_cpty' not in df.columns  # the input frame is left alone
+    # without a numeric pass the rules make the flag on their own
+    assert reconcile_non_numeric(df.drop(columns='match_flag'), rules)['match_flag'].tolist() == \
+        [True, True, False, True, False]
+    assert reconcile_non_numeric(df, None).equals(df)
@@ -0,0 +1,106 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon.core import registry
+from recon.core.config import ReconNumeric
+from recon.core.registry import ENTRY_POINT_GROUP, get_comparator, register_comparator
+
+from conftest import BACKENDS, by_key
+
+A = pd.Series([100.0, 200.0, np.nan, 5.0])
+B = pd.Series([100.4, 260.0, np.nan, 7.0])
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    """Registrations made by a test stay in that test."""
+    monkeypatch.setattr(registry, 'comparators', dict(registry.comparators))
+    monkeypatch.setattr(registry, '_entry_points_loaded', False)
+
+
+def within_units(a, b, units):
+    return abs(b - a) <= units
+
+
+@pytest.mark.filterwarnings('ignore:invalid value')  # NaN rows never match
+@pytest.mark.parametrize('kind', ['scalar', 'numba'])
+def test_elementwise_kernels_take_their_params(kind):
+    register_comparator('within_units', kind=kind, params=('units',))(within_units)
+    cmp = get_comparator('within_units')
+    rule = ReconNumeric(column='balance', comparator='within_units', params={'units': 2})
+    assert cmp(A, B, rule).tolist() == [True, False, False, True]
+    # a rule attribute of that name works too, and params override it
+    rule = ReconNumeric(column='balance', comparator='within_units', tol_abs=1, params={'units': 100})
+    assert cmp(A, B, rule).tolist() == [True, True, False, True]
+
+
+def test_missing_params_name_the_rule():
+    register_comparator('within_units', kind='scalar', params=('units',))(within_units)
+    rule = ReconNumeric(column='balance', comparator='within_units')
+    with pytest.raises(ValueError, match=r"needs \['units'\] on rule for column 'balance'"):
+        get_comparator('within_units')(A, B, rule)
+
+
+def test_unknown_names_and_kinds_are_rejected():
+    with pytest.raises(ValueError, match=r"unknown comparator 'nope'; registered: \[.*'absolute'"):
+        get_comparator('nope')
+    with pytest.raises(ValueError, match='kind must be one of'):
+        register_comparator('bad', kind='cuda')(within_units)
+
+
+def test_vectorized_comparators_may_reuse_abs_diff():
+    seen = {}
+
+    @register_comparator('spy')
+    def spy(a, b, rule, abs_diff=None):
+        seen['abs_diff'] = abs_diff
+        return abs_diff < 1
+
+    rule = ReconNumeric(column='balance', comparator='spy')
+    diff = (B - A).abs().to_numpy()
+    assert get_comparator('spy')(A.to_numpy(), B.to_numpy(), rule, abs_diff=diff).tolist() == [True, False, False, False]
+    assert seen['abs_diff'] is diff
+
+
+def plugin(tmp_path, monkeypatch):
+    """An installed distribution that publishes a module and a bare function as comparators."""
+    (tmp_path / 'recon_plugin_mod.py').write_text(
+        'from recon.core.registry import register_comparator\n'
+        '\n'
+        '@register_comparator("plugin_units", kind="scalar", params=("units",))\n'
+        'def plugin_units(a, b, units):\n'
+        '    return abs(b - a) <= units\n'
+        '\n'
+        'def same_sign(a, b, rule):\n'
+        '    return (a >= 0) == (b >= 0)\n')
+    info = tmp_path / 'recon_plugin-0.1.dist-info'
+    info.mkdir()
+    (info / 'METADATA').write_text('Metadata-Version: 2.1\nName: recon-plugin\nVersion: 0.1\n')
+    (info / 'entry_points.txt').write_text(f'[{ENTRY_POINT_GROUP}]\n'
+                                           'units = recon_plugin_mod\n'
+                                           'same_sign = recon_plugin_mod:same_sign\n'
+                                           'broken = recon_plugin_missing\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'recon_plugin_mod', raising=False)  # re-register on import
+
+
+def test_entry_points_are_discovered_on_first_miss(tmp_path, monkeypatch):
+    plugin(tmp_path, monkeypatch)
+    assert 'plugin_units' not in registry.comparators
+    assert get_comparator('plugin_units').kind == 'scalar'  # registered by importing the module
+    assert get_comparator('same_sign').fn.__name__ == 'same_sign'  # registered under the entry point name
+    with pytest.raises(ValueError, match='unknown comparator'):
+        get_comparator('broken')  # a plugin that fails to import is logged and skipped
+
+
+@pytest.mark.parametrize('backend', BACKENDS[1:])
+def test_plugins_run_the_same_on_every_backend(make_job, tmp_path, monkeypatch, backend):
+    plugin(tmp_path, monkeypatch)
+    rule = {'column': 'balance', 'comparator': 'plugin_units', 'params': {'units': 60}}
+    jobs = {b: make_job(name=b, reconcile={'numeric': [rule]}).run(b) for b in ('pandas', backend)}
+    got = {b: by_key(j.table())['match_balance'].astype(str).str.lower().tolist() for b, j in jobs.items()}
+    assert got[backend] == got['pandas']
+    assert 'true' in got['pandas'] and 'false' in got['pandas']
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recon.core.config import ReportCfg
+from recon.core.report import emit_reports
+
+
+def result():
+    """A reconciled-looking frame with the values whose text form differs between writers."""
+    return pd.DataFrame({
+        'book': pd.Categorical(['EQD', 'FX', 'RATES', 'EQD', 'CREDIT']),
+        'note': ['plain', 'has, comma', 'has "quote"', None, ''],
+        'balance_A': [0.0, 64417255000000.0, 1.5, np.nan, -2.0],
+        'balance_B': [0.0, 64417255000000.0, 1.25, 3.0, -2.0],
+        'qty': np.array([1, 2, 3, 4, 5], dtype='int32'),
+        # midnight in the first chunks only: the column's form is chosen over all rows
+        'asof': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04 10:30:00', None], format='ISO8601'),
+        'match_balance': [True, True, False, False, True],
+        'match_flag': [True, True, False, False, True],
+    })
+
+
+@pytest.mark.parametrize('chunk_rows', [1_000_000, 2])
+@pytest.mark.parametrize('formats', [['csv'], ['csv', 'parquet']])
+def test_default_csv_is_byte_identical_to_to_csv(tmp_path, chunk_rows, formats):
+    df = result()
+    cfg = ReportCfg(outputs={'dir': str(tmp_path), 'formats': formats, 'chunk_rows': chunk_rows})
+    emit_reports(df, cfg)
+    flag = df['match_flag']
+    assert (tmp_path / 'differences.csv').read_text() == df.to_csv(index=False)
+    assert (tmp_path / 'matched.csv').read_text() == df[flag].to_csv(index=False)
+    assert (tmp_path / 'non_matched.csv').read_text() == df[~flag].to_csv(index=False)
+
+
+def test_default_csv_keeps_pandas_text_form(tmp_path):
+    emit_reports(result(), ReportCfg(outputs={'dir': str(tmp_path)}))
+    text = (tmp_path / 'differences.csv').read_text()
+    assert text.startswith('book,note,balance_A')
+    assert 'True' in text and 'true' not in text
+    assert '64417255000000.0' in text and '0.0,0.0' in text
+
+
+def test_select_and_labels_byte_identical(make_job):
+    job = make_job(report={'dataset_names': {'A': 'FDCS', 'B': 'CALC'}}).run()
+    df = pd.read_csv(job.report / 'differences.csv')
+    assert job.text() == df.to_csv(index=False)
+    assert 'FDCS_balance' in df.columns and '64417255000000.0' in job.text()
+
+
+def test_pyarrow_engine_is_opt_in(tmp_path):
+    pytest.importorskip('pyarrow')
+    emit_reports(result(), ReportCfg(outputs={'dir': str(tmp_path), 'csv_engine': 'pyarrow'}))
+    written = pd.read_csv(tmp_path / 'differences.csv')
+    assert written['balance_B'].tolist()[:2] == [0.0, 64417255000000.0]
+    assert written['match_flag'].tolist() == result()['match_flag'].tolist()
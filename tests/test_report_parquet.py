@@ -0,0 +1,59 @@
+import json
+
+import pandas as pd
+import pytest
+
+from recon.core import report
+
+from conftest import BACKENDS, by_key
+
+pq = pytest.importorskip('pyarrow.parquet')
+ds = pytest.importorskip('pyarrow.dataset')
+
+PARTITIONED = {'formats': ['csv', 'parquet'], 'parquet': {'partition_by': ['book', 'match_flag']}}
+
+
+def outputs(job) -> dict:
+    return json.loads((job.report / 'metrics.json').read_text())['outputs']
+
+
+def test_parquet_matches_csv(make_job):
+    job = make_job(report={'outputs': {'formats': ['csv', 'parquet'], 'chunk_rows': 2,
+                                       'parquet': {'row_group_size': 4}}}).run()
+    for name in ('differences', 'matched', 'non_matched'):
+        written = pq.read_table(job.report / f'{name}.parquet').to_pandas()
+        pd.testing.assert_frame_equal(written, job.table(name), check_dtype=False)
+    meta = pq.ParquetFile(job.report / 'differences.parquet').metadata
+    assert [meta.row_group(i).num_rows for i in range(meta.num_row_groups)] == [4, 2]
+    assert meta.row_group(0).column(0).compression == 'ZSTD'
+    assert meta.row_group(0).column(0).statistics is not None
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_partitioned_layout(make_job, backend):
+    job = make_job(name=backend, report={'outputs': PARTITIONED}).run(backend)
+    root = job.report / 'differences.parquet'
+    parts = sorted(p.relative_to(root).as_posix() for p in root.rglob('*.parquet'))
+    assert parts[0].startswith('book=CREDIT/match_flag=')
+    assert len({p.rsplit('/', 1)[0] for p in parts}) == 6
+    # partition columns live in the directory names only
+    assert 'book' not in pq.read_schema(root / parts[0]).names
+    back = ds.dataset(root, partitioning='hive').to_table().to_pandas()
+    back['match_flag'] = back['match_flag'].astype(str).str.lower() == 'true'
+    assert len(back) == 6 and back['match_flag'].sum() == job.table()['match_flag'].sum()
+    got = by_key(back.astype({'book': str}))
+    assert got['balance_A'].tolist() == by_key(job.table())['balance_A'].tolist()
+    assert outputs(job)['files']['differences.parquet']['files'] == 6
+
+
+def test_missing_values_go_to_the_default_partition(make_job):
+    A = pd.DataFrame({'book': [None, 'FX'], 'ccy': ['USD', 'USD'], 'balance': [1.0, 2.0]})
+    job = make_job(A, A, name='nulls', report={'outputs': {'formats': ['parquet'],
+                                                           'parquet': {'partition_by': ['book']}}}).run()
+    assert (job.report / 'differences.parquet' / f'book={report._HIVE_NULL}').is_dir()
+
+
+def test_too_many_partitions_fails_the_run(make_job, monkeypatch):
+    monkeypatch.setattr(report, '_MAX_PARTITIONS', 3)
+    with pytest.raises(RuntimeError, match='partitions'):
+        make_job(report={'outputs': PARTITIONED}).run()
@@ -0,0 +1,72 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+import yaml
+
+from recon.core.cache import MemoryCache
+from recon.core.pipeline import run_job
+from recon.core.service import ReconService
+
+from conftest import BACKENDS, frames
+
+
+def tolerance(tol_abs: float) -> dict:
+    return {'reconcile': {'numeric': [{'column': 'balance', 'comparator': 'absolute', 'tol_abs': tol_abs}]}}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_warm_runs_match_cold_runs(make_job, backend):
+    cache = MemoryCache(256 * 1024 * 1024)
+    job = make_job(name='warm')
+    for tol in (0.01, 100, 0.01):
+        job.config.update(tolerance(tol))
+        job.path.write_text(yaml.safe_dump(job.config, sort_keys=False))
+        run_job(str(job.path), str(job.root / 'run'), backend_name=backend, memory_cache=cache)
+        cold = make_job(name=f'cold-{tol}', **tolerance(tol)).run(backend)
+        assert job.text() == cold.text()
+    if backend == 'pandas':
+        assert cache.stats()['hits'] >= 2  # the re-runs reused the join
+    # an edited input is read again, not served from memory
+    A, _ = frames()
+    A.loc[0, 'balance'] = 101.0
+    A.to_csv(job.root / 'A.csv', index=False)
+    run_job(str(job.path), str(job.root / 'run'), backend_name=backend, memory_cache=cache)
+    assert job.text() == make_job(A, name='cold-edited').run(backend).text()
+
+
+def post(port: int, body: dict) -> tuple[int, dict]:
+    req = urllib.request.Request(f'http://127.0.0.1:{port}/jobs', data=json.dumps(body).encode(),
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=120) as r:
+            return r.status, json.load(r)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def get(port: int, path: str) -> dict:
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=30) as r:
+        return json.load(r)
+
+
+def test_service_over_http(make_job, tmp_path):
+    job = make_job(name='served')
+    cold = {tol: make_job(name=f'cold-{tol}', **tolerance(tol)).run().text() for tol in (0.01, 100)}
+    service = ReconService(workers=1, port=0, out_root=tmp_path / 'service').start()
+    try:
+        code, first = post(service.port, {'config': str(job.path), 'wait': 120})
+        assert code == 200 and first['state'] == 'ok', first
+        assert job.text() == cold[0.01]
+        code, second = post(service.port, {'config': str(job.path), 'overrides': tolerance(100), 'wait': 120})
+        assert code == 200 and second['state'] == 'ok', second
+        assert job.text() == cold[100]
+        # same worker, warm: the second run found the prepared inputs in memory
+        assert second['worker'] == first['worker'] and second['summary']['cache']['hits'] > 0
+        assert get(service.port, f"/jobs/{second['id']}")['summary']['matched'] == 5
+        assert get(service.port, '/health')['jobs'] == {'ok': 2}
+        assert post(service.port, {'config': str(tmp_path / 'missing.yaml')})[0] == 400
+        assert post(service.port, {'config': str(job.path), 'bogus': 1})[0] == 400
+    finally:
+        service.stop()